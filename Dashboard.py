@@ -1,7 +1,7 @@
 import streamlit as st
 from utils.load_data import load_demo_data, load_real_data
 from utils.sidebar import sidebar
-from utils.formatting import format_volume, get_wallet_aggregation
+from utils.formatting import format_volume, get_wallet_ranking
 from utils.charts import create_volume_time_chart, create_token_volume_chart
 from utils.styling import inject_icon_styles
 
@@ -18,30 +18,28 @@ data_source = sidebar()
 st.title("Stablecoin Risk Monitor")
 
 if data_source.startswith("Demo"):
-	df = load_demo_data()
+	scores = load_demo_data()
 else:
-	df = load_real_data()
+	scores = load_real_data()
 
-if df.empty:
+if scores.empty:
 	st.info("No data available.")
 	st.stop()
 
-wallet_agg = get_wallet_aggregation(df)
+kpis = scores.rollups.kpis
 
-total_volume = df["Volume"].sum()
-sanctioned_vol = df.loc[df["Sanctioned"] == 1, "Volume"].sum()
-sanctioned_share = (sanctioned_vol / total_volume * 100) if total_volume > 0 else 0
+ranking = get_wallet_ranking(scores)
 
 with st.container(border=True):
 	col1, col2, col3, col4 = st.columns(4)
 	with col1:
-		st.metric("Total Volume", format_volume(total_volume))
+		st.metric("Total Volume", format_volume(kpis["total_volume"]))
 	with col2:
-		st.metric("Unique Wallets", f"{df['Wallet'].nunique():,}")
+		st.metric("Unique Wallets", f"{kpis['unique_wallets']:,}")
 	with col3:
-		st.metric("Average Risk Score", f"{df['Risk Score'].mean():.1f}")
+		st.metric("Average Risk Score", f"{kpis['mean_risk']:.1f}")
 	with col4:
-		st.metric("Sanctioned Share", f"{sanctioned_share:.2f}%")
+		st.metric("Sanctioned Share", f"{kpis['sanctioned_share']:.2f}%")
 
 tab1, tab2, tab3 = st.tabs([
 	":material/warning: High-Risk Wallets",
@@ -54,7 +52,7 @@ with tab1:
 		st.subheader("Top 10 High-Risk Wallets")
 
 		top_n = 10
-		top_wallets = wallet_agg.head(top_n)
+		top_wallets = ranking.top("Average Risk", top_n)
 
 		st.dataframe(
 			top_wallets[
@@ -77,13 +75,20 @@ with tab2:
 	with st.container(border=True):
 		st.subheader("Stablecoin volume over time")
 
-		fig_vol = create_volume_time_chart(df)
+		dates = sorted(scores.rollups.volume["Date"].astype(str).unique())
+		start_date, end_date = dates[0], dates[-1]
+		if len(dates) > 1:
+			start_date, end_date = st.select_slider(
+				"Date range (narrow it for hourly detail):", options=dates, value=(start_date, end_date)
+			)
+
+		fig_vol = create_volume_time_chart(scores, start_date, end_date)
 		st.plotly_chart(fig_vol, use_container_width=True)
 
 with tab3:
 	with st.container(border=True):
 		st.subheader("Total volume by token")
 
-		fig_token = create_token_volume_chart(df)
+		fig_token = create_token_volume_chart(scores)
 		st.plotly_chart(fig_token, use_container_width=True)
 
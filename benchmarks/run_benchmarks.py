@@ -0,0 +1,231 @@
+"""
+Benchmark harness for the scoring and dashboard data paths.
+
+Generates synthetic transfers with utils.generate_demo_data at one or more
+scales, then times and memory-profiles the scorer, its components, the
+wallet aggregation, the chart builders and the raw-export converter.
+Results are written as JSON so runs can be compared across commits.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks --rows 10000 100000 1000000
+    python -m benchmarks.run_benchmarks --rows 100000 --days 7 --tokens 5 --out bench.json
+    python -m benchmarks.run_benchmarks --rows 100000 --compare baseline.json
+    python -m benchmarks.run_benchmarks --rows 1000000 --jobs 8
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# cached wrappers warn about running without a Streamlit runtime
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+from utils import charts, public_scoring  # noqa: E402
+from utils.convert_real_data import _convert_chunk, peak_rss_mb  # noqa: E402
+from utils.counterparty_graph import CounterpartyGraphBuilder, sanctions_exposure  # noqa: E402
+from utils.generate_demo_data import generate_demo_data, make_raw_export  # noqa: E402
+from utils.parallel_scoring import compute_risk_scores_parallel  # noqa: E402
+from utils.rollups import build_rollups  # noqa: E402
+from utils.sanctions_index import SanctionsIndex  # noqa: E402
+from utils.systemic_metrics import SystemicMetrics  # noqa: E402
+from utils.wallet_ranking import WalletRanking  # noqa: E402
+from utils.wallet_registry import WalletRegistry  # noqa: E402
+
+TOKENS = ["USDC", "DAI", "USDe", "USDT", "PYUSD", "FDUSD", "TUSD", "GUSD"]
+
+# Demo wallets make three transactions on average.
+TX_PER_WALLET = 3
+
+
+def _unwrap(func):
+    """Bypass st.cache_data so every call does the real work."""
+    return getattr(func, "__wrapped__", func)
+
+
+def make_dataset(rows: int, days: int, tokens: int, wallets: int = None, seed: int = 0) -> pd.DataFrame:
+    """Synthetic raw transfers at the requested scale."""
+    wallets = wallets or max(1, rows // TX_PER_WALLET)
+    token_names = TOKENS[:tokens] if tokens != 3 else ("USDC", "DAI", "USDe")
+    return generate_demo_data(seed=seed, n_days=days, n_wallets=wallets, save=False, tokens=token_names)
+
+
+def measure(func, *args, repeats: int = 3):
+    """Wall time of each repeat, then peak traced allocation of one extra run."""
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocation-heavy code, so it is kept out of the timings
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "seconds": times,
+        "best": min(times),
+        "median": float(np.median(times)),
+        "peak_alloc_mb": peak / 1024 / 1024,
+    }
+
+
+def run_scale(rows: int, days: int, tokens: int, wallets: int, repeats: int, seed: int, jobs: int = 1) -> list:
+    scale = {"rows_requested": rows, "days": days, "tokens": tokens, "wallets": wallets}
+    results = []
+
+    def record(target, func, *args):
+        result, stats = measure(func, *args, repeats=repeats)
+        results.append({"scale": scale, "target": target, **stats})
+        print(f"  {target:<40} best {stats['best'] * 1000:10.1f} ms   peak {stats['peak_alloc_mb']:8.1f} MB")
+        return result
+
+    df = record("generate_demo_data", make_dataset, rows, days, tokens, wallets, seed)
+    scale["rows"] = len(df)
+    scale["wallets"] = int(df["wallet_id"].nunique())
+    print(f"  -> {len(df):,} rows, {scale['wallets']:,} wallets")
+
+    # full scorer, both layouts
+    record("_compute_risk_scores_internal", public_scoring._compute_risk_scores_internal, df)
+    if jobs > 1:
+        record(f"compute_risk_scores_parallel[{jobs}]", compute_risk_scores_parallel, df, jobs)
+    scores = record("_compute_compact_scores_internal", public_scoring._compute_compact_scores_internal, df)
+
+    # individual components, on the frame the scorer builds
+    work = df.copy()
+    work = public_scoring._ensure_sanctions_flag(work)
+    record("_volume_score", public_scoring._volume_score, work)
+    record("_token_profile_score", public_scoring._token_profile_score, work)
+    wallet_agg = record("_wallet_aggregates", public_scoring._wallet_aggregates, work)
+    record("_concentration_score", public_scoring._concentration_score, wallet_agg)
+    record("_velocity_score", public_scoring._velocity_score, wallet_agg)
+    record("_sanctions_score", public_scoring._sanctions_score, wallet_agg)
+    # without precomputed hourly stats, as when called on a bare aggregate
+    bare = wallet_agg[["wallet_id"]]
+    record("_burst_score", public_scoring._burst_score, work, bare)
+    record("_time_activity_score", public_scoring._time_activity_score, work, bare)
+
+    # dashboard paths
+    tx = scores.transactions
+    token_tuple = tuple(sorted(tx["Token"].unique()))
+    record("WalletRanking.top", lambda: WalletRanking(scores.wallets).top("Average Risk", 25))
+    record("build_rollups", build_rollups, tx)
+    record("create_volume_time_chart", _unwrap(charts.create_volume_time_chart), scores)
+    record("create_token_volume_chart", _unwrap(charts.create_token_volume_chart), scores)
+    record("create_risk_histogram", _unwrap(charts.create_risk_histogram), scores, token_tuple)
+    record("get_component_scores", _unwrap(charts.get_component_scores), scores, token_tuple)
+    record("SystemicMetrics.from_frame", SystemicMetrics.from_frame, df)
+
+    # converter on a synthetic raw export, with a throwaway registry
+    raw = make_raw_export(df, seed)
+    sanctioned = SanctionsIndex.from_addresses(
+        raw["to_address"].drop_duplicates().sample(frac=0.01, random_state=seed).to_numpy()
+    )
+    with tempfile.TemporaryDirectory() as registry_dir:
+        record(
+            "convert_chunk",
+            lambda: _convert_chunk(raw, sanctioned, WalletRegistry(registry_dir)),
+        )
+        registry = WalletRegistry(registry_dir)
+        builder = CounterpartyGraphBuilder()
+        _convert_chunk(raw, sanctioned, registry, builder)
+        graph = record("CounterpartyGraphBuilder.build", builder.build, len(registry))
+        seeds = registry.lookup_keys(sanctioned.keys)
+        record("sanctions_exposure", sanctions_exposure, graph, seeds[seeds >= 0])
+
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline_path: Path) -> None:
+    """Print best-time ratios against an earlier results file."""
+    baseline = json.loads(Path(baseline_path).read_text())
+
+    def key(r):
+        return (r["scale"]["rows_requested"], r["scale"]["days"], r["scale"]["tokens"], r["target"])
+
+    before = {key(r): r for r in baseline["results"]}
+    print(f"\nComparison against {baseline_path} ({baseline['meta']['commit']}):")
+    for r in current["results"]:
+        old = before.get(key(r))
+        if old is None:
+            continue
+        ratio = r["best"] / old["best"] if old["best"] > 0 else float("nan")
+        flag = "  REGRESSION" if ratio > 1.2 else ""
+        print(f"  {r['scale']['rows_requested']:>10,} {r['target']:<40} x{ratio:5.2f}{flag}")
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000],
+                        help="approximate transaction counts to benchmark")
+    parser.add_argument("--wallets", type=int, default=None,
+                        help="wallet count (default: rows / 3)")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--tokens", type=int, default=3, choices=range(1, len(TOKENS) + 1))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="also benchmark the parallel scorer with this many processes")
+    parser.add_argument("--out", type=Path, default=ROOT / "bench_output.json")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": [],
+    }
+    for rows in args.rows:
+        print(f"\nScale: ~{rows:,} rows, {args.days} day(s), {args.tokens} token(s)")
+        report["results"].extend(
+            run_scale(rows, args.days, args.tokens, args.wallets, args.repeats, args.seed, args.jobs)
+        )
+    report["meta"]["peak_rss_mb"] = peak_rss_mb()
+
+    args.out.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {len(report['results'])} results to {args.out}")
+
+    if args.compare is not None:
+        compare(report, args.compare)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.express as px
 from utils.load_data import load_demo_data, load_real_data
 from utils.sidebar import sidebar
-from utils.formatting import format_volume, get_wallet_aggregation
+from utils.formatting import format_volume, get_wallet_ranking
 from utils.styling import inject_icon_styles
 
 inject_icon_styles()
@@ -16,23 +16,28 @@ st.caption(
 )
 
 if data_source.startswith("Demo"):
-	df = load_demo_data()
+	scores = load_demo_data()
 else:
-	df = load_real_data()
+	scores = load_real_data()
 
-if df.empty:
+if scores.empty:
 	st.info("No data available.")
 	st.stop()
 
-wallet_agg = get_wallet_aggregation(df)
+kpis = scores.rollups.kpis
+
+ranking = get_wallet_ranking(scores)
 
 with st.container(border=True):
 	st.header("High-Risk Wallets")
 
-	top_n = st.slider("Number of wallets:", 5, 100, 25)
+	top_n = st.slider("Wallets per page:", 5, 100, 25)
 
 	st.subheader("Top high-risk wallets (by average risk score)")
-	top_high_risk = wallet_agg.head(top_n)
+	page = st.number_input(
+		"Page", 1, ranking.pages("Average Risk", top_n), 1, key="high_risk_page"
+	)
+	top_high_risk = ranking.page("Average Risk", page, top_n)
 	st.dataframe(
 		top_high_risk[
 			[
@@ -49,7 +54,10 @@ with st.container(border=True):
 	)
 
 	st.subheader("Whale wallets (by total volume)")
-	top_whales = wallet_agg.sort_values("Total Volume", ascending=False).head(top_n)
+	page = st.number_input(
+		"Page", 1, ranking.pages("Total Volume", top_n), 1, key="whale_page"
+	)
+	top_whales = ranking.page("Total Volume", page, top_n)
 	st.dataframe(
 		top_whales[
 			[
@@ -67,32 +75,29 @@ with st.container(border=True):
 with st.container(border=True):
 	st.header("Sanctions-Linked Activity")
 
-	total_vol = df["Volume"].sum()
-	sanctioned_vol = df.loc[df["Sanctioned"] == 1, "Volume"].sum()
-	sanctioned_pct = (sanctioned_vol / total_vol * 100) if total_vol > 0 else 0
-	flagged_wallets = df.loc[df["Sanctioned"] == 1, "Wallet"].nunique()
-	sanctioned_tx_count = (df["Sanctioned"] == 1).sum()
-
 	col1, col2, col3, col4 = st.columns(4)
 	with col1:
-		st.metric("Sanctioned Volume", format_volume(sanctioned_vol))
+		st.metric("Sanctioned Volume", format_volume(kpis["sanctioned_volume"]))
 	with col2:
-		st.metric("Share of Total", f"{sanctioned_pct:.2f}%")
+		st.metric("Share of Total", f"{kpis['sanctioned_share']:.2f}%")
 	with col3:
-		st.metric("Flagged Wallets", flagged_wallets)
+		st.metric("Flagged Wallets", kpis["flagged_wallets"])
 	with col4:
-		st.metric("Sanctioned Txs", sanctioned_tx_count)
+		st.metric("Sanctioned Txs", kpis["sanctioned_transactions"])
 
 	st.divider()
 
 	st.subheader("Sanctions-exposed wallets")
-	top_sanctions = (
-		wallet_agg[wallet_agg["Sanctioned Volume"] > 0]
-		.sort_values("Sanctioned Volume", ascending=False)
-		.head(top_n)
-	)
 
-	if not top_sanctions.empty:
+	if ranking.count("Sanctioned Volume", positive=True):
+		page = st.number_input(
+			"Page",
+			1,
+			ranking.pages("Sanctioned Volume", top_n, positive=True),
+			1,
+			key="sanctions_page",
+		)
+		top_sanctions = ranking.page("Sanctioned Volume", page, top_n, positive=True)
 		st.dataframe(
 			top_sanctions[
 				[
@@ -1,9 +1,19 @@
 import streamlit as st
-from utils.load_data import load_demo_data, load_real_data
+from utils.load_data import load_demo_data, load_real_data, load_what_if_scores
 from utils.sidebar import sidebar
 from utils.charts import create_risk_histogram, get_component_scores
+from utils.scoring_weights import ScoringWeights
 from utils.styling import inject_icon_styles
 
+WEIGHT_LABELS = {
+	"volume": "Transaction volume",
+	"token_profile": "Token profile",
+	"concentration": "Wallet concentration",
+	"velocity": "Velocity",
+	"burst": "Burst",
+	"time": "Time activity",
+}
+
 inject_icon_styles()
 
 data_source = sidebar()
@@ -15,26 +25,69 @@ st.caption(
 )
 
 if data_source.startswith("Demo"):
-	df = load_demo_data()
+	scores = load_demo_data()
 else:
-	df = load_real_data()
+	scores = load_real_data()
 
-if df.empty:
+if scores.empty:
 	st.info("No data available.")
 	st.stop()
 
+all_tokens = sorted(scores.rollups.tokens["Token"])
+
 tokens = st.multiselect(
 	"Filter by token",
-	sorted(df["Token"].unique()),
-	default=sorted(df["Token"].unique()),
+	all_tokens,
+	default=all_tokens,
 )
 
 with st.container(border=True):
 	st.subheader("Public risk score distribution")
-	fig_hist = create_risk_histogram(df, tuple(tokens))
+	fig_hist = create_risk_histogram(scores, tuple(tokens))
 	st.plotly_chart(fig_hist, use_container_width=True)
 
 with st.container(border=True):
 	st.subheader("Average component scores by token")
-	comp = get_component_scores(df, tuple(tokens))
-	st.dataframe(comp, hide_index=True, use_container_width=True)
\ No newline at end of file
+	comp = get_component_scores(scores, tuple(tokens))
+	st.dataframe(comp, hide_index=True, use_container_width=True)
+with st.container(border=True):
+	st.subheader("What-if weights")
+	current = scores.weights
+	st.caption(
+		f"Scores use weights version **{current.version}**. Adjust the weights to preview the "
+		"distribution they would give; the components are re-weighted in place, nothing is rescored."
+	)
+	with st.expander("Component weights", expanded=False):
+		cols = st.columns(3)
+		weights = {}
+		for i, (key, label) in enumerate(WEIGHT_LABELS.items()):
+			with cols[i % 3]:
+				weights[key] = st.slider(label, 0.0, 1.0, float(current.weights[key]), 0.05, key=f"what_if_{key}")
+		exposure_weight = current.exposure_weight
+		if "Exposure Score" in scores.score_columns:
+			exposure_weight = st.slider("Counterparty exposure share", 0.0, 1.0, float(exposure_weight), 0.05)
+		log_factor = st.slider(
+			"Sanctions multiplier (per decade of volume)", 0.0, 1.0, float(current.sanctions_log_factor), 0.05
+		)
+
+	what_if = ScoringWeights(
+		version="what-if",
+		weights=weights,
+		exposure_weight=exposure_weight,
+		token_baseline=current.token_baseline,
+		default_token_score=current.default_token_score,
+		sanctions_log_factor=log_factor,
+	)
+	if what_if == current:
+		st.info("Move a slider to compare against the current weights.")
+	else:
+		preview = load_what_if_scores(scores, what_if)
+		mean_risk = scores.rollups.kpis["mean_risk"]
+		preview_mean = preview.rollups.kpis["mean_risk"]
+		col1, col2 = st.columns(2)
+		with col1:
+			st.metric("Mean risk (what-if)", f"{preview_mean:.1f}", f"{preview_mean - mean_risk:+.1f}")
+		with col2:
+			total = sum(weights.values())
+			st.metric("Sum of weights", f"{total:.2f}")
+		st.plotly_chart(create_risk_histogram(preview, tuple(tokens)), use_container_width=True)
@@ -1,5 +1,11 @@
 import streamlit as st
+from utils.load_data import load_systemic_metrics
 from utils.sidebar import sidebar
+from utils.charts import create_concentration_chart, create_correlation_heatmap, create_exposure_heatmap
+from utils.systemic_metrics import CORRELATION_WINDOW_HOURS
+from utils.styling import inject_icon_styles
+
+inject_icon_styles()
 
 data_source = sidebar()
 
@@ -9,12 +15,44 @@ st.caption(
 	"This page aggregates market-wide indicators to identify potential vulnerabilities."
 )
 
+metrics = load_systemic_metrics(demo=data_source.startswith("Demo"))
+
+if metrics.empty:
+	st.info("No data available.")
+	st.stop()
+
 with st.container(border=True):
-	st.subheader("Coming Soon")
-	st.info(
-		"This page will feature:\n"
-		"- Market concentration metrics\n"
-		"- Cross-token risk correlations\n"
-		"- Network-level vulnerability indicators\n"
-		"- Systemic exposure heatmaps"
+	st.subheader("Market concentration")
+	st.caption(
+		"How concentrated each token's daily volume is among wallets. "
+		"HHI runs from near 0 (dispersed) to 10,000 (a single wallet); Gini from 0 (equal) to 1."
+	)
+	metric = st.radio("Metric", ["HHI", "Gini"], horizontal=True)
+	st.plotly_chart(create_concentration_chart(metrics.concentration, metric), use_container_width=True)
+
+	latest = metrics.concentration[metrics.concentration["Date"] == metrics.concentration["Date"].max()]
+	st.dataframe(
+		latest[["Date", "Token", "Wallets", "Volume", "HHI", "Gini"]],
+		hide_index=True,
+		use_container_width=True,
 	)
+
+with st.container(border=True):
+	st.subheader("Cross-token correlations")
+	matrix = metrics.correlation_matrix()
+	if matrix.empty:
+		st.info(
+			f"Correlations need at least {CORRELATION_WINDOW_HOURS} hours of data for two or more tokens."
+		)
+	else:
+		window_end = metrics.correlations["Time"].max()
+		st.caption(
+			f"Correlation of hourly token volumes over the {CORRELATION_WINDOW_HOURS} hours "
+			f"up to {window_end:%Y-%m-%d %H:00} UTC."
+		)
+		st.plotly_chart(create_correlation_heatmap(matrix), use_container_width=True)
+
+with st.container(border=True):
+	st.subheader("Sanctioned exposure heatmap")
+	st.caption("Share of each token's volume in each hour (UTC) that involves sanctioned addresses.")
+	st.plotly_chart(create_exposure_heatmap(metrics.heatmap()), use_container_width=True)
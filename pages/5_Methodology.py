@@ -18,12 +18,23 @@ with st.container(border=True):
 	- **Transaction Volume** (25%) - Size and frequency of transfers
 	- **Token Profile** (20%) - Stablecoin type and contract characteristics
 	- **Wallet Concentration** (20%) - How volume is distributed across wallets
-	- **Velocity/Activity** (20%) - How quickly funds move through the wallet
-	- **Burst Score** (10%) - Concentration of transactions in specific hours
-	- **Time Activity** (5%) - Spread of activity across 24-hour periods
+	- **Velocity/Activity** (20%) - Transactions per active day, relative to the busiest wallet
+	- **Burst Score** (10%) - Most transactions within any rolling 60-minute window
+	- **Time Activity** (5%) - Share of hours with activity on the days the wallet is active
+	
+	Activity statistics use each transfer's full block timestamp when available (hour buckets
+	otherwise), so activity at the same hour on different days is counted separately.
+	
+	**Counterparty Exposure** (10%, real data only) - Share of a wallet's counterparty volume that
+	reaches sanctioned addresses within three hops, each further hop counting half as much. When a
+	counterparty graph is available, the components above are scaled by 90% to make room for it.
 	
 	**Sanctions Multiplier:** Wallets with sanctioned transactions receive a volume-based multiplier
 	on their base score, scaling logarithmically with transaction amounts.
+	
+	The percentages are the default weights. Deployments can set their own weights, token baselines
+	and sanctions multiplier in a versioned `scoring_weights.toml`; the Risk Scores page previews
+	the effect of other weights on the current data.
 	"""
 	)
 
@@ -0,0 +1,68 @@
+import time
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+from utils.instrumentation import INSTRUMENTS
+from utils.load_data import get_refresh_scheduler
+from utils.sidebar import sidebar
+from utils.styling import inject_icon_styles
+
+# Not linked from the navigation (see utils.styling); open /Diagnostics directly.
+
+inject_icon_styles()
+
+data_source = sidebar()
+
+st.title("Diagnostics")
+st.caption(
+	"Timings, cache hit rates and frame sizes recorded by this server process since it started "
+	"(or since the last reset). Stages ending in .compute are cache misses."
+)
+
+data = INSTRUMENTS.snapshot()
+
+with st.container(border=True):
+	st.subheader("Stage timings")
+	timers = pd.DataFrame([
+		{"Stage": name, "Calls": t["count"], "Total (s)": t["total"], "Mean (ms)": t["mean"] * 1000,
+		 "Max (ms)": t["max"] * 1000, "Last (ms)": t["last"] * 1000}
+		for name, t in data["timers"].items()
+	])
+	if timers.empty:
+		st.info("Nothing recorded yet.")
+	else:
+		st.dataframe(timers.sort_values("Total (s)", ascending=False), hide_index=True, use_container_width=True)
+
+with st.container(border=True):
+	st.subheader("Caches")
+	caches = pd.DataFrame([
+		{"Cache": name, "Requests": c["requests"], "Hits": c["hits"], "Misses": c["misses"],
+		 "Hit Rate (%)": c["hit_rate"] * 100 if c["hit_rate"] is not None else None}
+		for name, c in data["caches"].items()
+	])
+	if not caches.empty:
+		st.dataframe(caches.sort_values("Requests", ascending=False), hide_index=True, use_container_width=True)
+
+with st.container(border=True):
+	st.subheader("Frames and snapshots")
+	frames = pd.DataFrame(
+		[{"Frame": name, "Size (MB)": size / 1024 / 1024} for name, size in data["frame_sizes"].items()]
+	)
+	if not frames.empty:
+		st.dataframe(frames.sort_values("Frame"), hide_index=True, use_container_width=True)
+
+	status = get_refresh_scheduler().status()
+	snapshots = pd.DataFrame([
+		{"Dataset": name, "Loaded": datetime.fromtimestamp(s.loaded_at).strftime("%Y-%m-%d %H:%M:%S"),
+		 "Age (s)": time.time() - s.loaded_at, "Load (s)": s.seconds, "Last Error": status["errors"].get(name)}
+		for name, s in status["snapshots"].items()
+	])
+	if not snapshots.empty:
+		st.dataframe(snapshots, hide_index=True, use_container_width=True)
+
+col1, col2, col3 = st.columns(3)
+col1.download_button("Prometheus text", INSTRUMENTS.to_prometheus(), "risk_monitor.prom", "text/plain")
+col2.download_button("JSON", INSTRUMENTS.to_json(), "risk_monitor.json", "application/json")
+if col3.button("Reset"):
+	INSTRUMENTS.reset()
+	st.rerun()
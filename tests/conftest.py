@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from utils.generate_demo_data import generate_demo_data, make_raw_export
+
+
+@pytest.fixture(scope="session")
+def transfers() -> pd.DataFrame:
+    """Small skewed dataset with block timestamps, in time order (integer volumes)."""
+    df = generate_demo_data(
+        seed=7,
+        n_days=4,
+        n_wallets=400,
+        save=False,
+        tokens=("USDT", "USDC", "DAI", "USDe"),
+        activity_alpha=1.6,
+        max_tx_per_wallet=300,
+        burst_fraction=0.3,
+        timestamps=True,
+    )
+    df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+    return df.astype({"date": str, "token": str, "wallet_id": str})
+
+
+@pytest.fixture
+def real_settings(tmp_path, monkeypatch, transfers):
+    """Settings for a real dataset converted from a fake export of ``transfers``, all under ``tmp_path``."""
+    from utils import pipeline
+    from utils.config import Settings
+
+    raw = make_raw_export(transfers)
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    raw.to_csv(raw_dir / "raw_bigquery.csv", index=False)
+    sanctions = tmp_path / "sanctions.csv"
+    pd.DataFrame({"address": raw["from_address"].drop_duplicates().iloc[:5]}).to_csv(sanctions, index=False)
+    monkeypatch.setenv("SANCTIONS_FILE", str(sanctions))
+
+    settings = Settings(
+        raw_path=raw_dir / "raw_bigquery.csv",
+        raw_dir=raw_dir,
+        real_csv_path=tmp_path / "processed" / "real_scores.csv",
+        parquet_dir=tmp_path / "processed" / "real_scores",
+        registry_dir=tmp_path / "registry",
+        graph_dir=tmp_path / "graph",
+        systemic_dir=tmp_path / "systemic",
+        weights_path=tmp_path / "weights.json",
+        cache_dir=tmp_path / "cache",
+    )
+    pipeline.convert(output_format="parquet", settings=settings)
+    return settings
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+
+from utils.cache import DiskCache, MemoryCache, cache_key
+
+
+def _value(seed, n=DiskCache.MMAP_MIN_BYTES // 8):
+    return {"label": f"entry {seed}", "values": np.random.default_rng(seed).random(n)}
+
+
+def test_entries_are_reused_memory_mapped(tmp_path):
+    cache = DiskCache(tmp_path)
+    calls = []
+    first = cache.get_or_compute("a", lambda: calls.append(1) or _value(0))
+    again = DiskCache(tmp_path).get_or_compute("a", lambda: calls.append(1) or _value(1))
+
+    assert calls == [1]
+    assert again["label"] == "entry 0"
+    np.testing.assert_array_equal(again["values"], _value(0)["values"])
+    # large arrays come back as read-only views of the entry's .npy file
+    for value in (first, again):
+        assert isinstance(value["values"].base, np.memmap)
+        assert not value["values"].flags.writeable
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    entry_bytes = DiskCache.MMAP_MIN_BYTES + 1024
+    cache = DiskCache(tmp_path, max_bytes=3 * entry_bytes)
+    for i, key in enumerate("abc"):
+        cache.set(key, _value(i))
+        os.utime(tmp_path / key, ns=(i * 10**9, i * 10**9))
+    # reading "a" makes "b" the least recently used
+    assert cache.get("a") is not None
+    cache.set("d", _value(3))
+
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["a", "c", "d"]
+    assert cache.get("b") is None
+
+
+def test_the_entry_just_written_is_kept(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1)
+    cache.set("a", _value(0))
+    cache.set("b", _value(1))
+    assert [entry.name for entry in tmp_path.iterdir()] == ["b"]
+    assert cache.get("b")["label"] == "entry 1"
+
+
+def test_damaged_entries_are_misses(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.set("a", _value(0))
+    (tmp_path / "a" / "object.pkl").write_bytes(b"")
+    assert cache.get("a", "missing") == "missing"
+
+
+def test_memory_cache_keeps_the_most_recent_entries():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_keys_depend_on_every_part():
+    assert cache_key("scores", ("a", 1)) == cache_key("scores", ("a", 1))
+    assert cache_key("scores", ("a", 1)) != cache_key("scores", ("a", 2))
+    assert cache_key("ab", "c") != cache_key("a", "bc")
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from utils.columnar_store import (
+    COLUMNS,
+    parquet_dates,
+    partition_stamp,
+    read_parquet_dataset,
+    write_parquet_dataset,
+)
+
+
+def _normalized(df):
+    df = df[COLUMNS].astype({"date": str, "token": str, "wallet_id": str, "hour": int, "tx_volume_usd": float, "sanctions_flag": int})
+    df = df.assign(timestamp=pd.to_datetime(df["timestamp"], utc=True).dt.floor("s").astype("datetime64[s, UTC]"))
+    return df.sort_values(["date", "token", "timestamp", "wallet_id", "tx_volume_usd"], ignore_index=True)
+
+
+def test_partitions_round_trip(tmp_path, transfers):
+    write_parquet_dataset(transfers, tmp_path)
+
+    assert parquet_dates(tmp_path) == sorted(transfers["date"].unique())
+    assert sorted(path.name for path in (tmp_path / f"date={parquet_dates(tmp_path)[0]}").iterdir()) == sorted(
+        f"token={token}" for token in transfers["token"].unique()
+    )
+    pd.testing.assert_frame_equal(_normalized(read_parquet_dataset(tmp_path)), _normalized(transfers))
+
+
+def test_filters_prune_partitions(tmp_path, transfers):
+    write_parquet_dataset(transfers, tmp_path)
+    first, *_, last = sorted(transfers["date"].unique())
+    expected = transfers[transfers["token"].isin(["DAI", "USDe"]) & (transfers["date"] > first)]
+
+    read = read_parquet_dataset(tmp_path, tokens=["DAI", "USDe"], start_date=expected["date"].min(), end_date=last)
+    pd.testing.assert_frame_equal(_normalized(read), _normalized(expected))
+
+
+def test_writing_some_partitions_leaves_the_others(tmp_path, transfers):
+    write_parquet_dataset(transfers, tmp_path)
+    first = sorted(transfers["date"].unique())[0]
+    others = partition_stamp(tmp_path, start_date=sorted(transfers["date"].unique())[1])
+
+    day = transfers[transfers["date"] == first]
+    write_parquet_dataset(day.iloc[: len(day) // 2], tmp_path, overwrite=False)
+
+    assert partition_stamp(tmp_path, start_date=sorted(transfers["date"].unique())[1]) == others
+    expected = pd.concat([day.iloc[: len(day) // 2], transfers[transfers["date"] != first]])
+    pd.testing.assert_frame_equal(_normalized(read_parquet_dataset(tmp_path)), _normalized(expected))
+
+
+def test_appends_add_files_next_to_existing_ones(tmp_path, transfers):
+    half = len(transfers) // 2
+    write_parquet_dataset(transfers.iloc[:half], tmp_path, append=True)
+    write_parquet_dataset(transfers.iloc[half:], tmp_path, overwrite=False, append=True)
+    pd.testing.assert_frame_equal(_normalized(read_parquet_dataset(tmp_path)), _normalized(transfers))
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from utils.addresses import decode_addresses
+from utils.columnar_store import read_parquet_dataset, write_parquet_dataset
+from utils.convert_real_data import USDC_CONTRACT, _convert_chunk
+from utils.counterparty_graph import CounterpartyGraphBuilder
+from utils.sanctions_index import SanctionsIndex
+from utils.wallet_registry import WalletRegistry, wallet_labels
+
+SENDER = "0x" + "ab" * 20
+RECIPIENT = "0x" + "cd" * 20
+SANCTIONED = "0x" + "ef" * 20
+
+
+def _raw(from_addresses, to_addresses):
+    n = len(from_addresses)
+    return pd.DataFrame({
+        "block_timestamp": ["2025-11-17 03:12:45 UTC"] * n,
+        "token_address": [USDC_CONTRACT] * n,
+        "from_address": from_addresses,
+        "to_address": to_addresses,
+        "token_amount": np.arange(1, n + 1, dtype=float),
+    })
+
+
+def _sanctions(tmp_path):
+    path = tmp_path / "sanctions.csv"
+    pd.DataFrame({"address": [SANCTIONED]}).to_csv(path, index=False)
+    return SanctionsIndex(path)
+
+
+def test_decode_tolerates_missing_short_and_non_ascii_values():
+    _, valid = decode_addresses(pd.Series([SENDER, None, "0x12", "0x" + "é" * 40, SENDER.upper().replace("0X", "0x")], dtype=object))
+    assert valid.tolist() == [True, False, False, False, True]
+
+
+def test_invalid_senders_are_skipped(tmp_path, capsys):
+    raw = _raw(
+        [SENDER, np.nan, "0x12", "0x" + "é" * 40, SANCTIONED],
+        [RECIPIENT, RECIPIENT, RECIPIENT, RECIPIENT, "not an address"],
+    )
+    registry = WalletRegistry(tmp_path / "registry")
+    graph = CounterpartyGraphBuilder()
+
+    out = _convert_chunk(raw, _sanctions(tmp_path), registry, graph)
+
+    assert "Skipped 3 transfer(s)" in capsys.readouterr().out
+    assert out["tx_volume_usd"].tolist() == [1.0, 5.0]
+    assert out["sanctions_flag"].tolist() == [0, 1]
+    assert out["wallet_id"].notna().all()
+    assert len(registry) == 3
+    # one sender -> recipient pair, stored in both rows
+    assert graph.build(len(registry)).n_edges == 2
+
+
+def test_chunk_without_valid_senders_converts_to_no_rows(tmp_path):
+    raw = _raw([None, "0x"], [RECIPIENT, RECIPIENT])
+    out = _convert_chunk(raw, _sanctions(tmp_path), WalletRegistry(tmp_path / "registry"), None)
+    assert out.empty
+
+
+def test_transfers_with_a_bad_timestamp_are_skipped(tmp_path, capsys):
+    raw = _raw([SENDER, SENDER, SENDER], [RECIPIENT, RECIPIENT, RECIPIENT])
+    raw.loc[1, "block_timestamp"] = "not a time"
+    out = _convert_chunk(raw, _sanctions(tmp_path), WalletRegistry(tmp_path / "registry"), None)
+
+    assert "Skipped 1 transfer(s) with an invalid block timestamp" in capsys.readouterr().out
+    assert out["tx_volume_usd"].tolist() == [1.0, 3.0]
+
+    write_parquet_dataset(out, tmp_path / "store")
+    assert [path.name for path in (tmp_path / "store").iterdir()] == ["date=2025-11-17"]
+    assert len(read_parquet_dataset(tmp_path / "store")) == 2
+
+
+def test_streaming_matches_a_single_pass_across_chunk_boundaries(real_settings):
+    from utils.config import Settings
+    from utils.convert_real_data import convert_raw_to_real_scores, convert_raw_to_real_scores_streaming
+    from utils.counterparty_graph import CounterpartyGraph
+
+    def settings(name):
+        root = real_settings.parquet_dir.parent / name
+        return Settings(**{
+            **vars(real_settings),
+            "real_csv_path": root / "real_scores.csv",
+            "registry_dir": root / "registry",
+            "graph_dir": root / "graph",
+            "systemic_dir": root / "systemic",
+        })
+
+    single, streamed = settings("single"), settings("streamed")
+    convert_raw_to_real_scores(settings=single)
+    # a chunk size that divides nothing, so wallets and blocks straddle chunks
+    stats = convert_raw_to_real_scores_streaming(chunksize=997, settings=streamed)
+
+    # ids follow first sight, which chunking reorders: compare through the addresses
+    one, many = WalletRegistry(single.registry_dir), WalletRegistry(streamed.registry_dir)
+    assert len(many) == len(one)
+    relabel = many.lookup(one.addresses(np.arange(len(one))))
+    expected = pd.read_csv(single.real_csv_path)
+    ids = expected["wallet_id"].str.removeprefix("Wallet ").astype(int) - 1
+    expected["wallet_id"] = wallet_labels(relabel[ids.to_numpy()])
+    assert stats["rows"] == len(expected)
+    pd.testing.assert_frame_equal(pd.read_csv(streamed.real_csv_path), expected)
+
+    graph, streamed_graph = CounterpartyGraph.load(single.graph_dir), CounterpartyGraph.load(streamed.graph_dir)
+    rows = relabel[np.repeat(np.arange(graph.n_nodes), np.diff(graph.indptr))]
+    cols = relabel[graph.indices]
+    order = np.lexsort((cols, rows))
+    np.testing.assert_array_equal(streamed_graph.indptr, np.searchsorted(rows[order], np.arange(graph.n_nodes + 1)))
+    np.testing.assert_array_equal(streamed_graph.indices, cols[order])
+    np.testing.assert_allclose(streamed_graph.weights, np.asarray(graph.weights)[order], rtol=1e-6)
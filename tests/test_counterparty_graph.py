@@ -0,0 +1,36 @@
+import numpy as np
+
+from utils.counterparty_graph import CounterpartyGraph, CounterpartyGraphBuilder
+
+
+def _edges(rng, n, n_nodes):
+    return rng.integers(0, n_nodes, n), rng.integers(0, n_nodes, n), rng.integers(1, 1000, n).astype(float)
+
+
+def test_update_matches_a_rebuild(tmp_path):
+    rng = np.random.default_rng(0)
+    old, new = _edges(rng, 2000, 300), _edges(rng, 500, 350)
+
+    saved = CounterpartyGraph.from_edges(*old, n_nodes=300)
+    saved.save(tmp_path)
+    delta = CounterpartyGraphBuilder()
+    delta.add(*new)
+    updated = CounterpartyGraph.load(tmp_path).update(delta, 350)
+
+    full = CounterpartyGraphBuilder()
+    full.add(*old)
+    full.add(*new)
+    rebuilt = full.build(350)
+
+    np.testing.assert_array_equal(updated.indptr, rebuilt.indptr)
+    np.testing.assert_array_equal(updated.indices, rebuilt.indices)
+    np.testing.assert_allclose(updated.weights, rebuilt.weights, rtol=1e-6)
+
+
+def test_save_keeps_open_memory_maps_valid(tmp_path):
+    rng = np.random.default_rng(1)
+    CounterpartyGraph.from_edges(*_edges(rng, 100, 50), n_nodes=50).save(tmp_path)
+    mapped = CounterpartyGraph.load(tmp_path)
+    before = np.array(mapped.indices)
+    CounterpartyGraph.from_edges(*_edges(rng, 10, 20), n_nodes=20).save(tmp_path)
+    np.testing.assert_array_equal(mapped.indices, before)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.histograms import TokenHistogram
+
+EDGES = np.linspace(0, 100, 11)
+
+
+def _histogram(tokens, values):
+    return TokenHistogram.from_values(pd.Series(tokens), np.asarray(values, dtype=float), EDGES)
+
+
+def test_merged_parts_match_the_whole():
+    rng = np.random.default_rng(0)
+    tokens = rng.choice(["USDC", "DAI", "USDe"], 500)
+    values = rng.uniform(-5, 105, 500)
+    values[::17] = np.nan
+    whole = _histogram(tokens, values)
+
+    merged = _histogram(tokens[:200], values[:200]).merge(_histogram(tokens[200:], values[200:]))
+    for token in whole.tokens:
+        np.testing.assert_array_equal(merged.select([token]).counts, whole.select([token]).counts)
+    assert merged.total().sum() == (~np.isnan(values)).sum()
+
+
+def test_merge_takes_the_union_of_tokens():
+    merged = _histogram(["USDC", "DAI"], [5, 95]) + _histogram(["USDe", "DAI"], [100, 0])
+    assert merged.tokens == ["DAI", "USDC", "USDe"]
+    assert merged.total(["DAI"]).tolist() == [1, 0, 0, 0, 0, 0, 0, 0, 0, 1]
+    assert merged.total(["USDe", "PYUSD"]).tolist() == [0] * 9 + [1]
+
+
+def test_merge_rejects_different_edges():
+    other = TokenHistogram.from_values(pd.Series(["DAI"]), np.array([1.0]), np.linspace(0, 100, 5))
+    with pytest.raises(ValueError):
+        _histogram(["DAI"], [1]).merge(other)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.incremental_scoring import IncrementalRiskScorer
+from utils.public_scoring import _compute_risk_scores_internal
+
+
+def _batches(df: pd.DataFrame, n: int) -> list:
+    """``n`` contiguous, time-ordered slices of ``df``."""
+    bounds = np.linspace(0, len(df), n + 1).astype(int)
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def test_score_rows_matches_batch_scorer(transfers):
+    scorer = IncrementalRiskScorer()
+    for batch in _batches(transfers, 9):
+        scorer.update(batch)
+
+    assert scorer.n_rows == len(transfers)
+    pd.testing.assert_frame_equal(scorer.score_rows(transfers), _compute_risk_scores_internal(transfers))
+
+
+def test_score_rows_of_a_subset(transfers):
+    scorer = IncrementalRiskScorer()
+    for batch in _batches(transfers, 5):
+        scorer.update(batch)
+
+    subset = transfers[transfers["date"] == transfers["date"].max()]
+    expected = _compute_risk_scores_internal(transfers)[(transfers["date"] == transfers["date"].max()).to_numpy()]
+    pd.testing.assert_frame_equal(scorer.score_rows(subset), expected.reset_index(drop=True))
+
+
+def test_update_returns_the_batch_wallets_only(transfers):
+    scorer = IncrementalRiskScorer()
+    batches = _batches(transfers, 6)
+    for batch in batches[:-1]:
+        scorer.update(batch)
+    update = scorer.update(batches[-1])
+
+    assert sorted(update.wallets["wallet_id"]) == sorted(batches[-1]["wallet_id"].unique())
+    assert set(update.maxima) == {"log_volume", "wallet_volume", "tx_per_active_day", "sanctioned_volume", "burst"}
+
+    full = scorer.wallet_scores().set_index("wallet_id").loc[update.wallets["wallet_id"]]
+    pd.testing.assert_frame_equal(update.wallets.set_index("wallet_id"), full)
+
+
+def test_batches_out_of_time_order_are_rejected(transfers):
+    batches = _batches(transfers, 3)
+    scorer = IncrementalRiskScorer()
+    scorer.update(batches[1])
+    with pytest.raises(ValueError):
+        scorer.update(batches[0])
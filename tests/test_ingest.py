@@ -0,0 +1,38 @@
+import pandas as pd
+
+from utils.columnar_store import read_parquet_dataset
+from utils.ingest import IngestState, ingest_raw_exports
+
+
+def test_rows_at_the_watermark_are_ingested_once(real_settings):
+    raw = pd.read_csv(real_settings.raw_path)
+    latest = raw[raw["block_timestamp"] == raw["block_timestamp"].max()]
+    assert len(IngestState.load(real_settings.parquet_dir).watermark_rows) == len(latest)
+
+    # a later export repeats the block's ingested transfers and adds one more
+    extra = latest.iloc[:1].assign(token_amount=latest["token_amount"].iloc[0] + 1)
+    pd.concat([latest, extra]).to_csv(real_settings.raw_dir / "later.csv", index=False)
+    assert ingest_raw_exports(settings=real_settings)["rows"] == 1
+
+    # both now count as ingested at the watermark
+    pd.concat([latest, extra]).to_csv(real_settings.raw_dir / "again.csv", index=False)
+    assert ingest_raw_exports(settings=real_settings)["rows"] == 0
+    assert len(read_parquet_dataset(real_settings.parquet_dir)) == len(raw) + 1
+
+
+def test_a_block_split_across_exports(real_settings):
+    raw = pd.read_csv(real_settings.raw_path).sort_values("block_timestamp", kind="stable", ignore_index=True)
+    sizes = raw.groupby("block_timestamp", sort=False).size()
+    shared = sizes.index[(sizes > 1).to_numpy()]
+    split = shared[len(shared) // 2]
+    first_at_split = raw.index[raw["block_timestamp"] == split][0]
+
+    # start over from an empty store
+    for path in [*real_settings.raw_dir.iterdir(), *real_settings.parquet_dir.rglob("*.*")]:
+        path.unlink()
+    raw.iloc[:first_at_split + 1].to_csv(real_settings.raw_dir / "a.csv", index=False)
+    ingest_raw_exports(settings=real_settings)
+    raw.iloc[first_at_split:].to_csv(real_settings.raw_dir / "b.csv", index=False)
+    ingest_raw_exports(settings=real_settings)
+
+    assert len(read_parquet_dataset(real_settings.parquet_dir)) == len(raw)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.columnar_store import read_parquet_dataset, write_parquet_dataset
+from utils.out_of_core import score_parquet_dataset
+from utils.public_scoring import compute_public_risk_scores
+
+
+@pytest.fixture
+def store(tmp_path, transfers):
+    root = tmp_path / "store"
+    write_parquet_dataset(transfers, root)
+    return root
+
+
+def test_matches_in_memory_scorer(store, tmp_path):
+    kpis = score_parquet_dataset(store, tmp_path / "out")
+    expected = compute_public_risk_scores(read_parquet_dataset(store), compact=True)
+
+    wallets = pd.read_parquet(tmp_path / "out" / "wallets.parquet").set_index("Wallet").sort_index()
+    reference = expected.wallets.set_index(expected.wallets["Wallet"].astype(str)).drop(columns="Wallet").sort_index()
+    assert wallets.columns.tolist() == reference.columns.tolist()
+    np.testing.assert_allclose(wallets.to_numpy(float), reference.to_numpy(float), rtol=1e-6, atol=1e-4)
+
+    # the store reads back in the same (date, token) order as it was scored
+    scored = pd.read_parquet(tmp_path / "out" / "transactions")
+    np.testing.assert_array_equal(scored["Risk Score"], expected.transactions["Risk Score"])
+    assert kpis["transactions"] == len(expected)
+    assert kpis["unique_wallets"] == expected.rollups.kpis["unique_wallets"]
+
+
+def test_rescoring_drops_partitions_of_an_earlier_run(store, tmp_path, transfers):
+    out = tmp_path / "out"
+    score_parquet_dataset(store, out)
+    last = sorted(transfers["date"].unique())[-1]
+    score_parquet_dataset(store, out, start_date=last)
+
+    assert [path.name for path in (out / "transactions").iterdir()] == [f"date={last}"]
+    assert [path.name for path in out.iterdir() if path.name.startswith(".")] == []
+
+
+def test_rows_without_a_wallet(tmp_path, transfers):
+    df = transfers.copy()
+    df.loc[df.index[::40], "wallet_id"] = np.nan
+    write_parquet_dataset(df, tmp_path / "store")
+    score_parquet_dataset(tmp_path / "store", tmp_path / "out")
+
+    scored = pd.read_parquet(tmp_path / "out" / "transactions")
+    missing = scored["Wallet"].isna().to_numpy()
+    assert missing.sum() == df["wallet_id"].isna().sum()
+    assert np.isnan(scored["Risk Score"].to_numpy()[missing]).all()
+    assert not np.isnan(scored["Risk Score"].to_numpy()[~missing]).any()
+
+
+def test_mean_risk_leaves_out_rows_without_a_wallet(tmp_path, transfers):
+    df = transfers.copy()
+    df.loc[df.index[::40], "wallet_id"] = np.nan
+    write_parquet_dataset(df, tmp_path / "store")
+    kpis = score_parquet_dataset(tmp_path / "store", tmp_path / "out")
+
+    expected = compute_public_risk_scores(read_parquet_dataset(tmp_path / "store"), compact=True).rollups.kpis
+    assert kpis["scored_transactions"] == expected["scored_transactions"] == df["wallet_id"].notna().sum()
+    assert kpis["mean_risk"] == pytest.approx(expected["mean_risk"])
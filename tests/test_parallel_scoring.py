@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from utils.parallel_scoring import compute_risk_scores_parallel, shard_by_wallet
+from utils.public_scoring import _compute_risk_scores_internal
+
+
+def test_matches_serial_scorer(transfers):
+    # a shuffled, non-default index checks that row order and index survive
+    df = transfers.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(
+        compute_risk_scores_parallel(df, n_jobs=2, n_shards=3), _compute_risk_scores_internal(df)
+    )
+
+
+def test_rows_without_a_wallet(transfers):
+    df = transfers.copy()
+    df.loc[df.index[::40], "wallet_id"] = np.nan
+    pd.testing.assert_frame_equal(
+        compute_risk_scores_parallel(df, n_jobs=2), _compute_risk_scores_internal(df)
+    )
+
+
+def test_every_wallet_lives_in_one_shard(transfers):
+    shard = shard_by_wallet(transfers["wallet_id"], 4)
+    assert (pd.Series(shard).groupby(transfers["wallet_id"].to_numpy()).nunique() == 1).all()
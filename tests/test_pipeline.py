@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from utils import pipeline
+from utils.counterparty_graph import CounterpartyGraph, CounterpartyGraphBuilder
+from utils.public_scoring import compute_public_risk_scores
+
+
+def _expected(settings):
+    df = pipeline.read_dataset("real", settings=settings)
+    return compute_public_risk_scores(df, compact=True, exposure=pipeline.load_wallet_exposure(settings))
+
+
+def _assert_scores_close(scores, expected):
+    assert scores.wallets.columns.tolist() == expected.wallets.columns.tolist()
+    np.testing.assert_allclose(
+        scores.wallets.iloc[:, 1:].to_numpy(float), expected.wallets.iloc[:, 1:].to_numpy(float), atol=1e-3
+    )
+    np.testing.assert_allclose(
+        scores.transactions["Risk Score"], expected.transactions["Risk Score"], atol=1e-3
+    )
+
+
+def test_real_scores_include_exposure(real_settings):
+    scores = pipeline.score("real", settings=real_settings)
+    assert "Exposure Score" in scores.wallets.columns
+    _assert_scores_close(scores, _expected(real_settings))
+
+
+def test_graph_update_refreshes_exposure_without_rescoring_rows(real_settings, monkeypatch):
+    before = pipeline.score("real", settings=real_settings)
+
+    graph = CounterpartyGraph.load(real_settings.graph_dir, mmap=False)
+    delta = CounterpartyGraphBuilder()
+    # tie every wallet to a sanctioned one (registry id 0 sent the first listed transfer)
+    delta.add(np.zeros(graph.n_nodes - 1, dtype=np.int64), np.arange(1, graph.n_nodes), np.full(graph.n_nodes - 1, 1e9))
+    graph.update(delta, graph.n_nodes).save(real_settings.graph_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("rows were re-scored")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pipeline, "compute_public_risk_scores", fail)
+        after = pipeline.score("real", settings=real_settings)
+
+    assert (after.wallets["Exposure Score"] > before.wallets["Exposure Score"]).any()
+    assert after.version != before.version
+    _assert_scores_close(after, _expected(real_settings))
+
+
+def test_frame_sizes_are_recorded_on_a_miss_only(real_settings, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(pipeline.INSTRUMENTS, "frame_size", lambda name, df: recorded.append(name))
+    pipeline.score("real", settings=real_settings)
+    assert sorted(recorded) == ["scores.real.transactions", "scores.real.wallets"]
+
+    recorded.clear()
+    pipeline.score("real", settings=real_settings)
+    assert recorded == []
@@ -0,0 +1,22 @@
+import numpy as np
+
+from utils.public_scoring import (
+    _compute_compact_scores_internal,
+    _compute_risk_scores_internal,
+    _gather_wallet_values,
+)
+
+
+def test_rows_without_a_wallet_gather_nan():
+    values = np.array([10.0, 20.0, 30.0])
+    gathered = _gather_wallet_values(values, np.array([2, -1, 0, -1]))
+    np.testing.assert_array_equal(gathered, [30.0, np.nan, 10.0, np.nan])
+
+
+def test_compact_frame_matches_wide_frame_for_rows_without_a_wallet(transfers):
+    df = transfers.copy()
+    df.loc[df.index[::50], "wallet_id"] = np.nan
+    wide = _compute_risk_scores_internal(df)
+    compact = _compute_compact_scores_internal(df).to_frame()
+    for column in ["Concentration Score", "Velocity Score", "Time Score", "Risk Score"]:
+        np.testing.assert_allclose(compact[column], wide[column], rtol=1e-6)
@@ -0,0 +1,42 @@
+import threading
+
+from utils.refresh import RefreshScheduler
+
+
+def test_a_slow_load_does_not_block_other_datasets():
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        assert release.wait(timeout=10)
+        return "slow"
+
+    scheduler = RefreshScheduler(
+        {"slow": (lambda: 1, slow), "fast": (lambda: 1, lambda: "fast")}, interval=3600
+    )
+    loader = threading.Thread(target=scheduler.get, args=("slow",))
+    loader.start()
+    assert started.wait(timeout=10)
+    try:
+        assert scheduler.get("fast") == "fast"
+    finally:
+        release.set()
+        loader.join(timeout=10)
+    assert scheduler.get("slow") == "slow"
+
+
+def test_changed_inputs_are_reloaded():
+    stamps = iter([1, 1, 2, 2])
+    loads = []
+
+    def load():
+        loads.append(len(loads))
+        return len(loads)
+
+    scheduler = RefreshScheduler({"data": (lambda: next(stamps), load)}, interval=3600)
+    assert scheduler.get("data") == 1
+    scheduler._refresh_stale()
+    assert scheduler.get("data") == 1
+    scheduler._refresh_stale()
+    assert scheduler.get("data") == 2
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from utils import sanctions_index
+from utils.sanctions_index import SANCTIONS_ENV_VAR, sanctions_list_path
+
+
+@pytest.fixture
+def secrets(tmp_path, monkeypatch):
+    """Project and user-level secrets files under ``tmp_path``, with the CWD in the project."""
+    project = tmp_path / "project"
+    user = tmp_path / "home" / ".streamlit" / "secrets.toml"
+    (project / ".streamlit").mkdir(parents=True)
+    user.parent.mkdir(parents=True)
+    monkeypatch.chdir(project)
+    monkeypatch.delenv(SANCTIONS_ENV_VAR, raising=False)
+    monkeypatch.setattr(sanctions_index, "SECRETS_PATHS", (Path(".streamlit") / "secrets.toml", user))
+    return project / ".streamlit" / "secrets.toml", user
+
+
+def _configure(path: Path, file_path: str) -> None:
+    path.write_text(f'[sanctions]\nfile_path = "{file_path}"\n')
+
+
+def test_user_level_secrets_are_read(secrets):
+    _, user = secrets
+    _configure(user, "/lists/sanctions.csv")
+    assert sanctions_list_path() == Path("/lists/sanctions.csv")
+
+
+def test_project_secrets_win_and_stay_relative_to_the_cwd(secrets):
+    project, user = secrets
+    _configure(project, "data/sanctions.csv")
+    _configure(user, "/lists/sanctions.csv")
+    assert sanctions_list_path() == Path("data/sanctions.csv")
+
+
+def test_environment_overrides_secrets(secrets, monkeypatch):
+    _configure(secrets[0], "data/sanctions.csv")
+    monkeypatch.setenv(SANCTIONS_ENV_VAR, "/env/sanctions.csv")
+    assert sanctions_list_path() == Path("/env/sanctions.csv")
+
+
+def test_unconfigured_raises(secrets):
+    with pytest.raises(KeyError):
+        sanctions_list_path()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from utils.wallet_ranking import WalletRanking
+
+
+def _wallets(values):
+    return pd.DataFrame({
+        "Wallet": [f"Wallet {i + 1}" for i in range(len(values))],
+        "Average Risk": values,
+        "Total Volume": np.arange(len(values), dtype=float),
+        "Sanctioned Volume": np.zeros(len(values)),
+    })
+
+
+def _sorted(values):
+    """Positions in the order of a stable descending sort, missing values last."""
+    values = pd.Series(values)
+    return values.sort_values(ascending=False, kind="stable", na_position="last").index.to_numpy()
+
+
+def test_ties_rank_by_wallet_code_and_missing_values_last():
+    values = [5.0, np.nan, 7.0, 5.0, 7.0, 5.0, np.nan, 1.0]
+    ranking = WalletRanking(_wallets(values))
+    assert ranking.top("Average Risk", 8).index.tolist() == [2, 4, 0, 3, 5, 7, 1, 6]
+    # a cut through a run of ties keeps the lowest codes
+    assert ranking.top("Average Risk", 3).index.tolist() == [2, 4, 0]
+
+
+def test_pages_past_the_ranked_prefix_match_a_full_sort():
+    rng = np.random.default_rng(0)
+    # few distinct values, so ties straddle every prefix depth
+    values = rng.integers(0, 20, 1000).astype(float)
+    values[rng.choice(1000, 50, replace=False)] = np.nan
+    ranking = WalletRanking(_wallets(values))
+
+    pages = [ranking.page("Average Risk", page, 70).index.to_numpy() for page in range(1, ranking.pages("Average Risk", 70) + 1)]
+    np.testing.assert_array_equal(np.concatenate(pages), _sorted(values))
+
+
+def test_positive_ranking_leaves_out_zero_values():
+    wallets = _wallets([0.0, 3.0, 0.0, 3.0, 1.0])
+    wallets["Sanctioned Volume"] = wallets["Average Risk"]
+    ranking = WalletRanking(wallets)
+    assert ranking.count("Sanctioned Volume", positive=True) == 3
+    assert ranking.top("Sanctioned Volume", 10, positive=True).index.tolist() == [1, 3, 4]
@@ -0,0 +1,62 @@
+import numpy as np
+
+from utils.wallet_registry import WalletRegistry, wallet_labels
+
+
+def _addresses(n, prefix=""):
+    return np.array([f"0x{prefix}{i:0{40 - len(prefix)}x}" for i in range(n)])
+
+
+def test_ids_survive_a_reload(tmp_path):
+    registry = WalletRegistry(tmp_path)
+    first = _addresses(50)
+    ids = registry.get_or_create(first[::-1])
+    assert ids.tolist() == list(range(50))
+    registry.flush()
+
+    reloaded = WalletRegistry(tmp_path)
+    assert len(reloaded) == 50
+    assert reloaded.lookup(first[::-1]).tolist() == ids.tolist()
+    # new wallets continue after the stored ones; known ones keep their ids
+    more = _addresses(60)[45:]
+    assert reloaded.get_or_create(more).tolist() == [4, 3, 2, 1, 0] + list(range(50, 60))
+    assert reloaded.addresses([50, 0]).tolist() == [more[5], first[-1]]
+
+
+def test_unflushed_ids_are_not_persisted(tmp_path):
+    registry = WalletRegistry(tmp_path)
+    registry.get_or_create(_addresses(3))
+    registry.flush()
+    registry.get_or_create(_addresses(5))
+
+    reloaded = WalletRegistry(tmp_path)
+    assert len(reloaded) == 3
+    assert reloaded.lookup(_addresses(5)).tolist() == [0, 1, 2, -1, -1]
+
+
+def test_addresses_sharing_a_key_prefix_get_their_own_ids(tmp_path):
+    # the same leading 8 bytes, so lookups fall back to the full 20-byte key
+    addresses = _addresses(20, prefix="ab" * 8)
+    registry = WalletRegistry(tmp_path)
+    ids = registry.get_or_create(addresses)
+    assert len(np.unique(ids)) == 20
+    registry.flush()
+
+    reloaded = WalletRegistry(tmp_path)
+    assert reloaded.lookup(addresses[::-1]).tolist() == ids[::-1].tolist()
+    assert reloaded.lookup(_addresses(1, prefix="ab" * 8 + "f")).tolist() == [-1]
+    assert reloaded.addresses(ids).tolist() == addresses.tolist()
+
+
+def test_a_stale_index_is_rebuilt(tmp_path):
+    registry = WalletRegistry(tmp_path)
+    ids = registry.get_or_create(_addresses(10))
+    registry.flush()
+    # as left by a flush interrupted after the addresses were appended
+    (tmp_path / "sorted_keys.bin").write_bytes(b"")
+
+    assert WalletRegistry(tmp_path).lookup(_addresses(10)).tolist() == ids.tolist()
+
+
+def test_labels_are_one_based():
+    assert wallet_labels([0, 41]).tolist() == ["Wallet 1", "Wallet 42"]
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from utils.public_scoring import _compute_compact_scores_internal, _compute_risk_scores_internal
+from utils.wallet_stats import wallet_statistics
+
+
+def _with_missing_wallets(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df.loc[df.index[::50], "wallet_id"] = np.nan
+    return df
+
+
+def test_rows_without_a_wallet_are_left_out_of_wallet_statistics(transfers):
+    df = _with_missing_wallets(transfers)
+    expected = wallet_statistics(df.dropna(subset=["wallet_id"]).reset_index(drop=True))
+    pd.testing.assert_frame_equal(wallet_statistics(df), expected)
+
+
+def test_rows_without_a_wallet_score_nan(transfers):
+    df = _with_missing_wallets(transfers)
+    missing = df["wallet_id"].isna().to_numpy()
+
+    wide = _compute_risk_scores_internal(df)
+    assert wide.loc[missing, ["Concentration Score", "Burst Score", "Risk Score"]].isna().all().all()
+    assert wide.loc[~missing, "Risk Score"].notna().all()
+
+    compact = _compute_compact_scores_internal(df)
+    risk = compact.transactions["Risk Score"].to_numpy()
+    assert np.isnan(risk[missing]).all()
+    np.testing.assert_allclose(risk[~missing], wide.loc[~missing, "Risk Score"], rtol=1e-6)
+    assert compact.rollups.kpis["unique_wallets"] == df["wallet_id"].nunique()
+    assert np.isfinite(compact.rollups.kpis["mean_risk"])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.incremental_scoring import IncrementalRiskScorer
+from utils.parallel_scoring import compute_risk_scores_parallel
+from utils.public_scoring import _compute_risk_scores_internal, compute_public_risk_scores
+from utils.scoring_weights import DEFAULT_WEIGHTS, ScoringWeights
+from utils.what_if import ScoreComponents, rescore, with_exposure
+
+
+@pytest.fixture
+def weights():
+    data = DEFAULT_WEIGHTS.to_dict()
+    data["weights"] = {name: weight * (1 + i) for i, (name, weight) in enumerate(data["weights"].items())}
+    data["exposure_weight"] = 0.4
+    data["sanctions_log_factor"] = 0.2
+    data["token_baseline"] = {**data["token_baseline"], "DAI": 90.0}
+    return ScoringWeights.from_dict(data)
+
+
+@pytest.fixture
+def exposure(transfers):
+    wallets = transfers["wallet_id"].drop_duplicates().iloc[::7]
+    return pd.Series(np.linspace(0.05, 1, len(wallets)), index=wallets.to_numpy())
+
+
+def test_rescore_matches_scoring_with_the_weights(transfers, weights, exposure):
+    scores = compute_public_risk_scores(transfers, compact=True, exposure=exposure)
+    expected = compute_public_risk_scores(transfers, compact=True, exposure=exposure, weights=weights)
+    rescored = rescore(scores, weights)
+
+    np.testing.assert_allclose(rescored.transactions["Risk Score"], expected.transactions["Risk Score"], atol=1e-3)
+    for column in ["Average Risk", "Max Risk"]:
+        np.testing.assert_allclose(rescored.wallets[column], expected.wallets[column], atol=1e-3)
+    assert rescored.rollups.kpis["mean_risk"] == pytest.approx(expected.rollups.kpis["mean_risk"], abs=1e-3)
+    assert rescored.version != scores.version
+
+
+def test_with_exposure_matches_scoring_with_exposure(transfers, exposure):
+    expected = compute_public_risk_scores(transfers, compact=True, exposure=exposure)
+    added = with_exposure(compute_public_risk_scores(transfers, compact=True), exposure)
+
+    assert added.wallets.columns.tolist() == expected.wallets.columns.tolist()
+    np.testing.assert_allclose(added.transactions["Risk Score"], expected.transactions["Risk Score"], atol=1e-3)
+
+
+def test_rows_without_a_wallet_get_nan_risk(transfers, weights):
+    df = transfers.copy()
+    df.loc[df.index[::50], "wallet_id"] = np.nan
+    components = ScoreComponents(compute_public_risk_scores(df, compact=True))
+    risk = components.risk(weights)
+    missing = df["wallet_id"].isna().to_numpy()
+    assert np.isnan(risk[missing]).all() and not np.isnan(risk[~missing]).any()
+    assert np.isfinite(components.rescore(weights).rollups.kpis["mean_risk"])
+
+
+def test_parallel_and_incremental_scorers_use_the_weights(transfers, weights, exposure):
+    expected = _compute_risk_scores_internal(transfers, exposure, weights)
+    pd.testing.assert_frame_equal(
+        compute_risk_scores_parallel(transfers, n_jobs=2, exposure=exposure, weights=weights), expected
+    )
+
+    scorer = IncrementalRiskScorer(exposure, weights)
+    scorer.update(transfers)
+    pd.testing.assert_frame_equal(scorer.score_rows(transfers), expected)
@@ -0,0 +1,128 @@
+"""Vectorized helpers for Ethereum addresses."""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+ADDRESS_BYTES = 20
+_ADDRESS_CHARS = 2 + 2 * ADDRESS_BYTES  # "0x" + 40 hex digits
+KEY_DTYPE = np.dtype(f"S{ADDRESS_BYTES}")
+
+# ASCII byte -> nibble value, 255 for non-hex characters (both cases accepted)
+_HEX_LUT = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(b"0123456789abcdef"):
+    _HEX_LUT[_c] = _i
+for _i, _c in enumerate(b"ABCDEF"):
+    _HEX_LUT[_c] = 10 + _i
+
+
+def address_keys(addresses) -> np.ndarray:
+    """
+    Decode ``0x``-prefixed hex addresses into fixed 20-byte binary keys.
+
+    Decoding is case-insensitive, so keys double as normalized (lowercase)
+    addresses. Raises ValueError on anything that is not a 42-character hex
+    address.
+    """
+    keys, valid = decode_addresses(addresses)
+    if not valid.all():
+        bad = ~valid
+        raise ValueError(
+            f"{int(bad.sum()):,} value(s) are not 0x-prefixed 40-digit hex addresses, "
+            f"e.g. {np.asarray(addresses, dtype=object)[bad][0]!r}"
+        )
+    return keys
+
+
+def _address_bytes(addresses):
+    """
+    ASCII bytes of each value as an (n, 42) uint8 matrix, plus a mask of the
+    values that are exactly 42 characters long (shorter ones are NUL-padded).
+
+    Arrow-backed string columns (pandas' default string dtype) whose values
+    all have the address length are viewed in place, without materializing
+    Python strings.
+    """
+    arrow = _arrow_strings(addresses)
+    if arrow is not None:
+        n = len(arrow)
+        width = _ADDRESS_CHARS
+        offsets = np.frombuffer(
+            arrow.buffers()[1],
+            dtype=np.int64 if pa.types.is_large_string(arrow.type) else np.int32,
+        )[arrow.offset:arrow.offset + n + 1]
+        if arrow.null_count == 0 and (np.diff(offsets) == width).all():
+            data = np.frombuffer(arrow.buffers()[2], dtype=np.uint8)
+            return data[offsets[0]:offsets[0] + n * width].reshape(n, width), np.ones(n, dtype=bool)
+
+    text = np.asarray(addresses, dtype=object)
+    try:
+        # One spare byte catches over-long values
+        raw = text.astype(f"S{_ADDRESS_CHARS + 1}")
+    except UnicodeEncodeError:
+        # non-ASCII values cannot be addresses; blank them so they fail validation
+        ascii_only = np.array([not isinstance(value, str) or value.isascii() for value in text], dtype=bool)
+        raw = np.where(ascii_only, text, "").astype(f"S{_ADDRESS_CHARS + 1}")
+    raw = raw.view(np.uint8).reshape(-1, _ADDRESS_CHARS + 1)
+    return raw[:, :_ADDRESS_CHARS], raw[:, _ADDRESS_CHARS] == 0
+
+
+def _arrow_strings(addresses):
+    """The single-chunk Arrow string array behind a pandas string column, if any."""
+    dtype = getattr(addresses, "dtype", None)
+    arrow_backed = (
+        isinstance(dtype, pd.StringDtype) and dtype.storage == "pyarrow"
+    ) or (isinstance(dtype, pd.ArrowDtype) and pa.types.is_string(dtype.pyarrow_dtype))
+    if not arrow_backed:
+        return None
+    arrow = pa.array(addresses)
+    if isinstance(arrow, pa.ChunkedArray):
+        arrow = arrow.combine_chunks()
+    if not (pa.types.is_string(arrow.type) or pa.types.is_large_string(arrow.type)):
+        return None
+    return arrow
+
+
+def decode_addresses(addresses):
+    """
+    Like ``address_keys``, but tolerant: returns ``(keys, valid)`` where
+    invalid or missing values get an all-zero key and ``valid`` False.
+    """
+    raw, length_ok = _address_bytes(addresses)
+    if len(raw) == 0:
+        return np.zeros(0, dtype=KEY_DTYPE), np.zeros(0, dtype=bool)
+
+    bad = ~length_ok | (raw[:, 0] != ord("0")) | ((raw[:, 1] | 0x20) != ord("x"))
+    nibbles = _HEX_LUT[raw[:, 2:42]]
+    bad |= (nibbles == 255).any(axis=1)
+    nibbles[bad] = 0
+
+    packed = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+    return np.ascontiguousarray(packed).view(KEY_DTYPE).ravel(), ~bad
+
+
+def address_prefixes(addresses, n_digits: int = 16) -> np.ndarray:
+    """
+    Integer value of the first ``n_digits`` (up to 16) hex digits of each
+    address; with 16 digits this equals ``key_prefix`` of its key.
+
+    Much cheaper than a full decode, but not validated: use it to find
+    candidates, then confirm those with ``decode_addresses``.
+    """
+    raw, _ = _address_bytes(addresses)
+    prefix = np.zeros(len(raw), dtype=np.uint64)
+    for column in range(2, 2 + n_digits):
+        prefix <<= np.uint64(4)
+        prefix |= (_HEX_LUT[raw[:, column]] & 0x0F).astype(np.uint64)
+    return prefix
+
+
+def key_prefix(keys: np.ndarray) -> np.ndarray:
+    """First 8 bytes of each key as an unsigned integer (orders like the key)."""
+    raw = np.asarray(keys, dtype=KEY_DTYPE).view(np.uint8).reshape(-1, ADDRESS_BYTES)
+    return np.ascontiguousarray(raw[:, :8]).view(">u8").ravel().astype(np.uint64)
+
+
+def keys_to_addresses(keys: np.ndarray) -> np.ndarray:
+    """Encode binary keys back into lowercase ``0x`` hex strings."""
+    raw = np.ascontiguousarray(keys, dtype=KEY_DTYPE).view(np.uint8).reshape(-1, ADDRESS_BYTES)
+    return np.array(["0x" + row.tobytes().hex() for row in raw], dtype=object)
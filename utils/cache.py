@@ -0,0 +1,207 @@
+"""Result caches of the headless pipeline and the dashboard."""
+import hashlib
+import os
+import pickle
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from utils.instrumentation import INSTRUMENTS
+
+
+class NullCache:
+    """Caches nothing: every call recomputes."""
+
+    def get(self, key: str, default=None):
+        return default
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def get_or_compute(self, key: str, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        INSTRUMENTS.cache_request(f"pipeline.{type(self).__name__}", misses=int(value is missing))
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+
+class MemoryCache(NullCache):
+    """In-process LRU cache of the most recent ``max_entries`` results."""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key: str, default=None):
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: str, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class DiskCache(NullCache):
+    """
+    Results stored in a directory, shared by every process and replica using it.
+
+    Each entry is a directory named by its (content-addressed) key: numeric
+    arrays of at least ``MMAP_MIN_BYTES`` are saved as ``.npy`` files and
+    loaded memory-mapped, so processes reading the same entry share its
+    pages instead of each holding a private copy; the rest of the object is
+    pickled. Entries are written aside and renamed into place, so
+    concurrent workers never read a partial entry.
+
+    Reads refresh an entry's mtime, and writes evict the least recently
+    used entries until the directory fits in ``max_bytes``.
+    """
+
+    MMAP_MIN_BYTES = 64 * 1024
+
+    def __init__(self, path: Path, max_bytes: int = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str, default=None):
+        entry = self.path / key
+        try:
+            with open(entry / "object.pkl", "rb") as f:
+                value = _ArrayUnpickler(f, entry).load()
+            os.utime(entry)
+        except (FileNotFoundError, EOFError, ValueError, pickle.UnpicklingError):
+            return default
+        return value
+
+    def set(self, key: str, value) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry = self.path / key
+        tmp = self.path / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        with open(tmp / "object.pkl", "wb") as f:
+            _ArrayPickler(f, tmp, self.MMAP_MIN_BYTES).dump(value)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # another process stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes, keep=key)
+
+    def get_or_compute(self, key: str, compute):
+        missing = object()
+        value = self.get(key, missing)
+        INSTRUMENTS.cache_request(f"pipeline.{type(self).__name__}", misses=int(value is missing))
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+            # hand back the mapped copy so this process shares pages too
+            value = self.get(key, value)
+        return value
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def evict(self, max_bytes: int, keep: str = None) -> None:
+        """Drop least recently used entries (except ``keep``) until the cache fits in ``max_bytes``."""
+        entries = []
+        for entry in self._entries():
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime_ns, size, entry))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            # open memory maps survive the unlink
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def _entries(self) -> list:
+        if not self.path.exists():
+            return []
+        return [entry for entry in self.path.iterdir() if entry.is_dir() and not entry.name.startswith(".")]
+
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickler writing large numeric arrays to ``.npy`` files beside the pickle."""
+
+    def __init__(self, file, directory: Path, min_bytes: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.min_bytes = min_bytes
+        self.arrays = 0
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray or obj.dtype.hasobject or obj.nbytes < self.min_bytes:
+            return None
+        name = f"{self.arrays}.npy"
+        np.save(self.directory / name, obj, allow_pickle=False)
+        self.arrays += 1
+        return name
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    def __init__(self, file, directory: Path):
+        super().__init__(file)
+        self.directory = directory
+
+    def persistent_load(self, name):
+        # a plain read-only ndarray view; it keeps the map open
+        return np.asarray(np.load(self.directory / name, mmap_mode="r"))
+
+
+def make_cache(settings) -> NullCache:
+    """The cache backend configured in ``settings``."""
+    if settings.cache_backend == "disk":
+        return DiskCache(settings.cache_dir, settings.cache_max_mb * 1024 * 1024)
+    if settings.cache_backend == "memory":
+        return MemoryCache()
+    return NullCache()
+
+
+def cache_key(*parts) -> str:
+    """Stable key from reprs of the parts (paths, stats, arguments)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_stamp(path: Path):
+    """(path, size, mtime) of a file, or of the newest file under a directory."""
+    path = Path(path)
+    if not path.exists():
+        return (str(path), None)
+    if path.is_dir():
+        files = [entry.stat() for entry in path.rglob("*") if entry.is_file()]
+        return (
+            str(path),
+            len(files),
+            sum(stat.st_size for stat in files),
+            max((stat.st_mtime_ns for stat in files), default=0),
+        )
+    stat = path.stat()
+    return (str(path), stat.st_size, stat.st_mtime_ns)
@@ -2,28 +2,53 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+from utils.compact_scores import CompactScores, HASH_FUNCS
+from utils.downsampling import minmax_downsample
+from utils.instrumentation import instrument_cache
 
+# Points per token in the volume chart: about one min/max pair per pixel
+# column of a full-width chart.
+VOLUME_CHART_BUCKETS = 1000
 
-@st.cache_data
-def create_volume_time_chart(df: pd.DataFrame):
-	"""Create volume time series chart with caching."""
-	daily = df.groupby(["Date", "Hour", "Token"], as_index=False)["Volume"].sum()
-	fig = px.line(
-		daily,
-		x="Hour",
-		y="Volume",
-		color="Token",
-		line_group="Date",
-		markers=False,
+
+@instrument_cache(st.cache_data(hash_funcs=HASH_FUNCS))
+def create_volume_time_chart(scores: CompactScores, start_date=None, end_date=None):
+	"""
+	Create the hourly volume time series from the Date × Hour × Token rollup.
+
+	Each token is one WebGL line. Over a range longer than
+	``VOLUME_CHART_BUCKETS`` hours the series is min/max downsampled, so a
+	narrower date range shows finer detail.
+	"""
+	volume = scores.rollups.volume
+	if start_date is not None:
+		volume = volume[volume["Date"].astype(str) >= str(start_date)]
+	if end_date is not None:
+		volume = volume[volume["Date"].astype(str) <= str(end_date)]
+
+	# hours run 1–24; hours without transfers have zero volume
+	times = pd.to_datetime(volume["Date"].astype(str), format="%Y-%m-%d") + pd.to_timedelta(
+		volume["Hour"].astype(int) - 1, unit="h"
+	)
+	series = volume.assign(Time=times.to_numpy()).pivot_table(
+		index="Time", columns="Token", values="Volume", aggfunc="sum", observed=True
 	)
+	if not series.empty:
+		series = series.reindex(pd.date_range(series.index.min(), series.index.max(), freq="h")).fillna(0)
+
+	fig = go.Figure()
+	for token in series.columns:
+		x, y = minmax_downsample(series.index.to_numpy(), series[token].to_numpy(), VOLUME_CHART_BUCKETS)
+		fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=str(token)))
+	fig.update_layout(xaxis_title="Time (UTC)", yaxis_title="Volume", legend_title_text="Token")
 	return fig
 
 
-@st.cache_data
-def create_token_volume_chart(df: pd.DataFrame):
-	"""Create token volume bar chart with caching."""
-	vol_token = df.groupby("Token", as_index=False)["Volume"].sum()
-	vol_token = vol_token.sort_values("Volume", ascending=True)
+@instrument_cache(st.cache_data(hash_funcs=HASH_FUNCS))
+def create_token_volume_chart(scores: CompactScores):
+	"""Create token volume bar chart from the per-token rollup."""
+	vol_token = scores.rollups.tokens[["Token", "Volume"]].sort_values("Volume", ascending=True)
 	fig = px.bar(
 		vol_token,
 		x="Volume",
@@ -35,45 +60,75 @@ def create_token_volume_chart(df: pd.DataFrame):
 	return fig
 
 
-@st.cache_data
-def create_risk_histogram(df: pd.DataFrame, tokens: tuple):
-	"""Create risk score histogram with caching - using pre-binned data for performance."""
-	filtered_df = df[df["Token"].isin(tokens)]
-	
-	# Pre-bin the data to reduce plotly processing time
-	bins = pd.cut(filtered_df["Risk Score"], bins=30, include_lowest=True)
-	hist_data = (
-		filtered_df.groupby([bins, "Token"], observed=True)
-		.size()
-		.reset_index(name="count")
-	)
-	hist_data["Risk Score"] = hist_data["Risk Score"].apply(lambda x: x.mid)
-	
-	fig = px.bar(
-		hist_data,
-		x="Risk Score",
-		y="count",
-		color="Token",
+@instrument_cache(st.cache_data(hash_funcs=HASH_FUNCS))
+def create_risk_histogram(scores: CompactScores, tokens: tuple):
+	"""Create risk score histogram from the pre-binned per-token counts."""
+	hist = scores.rollups.risk_histogram
+	hist = hist.select([token for token in hist.tokens if token in tokens])
+
+	fig = go.Figure()
+	for token, counts in zip(hist.tokens, hist.counts):
+		fig.add_trace(go.Bar(x=hist.centers, y=counts, name=str(token), opacity=0.6))
+	fig.update_layout(
 		barmode="overlay",
-		opacity=0.6,
-		labels={"count": "Count", "Risk Score": "Public risk score"},
+		bargap=0,
+		xaxis_title="Public risk score",
+		yaxis_title="Count",
+		legend_title_text="Token",
 	)
 	return fig
 
 
-@st.cache_data
-def get_component_scores(df: pd.DataFrame, tokens: tuple) -> pd.DataFrame:
+@instrument_cache(st.cache_data(hash_funcs=HASH_FUNCS))
+def get_component_scores(scores: CompactScores, tokens: tuple) -> pd.DataFrame:
 	"""Compute average component scores by token with caching."""
-	filtered_df = df[df["Token"].isin(tokens)]
-	return filtered_df.groupby("Token", as_index=False)[
-		[
-			"Volume Score",
-			"Token Score",
-			"Concentration Score",
-			"Velocity Score",
-			"Sanctions Score",
-			"Burst Score",
-			"Time Score",
-			"Risk Score",
-		]
-	].mean()
+	mask = scores.transactions["Token"].isin(tokens).to_numpy()
+	columns = [
+		"Token",
+		"Volume Score",
+		"Token Score",
+		*scores.score_columns,
+		"Risk Score",
+	]
+	# wallet-level components are joined onto the selected rows only
+	filtered_df = pd.DataFrame({name: scores.column(name).to_numpy()[mask] for name in columns})
+	return filtered_df.groupby("Token", as_index=False, observed=True)[columns[1:]].mean()
+
+
+@instrument_cache(st.cache_data)
+def create_concentration_chart(concentration: pd.DataFrame, metric: str):
+	"""Create per-token wallet concentration (HHI or Gini) chart over dates."""
+	fig = px.line(
+		concentration,
+		x="Date",
+		y=metric,
+		color="Token",
+		markers=True,
+	)
+	return fig
+
+
+@instrument_cache(st.cache_data)
+def create_correlation_heatmap(matrix: pd.DataFrame):
+	"""Create token × token volume correlation heatmap."""
+	fig = px.imshow(
+		matrix,
+		zmin=-1,
+		zmax=1,
+		color_continuous_scale="RdBu",
+		text_auto=".2f",
+		labels={"color": "Correlation"},
+	)
+	return fig
+
+
+@instrument_cache(st.cache_data)
+def create_exposure_heatmap(heatmap: pd.DataFrame):
+	"""Create hour × token sanctioned volume share heatmap."""
+	fig = px.imshow(
+		heatmap.T,
+		aspect="auto",
+		color_continuous_scale="Reds",
+		labels={"x": "Hour", "y": "Token", "color": "Sanctioned share (%)"},
+	)
+	return fig
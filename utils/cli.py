@@ -0,0 +1,135 @@
+"""
+Command-line interface of the headless pipeline.
+
+    python -m utils.cli score --source real --token USDT --start-date 2024-01-01 --out scores.parquet
+    python -m utils.cli score --source real --out-of-core --out scored/
+    python -m utils.cli ingest
+    python -m utils.cli convert --format parquet
+    python -m utils.cli aggregate --source demo --out reports/
+    python -m utils.cli --metrics timings.prom score --source demo
+
+Settings come from --config, else $RISK_MONITOR_CONFIG, else
+risk_monitor.toml (see utils.config).
+"""
+import argparse
+import json
+from pathlib import Path
+
+from utils import pipeline
+from utils.config import load_settings
+from utils.instrumentation import INSTRUMENTS
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m utils.cli", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--config", type=Path, help="TOML settings file")
+    parser.add_argument(
+        "--metrics", type=Path, help="write stage timings and cache counters (.prom for Prometheus text, else JSON)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="score a dataset and print its KPIs")
+    _add_dataset_arguments(score)
+    score.add_argument("--out", type=Path, help="write per-transaction scores (.parquet or .csv)")
+    score.add_argument("--wide", action="store_true", help="include every component score in --out")
+    score.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="score the real Parquet store one date at a time into the --out directory",
+    )
+
+    ingest = commands.add_parser("ingest", help="append new raw export rows to the Parquet store")
+    ingest.add_argument("raw", nargs="*", type=Path, help="exports to read (default: *.csv in the raw directory)")
+    ingest.add_argument("--chunksize", type=int, default=1_000_000)
+
+    convert = commands.add_parser("convert", help="rebuild the dataset from the raw BigQuery export")
+    convert.add_argument("--format", choices=["csv", "parquet"], default="parquet")
+    convert.add_argument("--batch", action="store_true", help="load the whole export at once instead of streaming")
+    convert.add_argument("--chunksize", type=int, default=1_000_000)
+    convert.add_argument("--raw", type=Path, help="raw export to read (default: from settings)")
+
+    aggregate = commands.add_parser("aggregate", help="write the dashboard's aggregates as JSON/CSV")
+    _add_dataset_arguments(aggregate)
+    aggregate.add_argument("--out", type=Path, required=True, help="output directory")
+
+    args = parser.parse_args(argv)
+    settings = load_settings(args.config)
+    try:
+        _run(parser, args, settings)
+    finally:
+        if args.metrics:
+            args.metrics.parent.mkdir(parents=True, exist_ok=True)
+            text = INSTRUMENTS.to_prometheus() if args.metrics.suffix == ".prom" else INSTRUMENTS.to_json()
+            args.metrics.write_text(text)
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace, settings) -> None:
+    if args.command == "convert":
+        stats = pipeline.convert(
+            stream=not args.batch,
+            output_format=args.format,
+            chunksize=args.chunksize,
+            raw_path=args.raw,
+            settings=settings,
+        )
+        if stats:
+            print(json.dumps(stats, indent=2, default=str))
+        return
+
+    if args.command == "ingest":
+        stats = pipeline.ingest(args.raw or None, chunksize=args.chunksize, settings=settings)
+        print(json.dumps(stats, indent=2, default=str))
+        return
+
+    if args.command == "score" and args.out_of_core:
+        if args.source != "real" or args.out is None:
+            parser.error("--out-of-core needs --source real and an --out directory")
+        kpis = pipeline.score_out_of_core(args.out, args.token, args.start_date, args.end_date, settings)
+        print(json.dumps(kpis, indent=2, default=_json_default))
+        print(f"[OK] Scores written to: {args.out}")
+        return
+
+    scores = pipeline.score(args.source, args.token, args.start_date, args.end_date, settings=settings)
+    if args.command == "score":
+        print(json.dumps(scores.rollups.kpis, indent=2, default=_json_default))
+        if args.out:
+            _write_table(scores.to_frame() if args.wide else scores.transactions, args.out)
+            print(f"[OK] {len(scores):,} scored rows written to: {args.out}")
+        return
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    tables = pipeline.aggregate(scores)
+    with open(args.out / "kpis.json", "w") as f:
+        json.dump(tables.pop("kpis"), f, indent=2, default=_json_default)
+    for name, table in tables.items():
+        table.to_csv(args.out / f"{name}.csv", index=False)
+
+    metrics = pipeline.systemic_metrics(args.source, settings)
+    metrics.concentration.to_csv(args.out / "concentration.csv", index=False)
+    metrics.correlations.to_csv(args.out / "correlations.csv", index=False)
+    metrics.heatmap().to_csv(args.out / "sanctioned_share_heatmap.csv")
+    print(f"[OK] Aggregates written to: {args.out}")
+
+
+def _add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--source", choices=pipeline.SOURCES, default="demo")
+    parser.add_argument("--token", action="append", help="keep only this token (repeatable)")
+    parser.add_argument("--start-date", help="first date, YYYY-MM-DD")
+    parser.add_argument("--end-date", help="last date, YYYY-MM-DD")
+
+
+def _write_table(df, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+
+
+def _json_default(value):
+    # numpy scalars and timestamps in the KPIs
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Columnar (Parquet) storage for processed transfer datasets."""
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARQUET_DIR = Path(__file__).parent.parent / "data" / "processed" / "real_scores"
+
+COLUMNS = ["date", "hour", "token", "wallet_id", "tx_volume_usd", "sanctions_flag", "timestamp"]
+
+# Typed file columns; date and token live in the hive partition path.
+# wallet_id is written as plain strings: Parquet dictionary-encodes each
+# file's own values, whereas an Arrow dictionary column would carry the
+# whole frame's wallet dictionary into every partition file.
+FILE_SCHEMA = pa.schema([
+    ("hour", pa.int8()),
+    ("wallet_id", pa.string()),
+    ("tx_volume_usd", pa.float64()),
+    ("sanctions_flag", pa.int8()),
+    ("timestamp", pa.timestamp("s", tz="UTC")),
+])
+
+PARTITION_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("token", pa.string()),
+])
+
+
+def _partitioning():
+    # dictionary-typed partition fields come back from to_pandas() as categoricals
+    return ds.HivePartitioning.discover(infer_dictionary=True)
+
+
+def _file_format():
+    # wallet_id is decoded straight from the Parquet dictionary pages
+    return ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns=["wallet_id"]))
+
+
+def write_parquet_dataset(
+    df: pd.DataFrame,
+    root: Path = PARQUET_DIR,
+    overwrite: bool = True,
+    append: bool = False,
+    prefix: str = "part",
+) -> None:
+    """
+    Write a processed frame as a Parquet dataset partitioned by date and token.
+
+    With ``overwrite=False`` only the date/token partitions present in ``df``
+    are replaced; all other partitions are left untouched. With
+    ``append=True`` new files are added next to existing ones instead, which
+    lets a streaming writer fill a partition over several calls; their names
+    start with ``prefix``, so a writer can find its own files again.
+    """
+    root = Path(root)
+    if overwrite and root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    out = pd.DataFrame({
+        "hour": df["hour"].astype("int8"),
+        "wallet_id": df["wallet_id"].astype(str),
+        "tx_volume_usd": df["tx_volume_usd"].astype(float),
+        "sanctions_flag": df["sanctions_flag"].astype("int8"),
+        "timestamp": _timestamps(df),
+        "date": df["date"].astype(str),
+        "token": df["token"].astype(str),
+    })
+    table = pa.Table.from_pandas(
+        out, schema=FILE_SCHEMA.append(PARTITION_SCHEMA[0]).append(PARTITION_SCHEMA[1]),
+        preserve_index=False,
+    )
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        basename_template=f"{prefix}-{uuid.uuid4().hex}-{{i}}.parquet" if append else "part-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore" if append else "delete_matching",
+    )
+
+
+def read_parquet_dataset(
+    root: Path = PARQUET_DIR,
+    tokens=None,
+    start_date: str = None,
+    end_date: str = None,
+    columns=None,
+) -> pd.DataFrame:
+    """
+    Read a processed Parquet dataset.
+
+    Token and date filters (``YYYY-MM-DD``, inclusive) are pushed down to
+    partition pruning, and only ``columns`` are decoded. Token, date and
+    wallet come back as categoricals.
+    """
+    dataset = _dataset(root)
+    table = dataset.to_table(
+        columns=_columns(dataset, columns), filter=_filter(tokens, start_date, end_date)
+    )
+    return table.to_pandas()
+
+
+def iter_parquet_dates(
+    root: Path = PARQUET_DIR,
+    tokens=None,
+    start_date: str = None,
+    end_date: str = None,
+    columns=None,
+):
+    """
+    Yield ``(date, frame)`` for each date partition in order, as
+    ``read_parquet_dataset`` would read it, discovering the files once.
+    """
+    dataset = _dataset(root)
+    columns = _columns(dataset, columns)
+    condition = _filter(tokens, start_date, end_date)
+    for date in parquet_dates(root):
+        if (start_date is not None and date < str(start_date)) or (end_date is not None and date > str(end_date)):
+            continue
+        table = dataset.to_table(columns=columns, filter=_and(condition, ds.field("date") == date))
+        yield date, table.to_pandas()
+
+
+def parquet_dates(root: Path = PARQUET_DIR) -> list:
+    """Dates (``YYYY-MM-DD``) of the dataset's partitions, in order."""
+    return sorted(path.name.split("=", 1)[1] for path in Path(root).glob("date=*") if path.is_dir())
+
+
+def partition_stamp(root: Path = PARQUET_DIR, tokens=None, start_date: str = None, end_date: str = None):
+    """
+    (root, files, bytes, newest mtime) of the partition files a read with
+    these filters touches, so writes to other partitions leave it unchanged.
+    """
+    root = Path(root)
+    files = []
+    for date in parquet_dates(root):
+        if (start_date is not None and date < str(start_date)) or (end_date is not None and date > str(end_date)):
+            continue
+        for token_dir in (root / f"date={date}").glob("token=*"):
+            if tokens is None or token_dir.name.split("=", 1)[1] in tokens:
+                files += [entry.stat() for entry in token_dir.glob("*.parquet")]
+    return (
+        str(root),
+        len(files),
+        sum(stat.st_size for stat in files),
+        max((stat.st_mtime_ns for stat in files), default=0),
+    )
+
+
+def parquet_dataset_exists(root: Path = PARQUET_DIR) -> bool:
+    return Path(root).is_dir() and any(Path(root).rglob("*.parquet"))
+
+
+def _timestamps(df: pd.DataFrame) -> pd.Series:
+    """Block times as UTC datetimes (null when the frame has none)."""
+    if "timestamp" not in df.columns:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[s, UTC]")
+    return pd.to_datetime(df["timestamp"], format="ISO8601", utc=True, errors="coerce").dt.floor("s")
+
+
+def _dataset(root: Path) -> ds.Dataset:
+    return ds.dataset(Path(root), format=_file_format(), partitioning=_partitioning())
+
+
+def _columns(dataset: ds.Dataset, columns) -> list:
+    columns = list(columns) if columns is not None else COLUMNS
+    # datasets written before a column existed simply lack it
+    return [c for c in columns if c in dataset.schema.names]
+
+
+def _filter(tokens, start_date, end_date):
+    condition = None
+    if tokens is not None:
+        condition = _and(condition, ds.field("token").isin(list(tokens)))
+    if start_date is not None:
+        condition = _and(condition, ds.field("date") >= str(start_date))
+    if end_date is not None:
+        condition = _and(condition, ds.field("date") <= str(end_date))
+    return condition
+
+
+def _and(condition, other):
+    return other if condition is None else condition & other
+
+
+if __name__ == "__main__":
+    from utils.config import load_settings
+
+    settings = load_settings()
+    print(f"Converting {settings.real_csv_path} -> {settings.parquet_dir}")
+    write_parquet_dataset(pd.read_csv(settings.real_csv_path), settings.parquet_dir)
+    print("Done.")
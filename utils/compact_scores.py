@@ -0,0 +1,146 @@
+"""Memory-compact container for scored transactions."""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Per-wallet constants: stored once per wallet instead of once per transaction.
+WALLET_SCORE_COLUMNS = [
+    "Concentration Score",
+    "Velocity Score",
+    "Sanctions Score",
+    "Burst Score",
+    "Time Score",
+]
+
+# Wallet-level component present only when scored with counterparty exposure.
+EXPOSURE_SCORE_COLUMN = "Exposure Score"
+
+# Column layout of the wide frame returned by compute_public_risk_scores.
+WIDE_COLUMNS = [
+    "Date",
+    "Hour",
+    "Token",
+    "Wallet",
+    "Volume",
+    "Sanctioned",
+    "Volume Score",
+    "Token Score",
+    *WALLET_SCORE_COLUMNS,
+    "Risk Score",
+]
+
+
+class CompactScores:
+    """
+    Scored transactions in a compact layout.
+
+    ``transactions`` holds one row per transfer with categorical Date, Token
+    and Wallet, small integer Hour/Sanctioned and a float32 ``Risk Score``.
+    ``wallets`` holds the wallet-level component scores (float32), indexed
+    by the Wallet category code. Volume and Token scores are derived from
+    the row itself; every other component is joined lazily by code via
+    ``column``, and ``to_frame`` rebuilds the wide frame when needed.
+    ``rollups`` holds the chart and KPI aggregates built at scoring time,
+    and ``weights`` the ScoringWeights the composite was computed with.
+
+    ``version`` is a content fingerprint computed once on construction
+    (unless given, e.g. by a re-weighting of already fingerprinted rows).
+    Cached functions taking a CompactScores key on it (see ``HASH_FUNCS``)
+    instead of hashing the frames on every call.
+    """
+
+    def __init__(
+        self,
+        transactions: pd.DataFrame,
+        wallets: pd.DataFrame,
+        max_log_volume: float,
+        weights,
+        rollups=None,
+        version: str = None,
+    ):
+        self.transactions = transactions
+        self.wallets = wallets
+        self.max_log_volume = max_log_volume
+        self.weights = weights
+        self.rollups = rollups
+        self.version = version or dataset_version(transactions, weights.fingerprint)
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    @property
+    def empty(self) -> bool:
+        return self.transactions.empty
+
+    @property
+    def token_baseline(self) -> dict:
+        return self.weights.token_baseline
+
+    @property
+    def wallet_codes(self) -> np.ndarray:
+        return self.transactions["Wallet"].cat.codes.to_numpy()
+
+    @property
+    def score_columns(self) -> list:
+        """Wallet-level component score columns of this dataset."""
+        if EXPOSURE_SCORE_COLUMN in self.wallets.columns:
+            return [*WALLET_SCORE_COLUMNS, EXPOSURE_SCORE_COLUMN]
+        return list(WALLET_SCORE_COLUMNS)
+
+    def column(self, name: str) -> pd.Series:
+        """Return any wide-frame column, materializing derived ones on demand."""
+        tx = self.transactions
+        if name in tx.columns:
+            return tx[name]
+        if name in WALLET_SCORE_COLUMNS or name in self.score_columns:
+            # rows without a wallet (code -1) have no wallet scores
+            codes = self.wallet_codes
+            values = np.full(len(codes), np.nan, dtype=np.float32)
+            values[codes >= 0] = self.wallets[name].to_numpy()[codes[codes >= 0]]
+        elif name == "Volume Score":
+            if self.max_log_volume <= 0:
+                values = np.zeros(len(tx), dtype=np.float32)
+            else:
+                log_vol = np.log10(tx["Volume"].clip(lower=1).to_numpy(dtype=float))
+                values = np.clip(log_vol / self.max_log_volume * 100, 0, 100).astype(np.float32)
+        elif name == "Token Score":
+            values = (
+                tx["Token"].map(self.token_baseline).astype("float32")
+                .fillna(self.weights.default_token_score).to_numpy()
+            )
+        else:
+            raise KeyError(name)
+        return pd.Series(values, index=tx.index, name=name)
+
+    def to_frame(self, columns=None) -> pd.DataFrame:
+        """Materialize the wide per-transaction frame (or a subset of it)."""
+        if columns is None:
+            columns = WIDE_COLUMNS
+            if EXPOSURE_SCORE_COLUMN in self.wallets.columns:
+                columns = [*WIDE_COLUMNS[:-1], EXPOSURE_SCORE_COLUMN, WIDE_COLUMNS[-1]]
+        columns = list(columns)
+        return pd.DataFrame({name: self.column(name) for name in columns})
+
+    def memory_usage(self) -> int:
+        """Deep memory footprint in bytes."""
+        return int(
+            self.transactions.memory_usage(deep=True).sum()
+            + self.wallets.memory_usage(deep=True).sum()
+        )
+
+
+def dataset_version(transactions: pd.DataFrame, weights_fingerprint: str) -> str:
+    """Fingerprint of the scored rows; the wallet table is derived from them."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(transactions.columns)).encode())
+    digest.update(weights_fingerprint.encode())
+    digest.update(pd.util.hash_pandas_object(transactions, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# st.cache_data hash_funcs for functions taking a CompactScores argument:
+# key on the version string, not on the (large) frames
+HASH_FUNCS = {
+    CompactScores: lambda scores: scores.version,
+}
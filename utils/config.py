@@ -0,0 +1,103 @@
+"""Pipeline settings (data locations, cache backend), without a Streamlit runtime."""
+import os
+import tomllib
+from pathlib import Path
+
+from utils.columnar_store import PARQUET_DIR
+from utils.counterparty_graph import GRAPH_DIR
+from utils.generate_demo_data import DEMO_PATH
+from utils.scoring_weights import WEIGHTS_PATH
+from utils.systemic_metrics import DEMO_SYSTEMIC_DIR, SYSTEMIC_DIR
+from utils.wallet_registry import REGISTRY_DIR
+
+ROOT = Path(__file__).parent.parent
+
+# TOML file with [paths], [cache] and [refresh] tables; see Settings for the keys.
+# Scoring weights live in their own file (see utils.scoring_weights).
+CONFIG_ENV_VAR = "RISK_MONITOR_CONFIG"
+DEFAULT_CONFIG_PATH = ROOT / "risk_monitor.toml"
+
+CACHE_BACKENDS = ("none", "memory", "disk")
+
+
+class Settings:
+    """
+    Where the pipeline reads and writes data, and how it caches results.
+
+    Defaults are the locations the dashboard has always used. A config file
+    can override any of them:
+
+        [paths]
+        raw_path = "data/real/raw/raw_bigquery.csv"
+        raw_dir = "data/real/raw"      # exports picked up by incremental ingest
+        parquet_dir = "/srv/risk/real_scores"
+        weights_path = "scoring_weights.toml"   # versioned scoring weights
+
+        [cache]
+        backend = "disk"          # none | memory | disk
+        dir = "data/cache"
+        max_mb = 2048             # disk cache size bound (LRU eviction)
+
+        [refresh]
+        interval_seconds = 60     # how often the dashboard checks for new data
+
+    Relative paths resolve against the repository root.
+    """
+
+    def __init__(self, **overrides):
+        self.demo_path = DEMO_PATH
+        self.raw_path = ROOT / "data" / "real" / "raw" / "raw_bigquery.csv"
+        self.raw_dir = ROOT / "data" / "real" / "raw"
+        self.real_csv_path = ROOT / "data" / "processed" / "real_scores.csv"
+        self.parquet_dir = PARQUET_DIR
+        self.registry_dir = REGISTRY_DIR
+        self.graph_dir = GRAPH_DIR
+        self.systemic_dir = SYSTEMIC_DIR
+        self.demo_systemic_dir = DEMO_SYSTEMIC_DIR
+        self.weights_path = WEIGHTS_PATH
+        self.cache_backend = "disk"
+        self.cache_dir = ROOT / "data" / "cache"
+        self.cache_max_mb = 2048
+        self.refresh_interval_s = 60
+
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise KeyError(f"Unknown setting: {name}")
+            setattr(self, name, _resolve(value) if isinstance(getattr(self, name), Path) else value)
+        if self.cache_backend not in CACHE_BACKENDS:
+            raise ValueError(f"cache backend must be one of {CACHE_BACKENDS}, got {self.cache_backend!r}")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"Settings({fields})"
+
+
+def load_settings(path: Path = None) -> Settings:
+    """
+    Settings from ``path``, else ``$RISK_MONITOR_CONFIG``, else
+    ``risk_monitor.toml`` in the repository root when present, else defaults.
+    """
+    if path is None:
+        configured = os.environ.get(CONFIG_ENV_VAR)
+        path = Path(configured) if configured else DEFAULT_CONFIG_PATH
+        if not configured and not path.exists():
+            return Settings()
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+
+    overrides = dict(config.get("paths", {}))
+    cache = config.get("cache", {})
+    if "backend" in cache:
+        overrides["cache_backend"] = cache["backend"]
+    if "dir" in cache:
+        overrides["cache_dir"] = cache["dir"]
+    if "max_mb" in cache:
+        overrides["cache_max_mb"] = cache["max_mb"]
+    if "interval_seconds" in config.get("refresh", {}):
+        overrides["refresh_interval_s"] = config["refresh"]["interval_seconds"]
+    return Settings(**overrides)
+
+
+def _resolve(value) -> Path:
+    path = Path(value)
+    return path if path.is_absolute() else ROOT / path
@@ -1,76 +1,233 @@
+import os
+import resource
+import sys
+import time
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from utils.load_data import load_sanctions_list
+from utils.addresses import decode_addresses
+from utils.columnar_store import write_parquet_dataset
+from utils.config import Settings, load_settings
+from utils.counterparty_graph import CounterpartyGraphBuilder
+from utils.sanctions_index import SanctionsIndex, get_sanctions_index
+from utils.systemic_metrics import SystemicMetrics
+from utils.wallet_registry import WalletRegistry, wallet_labels
 
 # Ethereum mainnet stablecoin contracts (lowercase)
 USDC_CONTRACT = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
 DAI_CONTRACT  = "0x6b175474e89094c44da98b954eedeac495271d0f"
 USDE_CONTRACT = "0x4c9edd5852cd905f086c759e8383e09bff1e68b3"
 
-RAW_PATH = Path("data/real/raw/raw_bigquery.csv")
-OUT_PATH = Path("data/processed/real_scores.csv")
+# Columns of the raw export the conversion actually reads
+RAW_COLUMNS = ["block_timestamp", "token_address", "from_address", "to_address", "token_amount"]
+OUT_COLUMNS = ["date", "hour", "token", "wallet_id", "tx_volume_usd", "sanctions_flag", "timestamp"]
 
+TOKEN_MAP = {
+    USDC_CONTRACT: "USDC",
+    DAI_CONTRACT:  "DAI",
+    USDE_CONTRACT: "USDe",
+}
 
-def convert_raw_to_real_scores() -> None:
+
+def convert_raw_to_real_scores(output_format: str = "csv", settings: Settings = None) -> None:
     """
     Convert raw BigQuery export into anonymized dashboard format.
 
+    Paths are the defaults below unless ``settings`` (or the config file,
+    see utils.config) moves them.
+
     Input :  data/real/raw/raw_bigquery.csv
-    Output:  data/processed/real_scores.csv
+    Output:  data/processed/real_scores.csv, or with output_format="parquet"
+             data/processed/real_scores/date=.../token=.../*.parquet
+             data/real/graph/ (counterparty graph over registry ids)
+             data/processed/systemic/ (systemic risk metrics)
 
     Output columns:
-        date, token, wallet_id, tx_volume_usd, sanctions_flag
+        date, hour, token, wallet_id, tx_volume_usd, sanctions_flag, timestamp
     """
-    print(f"Reading raw data from: {RAW_PATH}")
-    df = pd.read_csv(RAW_PATH)
-
-    # Normalize token address
-    df["token_address"] = df["token_address"].str.lower()
-
-    # Map contract -> token symbol
-    token_map = {
-        USDC_CONTRACT: "USDC",
-        DAI_CONTRACT:  "DAI",
-        USDE_CONTRACT: "USDe",
-    }
-    df["token"] = df["token_address"].map(token_map).fillna("UNKNOWN")
+    settings = settings or load_settings()
+    print(f"Reading raw data from: {settings.raw_path}")
+    df = pd.read_csv(settings.raw_path)
+
+    sanctions = get_sanctions_index()
+    registry = WalletRegistry(settings.registry_dir)
+    graph = CounterpartyGraphBuilder()
+    out = _convert_chunk(df, sanctions, registry, graph)
+    registry.flush()
+    graph.build(len(registry)).save(settings.graph_dir)
+    metrics = SystemicMetrics.from_frame(out)
+
+    if output_format == "parquet":
+        write_parquet_dataset(out, settings.parquet_dir)
+        print(f"Wrote anonymized dataset to: {settings.parquet_dir.resolve()}")
+    else:
+        settings.real_csv_path.parent.mkdir(parents=True, exist_ok=True)
+        out.to_csv(settings.real_csv_path, index=False)
+        print(f"Wrote anonymized dataset to: {settings.real_csv_path.resolve()}")
+    # after the dataset, so the metrics are never older than it
+    metrics.save(settings.systemic_dir)
 
-    df["tx_volume_usd"] = df["token_amount"].astype(float)
-
-    # Check sanctions
-    sanctions = load_sanctions_list()
-    sanctioned_set = set(sanctions["address"].str.lower())
-
-    df["from_sanctioned"] = df["from_address"].str.lower().isin(sanctioned_set).astype(int)
-    df["to_sanctioned"]   = df["to_address"].str.lower().isin(sanctioned_set).astype(int)
-
-    # Combine sanctions flags
-    df["sanctions_flag"] = (
-        df["from_sanctioned"] | df["to_sanctioned"]
-    ).astype(int)
+    print(f"Rows: {len(out):,}")
+    print(out.head())
 
-    # Anonymize wallets (after sanctions check)
-    df["wallet_raw"] = df["from_address"].str.lower()
-    codes, uniques = pd.factorize(df["wallet_raw"])
-    df["wallet_id"] = [f"Wallet {i+1}" for i in codes]
 
-    # Extract date (yyyy-mm-dd only) as string for CSV
-    df["date"] = pd.to_datetime(df["block_timestamp"]).dt.strftime("%Y-%m-%d")
+def convert_raw_to_real_scores_streaming(
+    output_format: str = "csv",
+    chunksize: int = 1_000_000,
+    raw_path: Path = None,
+    settings: Settings = None,
+) -> dict:
+    """
+    Convert the raw export in bounded-memory chunks.
+
+    Produces the same output as ``convert_raw_to_real_scores``: wallet ids
+    come from the persistent wallet registry, so they are stable across
+    chunks and runs. Each converted chunk is written out before the next one
+    is read, so memory is bounded by the chunk size plus the registry index
+    and the distinct counterparty pairs of the graph. Returns throughput
+    statistics.
+    """
+    settings = settings or load_settings()
+    raw_path = raw_path or settings.raw_path
+    out_path = settings.real_csv_path
+    print(f"Streaming raw data from: {raw_path} (chunks of {chunksize:,} rows)")
+    sanctions = get_sanctions_index()
+    registry = WalletRegistry(settings.registry_dir)
+    graph = CounterpartyGraphBuilder()
+    metrics = SystemicMetrics()
+
+    tmp_csv = out_path.with_suffix(".csv.tmp")
+    if output_format == "csv":
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    n_rows = 0
+    reader = pd.read_csv(
+        raw_path,
+        usecols=RAW_COLUMNS,
+        dtype={"token_address": str, "from_address": str, "to_address": str},
+        chunksize=chunksize,
+    )
+    for i, chunk in enumerate(reader):
+        out = _convert_chunk(chunk, sanctions, registry, graph)
+        registry.flush()
+        metrics.update(out)
+
+        if output_format == "parquet":
+            write_parquet_dataset(out, settings.parquet_dir, overwrite=(i == 0), append=True)
+        else:
+            out.to_csv(tmp_csv, index=False, mode="w" if i == 0 else "a", header=(i == 0))
+
+        n_rows += len(out)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  chunk {i + 1}: {n_rows:,} rows, {n_rows / elapsed:,.0f} rows/s, "
+            f"peak RSS {peak_rss_mb():,.0f} MB"
+        )
+
+    if output_format == "csv" and n_rows:
+        # swap in atomically so readers never see a half-written file
+        os.replace(tmp_csv, out_path)
+    graph.build(len(registry)).save(settings.graph_dir)
+    metrics.save(settings.systemic_dir)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": n_rows,
+        "wallets": len(registry),
+        "seconds": elapsed,
+        "rows_per_sec": n_rows / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    target = settings.parquet_dir if output_format == "parquet" else out_path
+    print(f"Wrote anonymized dataset to: {target.resolve()}")
+    print(
+        f"Rows: {stats['rows']:,} | Wallets: {stats['wallets']:,} | "
+        f"{stats['rows_per_sec']:,.0f} rows/s | peak RSS {stats['peak_rss_mb']:,.0f} MB"
+    )
+    return stats
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _convert_chunk(
+    df: pd.DataFrame,
+    sanctions: SanctionsIndex,
+    registry: WalletRegistry,
+    graph: CounterpartyGraphBuilder = None,
+) -> pd.DataFrame:
+    """
+    Convert one slice of the raw export, registering unseen wallets.
 
-    ts = pd.to_datetime(df["block_timestamp"], errors="coerce")
-    df["hour"] = ts.dt.hour + 1
+    Recipients are registered too and, with a ``graph`` builder, every
+    transfer is added as a sender -> recipient edge over registry ids.
+    Transfers whose sender is not a valid address or whose block timestamp
+    does not parse are skipped with a warning; an invalid recipient only
+    leaves the edge out.
+    """
+    from_keys, from_valid = decode_addresses(df["from_address"])
+    # Parse timestamps once; date (yyyy-mm-dd only) is kept as string for CSV
+    ts = _parse_block_timestamps(df["block_timestamp"])
+    timed = ts.notna().to_numpy()
+    if not from_valid.all():
+        print(f"[WARN] Skipped {int((~from_valid).sum()):,} transfer(s) with an invalid sender address")
+    if not timed.all():
+        print(f"[WARN] Skipped {int((~timed).sum()):,} transfer(s) with an invalid block timestamp")
+    keep = from_valid & timed
+    if not keep.all():
+        df, ts, from_keys = df[keep], ts[keep], from_keys[keep]
 
-    # Final cleaned output
-    out = df[["date", "hour", "token", "wallet_id", "tx_volume_usd", "sanctions_flag"]]
+    # Map contract -> token symbol
+    token = df["token_address"].str.lower().map(TOKEN_MAP).fillna("UNKNOWN")
 
-    OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(OUT_PATH, index=False)
+    # Decode addresses once, for screening, anonymization and the graph
+    to_keys, to_valid = decode_addresses(df["to_address"])
 
-    print(f"Wrote anonymized dataset to: {OUT_PATH.resolve()}")
-    print(f"Rows: {len(out):,}")
-    print(out.head())
+    # Check sanctions
+    from_sanctioned = sanctions.contains_keys(from_keys)
+    to_sanctioned = sanctions.contains_keys(to_keys) & to_valid
+
+    # Anonymize wallets (after sanctions check) with stable registry ids
+    codes = registry.get_or_create_keys(from_keys)
+    to_codes = np.full(len(df), -1, dtype=np.int32)
+    to_codes[to_valid] = registry.get_or_create_keys(to_keys[to_valid])
+    amount = df["token_amount"].astype(float)
+    if graph is not None:
+        graph.add(codes, to_codes, amount.to_numpy())
+
+    out = pd.DataFrame({
+        "date": _date_strings(ts),
+        "hour": ts.dt.hour + 1,
+        "token": token,
+        "wallet_id": wallet_labels(codes).set_axis(df.index),
+        "tx_volume_usd": amount,
+        "sanctions_flag": (from_sanctioned | to_sanctioned).astype(int),
+        # full UTC block time, for the sliding-window activity statistics
+        "timestamp": ts,
+    })
+    return out[OUT_COLUMNS]
+
+
+def _parse_block_timestamps(values: pd.Series) -> pd.Series:
+    """Parse BigQuery timestamps ("2025-11-17 03:12:45 UTC") as UTC."""
+    # Without the " UTC" suffix pandas can use its ISO8601 fast path
+    stripped = values.astype(str).str.removesuffix(" UTC")
+    return pd.to_datetime(stripped, format="ISO8601", errors="coerce", utc=True)
+
+
+def _date_strings(ts: pd.Series) -> pd.Series:
+    days = ts.dt.tz_localize(None).to_numpy().astype("datetime64[D]").astype(str)
+    return pd.Series(days, index=ts.index).where(ts.notna())
 
 
 if __name__ == "__main__":
-    convert_raw_to_real_scores()
-
+    args = sys.argv[1:]
+    if args and args[0] == "--stream":
+        convert_raw_to_real_scores_streaming(output_format=args[1] if len(args) > 1 else "csv")
+    else:
+        convert_raw_to_real_scores(output_format=args[0] if args else "csv")
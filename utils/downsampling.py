@@ -0,0 +1,25 @@
+"""Downsampling of long series for plotting."""
+import numpy as np
+
+
+def minmax_downsample(x: np.ndarray, y: np.ndarray, n_buckets: int):
+    """
+    Keep the minimum and maximum of ``y`` in each of ``n_buckets`` equal runs
+    of points, in their original order.
+
+    At most ``2 * n_buckets`` points survive, and every spike and dip of the
+    series is among them, so the plotted envelope matches the full series at
+    screen resolution. Series short enough are returned unchanged.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return x, y
+
+    bucket = np.arange(n) * n_buckets // n
+    # sorted by value within each bucket: first is its minimum, last its maximum
+    order = np.lexsort((y, bucket))
+    starts = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.unique(np.r_[order[starts], order[ends]])
+    return x[keep], y[keep]
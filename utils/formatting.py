@@ -1,6 +1,8 @@
 """Shared formatting and aggregation utilities for the dashboard."""
 import streamlit as st
-import pandas as pd
+from utils.compact_scores import CompactScores, HASH_FUNCS
+from utils.instrumentation import instrument_cache
+from utils.wallet_ranking import WalletRanking
 
 def format_volume(value):
 	"""Format large numbers more compactly (e.g., $51.2B instead of $51,199,081)."""
@@ -13,29 +15,10 @@ def format_volume(value):
 	else:
 		return f"${value:.2f}"
 
-@st.cache_data
-def get_wallet_aggregation(df: pd.DataFrame) -> pd.DataFrame:
-	"""Cache the expensive wallet-level aggregation."""
-	df_copy = df.copy()
-	df_copy["sanctioned_volume"] = df_copy["Volume"] * df_copy["Sanctioned"]
-	
-	wallet_agg = (
-		df_copy.groupby("Wallet", as_index=False)
-		.agg(
-			Total_Volume=("Volume", "sum"),
-			N_Transactions=("Volume", "count"),
-			Avg_Risk=("Risk Score", "mean"),
-			Max_Risk=("Risk Score", "max"),
-			Sanctioned_Volume=("sanctioned_volume", "sum"),
-		)
-	)
-	
-	wallet_agg = wallet_agg.rename(columns={
-		"Total_Volume": "Total Volume",
-		"N_Transactions": "Transactions",
-		"Avg_Risk": "Average Risk",
-		"Max_Risk": "Max Risk",
-		"Sanctioned_Volume": "Sanctioned Volume"
-	})
-	
-	return wallet_agg.sort_values(["Average Risk"], ascending=[False])
+@instrument_cache(st.cache_resource(hash_funcs=HASH_FUNCS))
+def get_wallet_ranking(scores: CompactScores) -> WalletRanking:
+	"""
+	Paged rankings of the wallet table, shared by every session so the ranked
+	prefixes survive reruns (slider moves only slice them).
+	"""
+	return WalletRanking(scores.wallets)
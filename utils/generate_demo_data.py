@@ -1,44 +1,274 @@
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def generate_demo_data(seed=None, n_days=1, n_wallets=10000, save=True):
+DEMO_PATH = Path(__file__).parent.parent / "data" / "sample" / "demo_scores.csv"
+
+COLUMNS = ["date", "hour", "token", "wallet_id", "tx_volume_usd", "sanctions_flag"]
+
+
+def generate_demo_data(
+    seed=None,
+    n_days=1,
+    n_wallets=10000,
+    save=True,
+    tokens=("USDC", "DAI", "USDe"),
+    start_date="2025-11-17",
+    sanctions_rate=0.05,
+    activity_alpha=None,
+    max_tx_per_wallet=10_000,
+    burst_fraction=0.0,
+    burst_intensity=0.8,
+    sanctioned_cluster_fraction=0.0,
+    sanctioned_cluster_size=20,
+    cluster_sanctions_rate=0.6,
+    timestamps=False,
+):
     """
     Generates a realistic stablecoin dataset and optionally overwrites demo_scores.csv.
+
+    Fully vectorized on a seeded ``np.random.Generator``. With the default
+    knobs each wallet makes 1–5 transfers spread uniformly over days, hours
+    and tokens, and 5% of transfers are sanctions-flagged. Skew knobs:
+
+    - ``activity_alpha``: draw tx counts per wallet from a Zipf law with this
+      exponent (heavy-tailed activity), capped at ``max_tx_per_wallet``.
+    - ``burst_fraction``: share of wallets with a "home" hour that receives
+      ``burst_intensity`` of their transfers (bursty hours).
+    - ``sanctioned_cluster_fraction``: share of wallets grouped into clusters
+      of ``sanctioned_cluster_size`` whose transfers are flagged at
+      ``cluster_sanctions_rate`` instead of ``sanctions_rate``.
+
+    With ``timestamps=True`` a ``timestamp`` column with a random second
+    inside each transfer's hour is added, like the converted real data.
+
+    For datasets larger than memory use ``write_demo_data``.
+    """
+    rng = np.random.default_rng(seed)
+    df = _generate_wallet_range(
+        rng,
+        first_wallet=1,
+        n_wallets=n_wallets,
+        n_days=n_days,
+        tokens=tokens,
+        start_date=start_date,
+        sanctions_rate=sanctions_rate,
+        activity_alpha=activity_alpha,
+        max_tx_per_wallet=max_tx_per_wallet,
+        burst_fraction=burst_fraction,
+        burst_intensity=burst_intensity,
+        sanctioned_cluster_fraction=sanctioned_cluster_fraction,
+        sanctioned_cluster_size=sanctioned_cluster_size,
+        cluster_sanctions_rate=cluster_sanctions_rate,
+        timestamps=timestamps,
+    )
+
+    if save:
+        df.to_csv(DEMO_PATH, index=False)
+        print(f"[OK] Demo data written to: {DEMO_PATH}")
+        print(f"Rows: {len(df):,} | Wallets: {df['wallet_id'].nunique():,}")
+
+    return df
+
+
+def write_demo_data(
+    path,
+    n_wallets,
+    seed=None,
+    chunk_wallets=1_000_000,
+    n_jobs=1,
+    output_format="csv",
+    **knobs,
+):
     """
+    Generate a large demo dataset straight to disk, one wallet range at a time.
 
-    if seed is not None:
-        np.random.seed(seed)
+    Each chunk of ``chunk_wallets`` wallets gets its own random stream spawned
+    from ``seed``, so output is reproducible for a given seed and chunk size
+    regardless of ``n_jobs``. With ``n_jobs > 1`` chunks are generated in a
+    process pool. ``output_format`` is "csv" (one file, chunks appended in
+    order) or "parquet" (a date/token partitioned dataset at ``path``).
+    Extra keyword arguments are the skew knobs of ``generate_demo_data``.
+    Returns the number of rows written.
+    """
+    path = Path(path)
+    n_chunks = max(1, -(-n_wallets // chunk_wallets))
+    streams = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [
+        (
+            streams[i],
+            1 + i * chunk_wallets,
+            min(chunk_wallets, n_wallets - i * chunk_wallets),
+            knobs,
+        )
+        for i in range(n_chunks)
+    ]
+
+    if output_format == "parquet":
+        # imported lazily: pyarrow is only needed for Parquet output
+        from utils.columnar_store import write_parquet_dataset
     else:
-        np.random.seed(None)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    n_rows = 0
+    with ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else _InlineExecutor() as executor:
+        for i, chunk in enumerate(executor.map(_generate_chunk, tasks)):
+            if output_format == "parquet":
+                write_parquet_dataset(chunk, path, overwrite=(i == 0), append=True)
+            else:
+                chunk.to_csv(path, index=False, mode="w" if i == 0 else "a", header=(i == 0))
+            n_rows += len(chunk)
+            print(f"  chunk {i + 1}/{n_chunks}: {n_rows:,} rows")
 
-    dates = pd.date_range("2025-11-17", periods=n_days, freq="D")
-    wallets = [f"Wallet {i}" for i in range(1, n_wallets + 1)]
-    tokens = ["USDC", "DAI", "USDe"]
+    print(f"[OK] Demo data written to: {path}")
+    return n_rows
 
-    rows = []
 
-    for wallet in wallets:
-        n_tx_wallet = np.random.randint(1, 6)  # 1–5 tx per wallet
+def make_raw_export(df: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Fake BigQuery export matching the demo transfers, for the converter."""
+    # imported lazily: utils.config imports this module
+    from utils.convert_real_data import TOKEN_MAP
 
-        for _ in range(n_tx_wallet):
-            date = np.random.choice(dates)
-            hour = np.random.randint(1, 25)  # 1–24
-            token = np.random.choice(tokens)
-            volume = np.random.randint(10, 5_000_000)
-            sanction = 1 if np.random.rand() < 0.05 else 0  # 5% sanctions-flagged
-            # Store date as string (YYYY-MM-DD), hour as int
-            rows.append([pd.Timestamp(date).strftime("%Y-%m-%d"), hour, token, wallet, volume, sanction])
+    rng = np.random.default_rng(seed)
+    wallet_numbers = df["wallet_id"].astype(str).str.removeprefix("Wallet ").astype(np.int64).to_numpy()
+    to_numbers = rng.permutation(wallet_numbers)
+    contracts = {symbol: address for address, symbol in TOKEN_MAP.items()}
+    minutes = rng.integers(0, 60, size=len(df))
 
-    df = pd.DataFrame(
-        rows,
-        columns=["date", "hour", "token", "wallet_id", "tx_volume_usd", "sanctions_flag"]
+    timestamps = (
+        pd.to_datetime(df["date"].astype(str))
+        + pd.to_timedelta(df["hour"].astype(np.int64) - 1, unit="h")
+        + pd.to_timedelta(minutes, unit="m")
     )
+    return pd.DataFrame({
+        "block_timestamp": timestamps.dt.strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "token_address": df["token"].astype(str).map(contracts).fillna("0x" + "0" * 40),
+        "from_address": [f"0x{n:040x}" for n in wallet_numbers],
+        "to_address": [f"0x{n:040x}" for n in to_numbers],
+        "token_amount": df["tx_volume_usd"].astype(float),
+    })
 
-    if save:
-        data_path = Path(__file__).parent.parent / "data" / "sample" / "demo_scores.csv"
-        df.to_csv(data_path, index=False)
-        print(f"[OK] Demo data written to: {data_path}")
-        print(f"Rows: {len(df):,} | Wallets: {df['wallet_id'].nunique():,}")
 
-    return df
\ No newline at end of file
+def _generate_chunk(task):
+    seed_seq, first_wallet, n_wallets, knobs = task
+    return _generate_wallet_range(
+        np.random.default_rng(seed_seq), first_wallet=first_wallet, n_wallets=n_wallets, **knobs
+    )
+
+
+def _generate_wallet_range(
+    rng,
+    first_wallet,
+    n_wallets,
+    n_days=1,
+    tokens=("USDC", "DAI", "USDe"),
+    start_date="2025-11-17",
+    sanctions_rate=0.05,
+    activity_alpha=None,
+    max_tx_per_wallet=10_000,
+    burst_fraction=0.0,
+    burst_intensity=0.8,
+    sanctioned_cluster_fraction=0.0,
+    sanctioned_cluster_size=20,
+    cluster_sanctions_rate=0.6,
+    timestamps=False,
+):
+    """Transfers of wallets first_wallet .. first_wallet + n_wallets - 1."""
+    # transfers per wallet
+    if activity_alpha is None:
+        n_tx = rng.integers(1, 6, size=n_wallets)  # 1–5 tx per wallet
+    else:
+        n_tx = np.minimum(rng.zipf(activity_alpha, size=n_wallets), max_tx_per_wallet)
+    wallet = np.repeat(np.arange(n_wallets, dtype=np.int32), n_tx)
+    n = len(wallet)
+
+    # narrow dtypes keep hundreds of millions of rows within reach
+    dates = pd.date_range(start_date, periods=n_days, freq="D").strftime("%Y-%m-%d")
+    date_codes = rng.integers(0, n_days, size=n, dtype=np.int16)
+    token_codes = rng.integers(0, len(tokens), size=n, dtype=np.int8)
+    volume = rng.integers(10, 5_000_000, size=n)
+
+    # hours 1–24, with optional per-wallet home hours
+    hour = rng.integers(1, 25, size=n, dtype=np.int8)
+    if burst_fraction > 0:
+        bursty = rng.random(n_wallets) < burst_fraction
+        home_hour = rng.integers(1, 25, size=n_wallets, dtype=np.int8)
+        in_burst = bursty[wallet] & (rng.random(n, dtype=np.float32) < burst_intensity)
+        hour = np.where(in_burst, home_hour[wallet], hour)
+
+    # sanctions flags, with optional high-rate wallet clusters
+    rate = np.full(n_wallets, sanctions_rate)
+    if sanctioned_cluster_fraction > 0:
+        n_clusters = max(1, int(n_wallets * sanctioned_cluster_fraction / sanctioned_cluster_size))
+        starts = rng.integers(0, max(1, n_wallets - sanctioned_cluster_size), size=n_clusters)
+        members = (starts[:, None] + np.arange(sanctioned_cluster_size)).ravel()
+        rate[members[members < n_wallets]] = cluster_sanctions_rate
+    sanction = (rng.random(n, dtype=np.float32) < rate[wallet]).astype(np.int8)
+
+    # labels are built once per wallet/date/token and shared via categorical codes
+    wallet_labels = pd.Index([f"Wallet {i}" for i in range(first_wallet, first_wallet + n_wallets)])
+
+    df = pd.DataFrame({
+        "date": pd.Categorical.from_codes(date_codes, categories=dates),
+        "hour": hour,
+        "token": pd.Categorical.from_codes(token_codes, categories=list(tokens)),
+        "wallet_id": pd.Categorical.from_codes(wallet, categories=wallet_labels),
+        "tx_volume_usd": volume,
+        "sanctions_flag": sanction,
+    }, columns=COLUMNS)
+
+    if timestamps:
+        day_start = pd.to_datetime(dates).to_numpy(dtype="datetime64[s]").astype(np.int64)
+        seconds = (
+            day_start[date_codes]
+            + (hour.astype(np.int64) - 1) * 3600
+            + rng.integers(0, 3600, size=n)
+        )
+        df["timestamp"] = pd.to_datetime(seconds, unit="s", utc=True)
+    return df
+
+
+class _InlineExecutor:
+    """Drop-in for ProcessPoolExecutor.map when running in-process."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, func, iterable):
+        return map(func, iterable)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic stablecoin transfers.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--wallets", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-wallets", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--activity-alpha", type=float, default=None)
+    parser.add_argument("--burst-fraction", type=float, default=0.0)
+    parser.add_argument("--sanctioned-cluster-fraction", type=float, default=0.0)
+    parser.add_argument("--timestamps", action="store_true")
+    args = parser.parse_args()
+
+    write_demo_data(
+        args.path,
+        n_wallets=args.wallets,
+        seed=args.seed,
+        chunk_wallets=args.chunk_wallets,
+        n_jobs=args.jobs,
+        output_format=args.format,
+        n_days=args.days,
+        activity_alpha=args.activity_alpha,
+        burst_fraction=args.burst_fraction,
+        sanctioned_cluster_fraction=args.sanctioned_cluster_fraction,
+        timestamps=args.timestamps,
+    )
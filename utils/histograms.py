@@ -0,0 +1,85 @@
+"""Mergeable per-token histograms on fixed bin edges."""
+import numpy as np
+import pandas as pd
+
+
+class TokenHistogram:
+    """
+    Counts of a value per token on fixed ``edges`` (bins closed on the right;
+    the first also holds values at or below its lower edge, the last those
+    above its upper edge).
+
+    ``counts`` is a (tokens × bins) int64 matrix. Histograms on the same
+    edges merge by adding counts, so partitions and ingest batches can be
+    binned separately, and a token selection is answered from the rows of
+    the matrix without touching transactions.
+    """
+
+    def __init__(self, edges: np.ndarray, tokens=(), counts: np.ndarray = None):
+        self.edges = np.asarray(edges, dtype=float)
+        self.tokens = list(tokens)
+        if counts is None:
+            counts = np.zeros((len(self.tokens), self.n_bins), dtype=np.int64)
+        self.counts = counts
+        self._rows = {token: i for i, token in enumerate(self.tokens)}
+
+    @classmethod
+    def from_values(cls, tokens: pd.Series, values: np.ndarray, edges: np.ndarray) -> "TokenHistogram":
+        """Bin ``values`` by the token on the same row, in one bincount."""
+        tokens = tokens.astype("category")
+        codes = tokens.cat.codes.to_numpy().astype(np.int64)
+        values = np.asarray(values, dtype=float)
+        n_bins = len(edges) - 1
+        bins = np.clip(np.searchsorted(edges, values, side="left") - 1, 0, n_bins - 1)
+
+        n_tokens = len(tokens.cat.categories)
+        valid = (codes >= 0) & ~np.isnan(values)
+        counts = np.bincount(
+            codes[valid] * n_bins + bins[valid], minlength=n_tokens * n_bins
+        ).reshape(n_tokens, n_bins)
+        return cls(edges, tokens.cat.categories, counts.astype(np.int64))
+
+    @property
+    def n_bins(self) -> int:
+        return len(self.edges) - 1
+
+    @property
+    def centers(self) -> np.ndarray:
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    def merge(self, other: "TokenHistogram") -> "TokenHistogram":
+        """Sum of two histograms on the same edges, over the union of their tokens."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histograms with different bin edges cannot be merged")
+        tokens = self.tokens + [token for token in other.tokens if token not in self._rows]
+        counts = np.zeros((len(tokens), self.n_bins), dtype=np.int64)
+        counts[: len(self.tokens)] = self.counts
+        rows = np.array([tokens.index(token) for token in other.tokens], dtype=np.intp)
+        counts[rows] += other.counts
+        return TokenHistogram(self.edges, tokens, counts)
+
+    __add__ = merge
+
+    def select(self, tokens) -> "TokenHistogram":
+        """The histograms of ``tokens`` (unknown tokens have no counts)."""
+        tokens = list(tokens)
+        counts = np.zeros((len(tokens), self.n_bins), dtype=np.int64)
+        for i, token in enumerate(tokens):
+            if token in self._rows:
+                counts[i] = self.counts[self._rows[token]]
+        return TokenHistogram(self.edges, tokens, counts)
+
+    def total(self, tokens=None) -> np.ndarray:
+        """Counts per bin summed over ``tokens`` (default: all)."""
+        counts = self.counts if tokens is None else self.select(tokens).counts
+        return counts.sum(axis=0)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long table of the non-empty bins: Token, Bin Start, Bin End, Count."""
+        token_idx, bin_idx = np.nonzero(self.counts)
+        return pd.DataFrame({
+            "Token": np.asarray(self.tokens, dtype=object)[token_idx],
+            "Bin Start": self.edges[bin_idx],
+            "Bin End": self.edges[bin_idx + 1],
+            "Count": self.counts[token_idx, bin_idx],
+        })
@@ -0,0 +1,324 @@
+"""
+Incremental ingest of raw exports into the partitioned Parquet store.
+
+A run converts only what the store has not seen yet: the rows appended to
+an export since the last run, and the rows of new exports from the
+high-water mark (the latest block timestamp ingested) on; rows at the mark
+itself are matched against the ones ingested there. New rows are
+appended to their date/token partitions, so other partitions, and the
+cached scores of date ranges that do not include them, stay valid; the
+wallet registry, counterparty graph and systemic metrics are updated from
+the new rows only.
+"""
+import io
+import json
+import os
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar_store import read_parquet_dataset, write_parquet_dataset
+from utils.config import Settings, load_settings
+from utils.convert_real_data import RAW_COLUMNS, _convert_chunk, _parse_block_timestamps, peak_rss_mb
+from utils.counterparty_graph import CounterpartyGraph, CounterpartyGraphBuilder
+from utils.sanctions_index import get_sanctions_index
+from utils.systemic_metrics import SystemicMetrics
+from utils.wallet_registry import WalletRegistry
+
+# Kept inside the store it describes; dataset discovery skips "_" files.
+STATE_FILE = "_ingest.json"
+
+RAW_PATTERN = "*.csv"
+RAW_DTYPES = {"token_address": str, "from_address": str, "to_address": str}
+
+
+class IngestState:
+    """
+    What the Parquet store holds of the raw exports.
+
+    - ``watermark``: latest block timestamp ingested (ISO 8601, UTC).
+    - ``watermark_rows``: row keys (see ``_row_keys``) of the transfers
+      ingested at the watermark, one per row.
+    - ``files``: per export path, its size and mtime when last ingested and
+      the byte offset up to which its rows are in the store.
+    - ``pending``: id of the run writing partitions; a run that stopped
+      half-way leaves it set, and its files are removed by the next one.
+    - ``last_run``: time, rows and dates of the latest run that added rows.
+    """
+
+    def __init__(
+        self,
+        watermark: str = None,
+        files: dict = None,
+        pending: str = None,
+        last_run: dict = None,
+        watermark_rows: list = None,
+    ):
+        self.watermark = watermark
+        self.watermark_rows = watermark_rows or []
+        self.files = files or {}
+        self.pending = pending
+        self.last_run = last_run
+
+    @classmethod
+    def load(cls, root: Path) -> "IngestState":
+        path = Path(root) / STATE_FILE
+        if not path.exists():
+            return cls()
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def save(self, root: Path) -> None:
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = root / f"{STATE_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(vars(self), f, indent=2)
+        os.replace(tmp, root / STATE_FILE)
+
+
+def ingest_raw_exports(raw_paths=None, chunksize: int = 1_000_000, settings: Settings = None) -> dict:
+    """
+    Ingest what is new in the raw exports (default: ``*.csv`` in
+    ``settings.raw_dir``) into the Parquet store.
+
+    An export ingested before is read from the offset where the last run
+    stopped, so rows appended to it are kept whatever their block time.
+    Other exports (new, or rewritten in place) are read in full and only
+    their rows from the watermark on are kept, so re-exports that overlap the
+    ingested history do not duplicate it. Rows at the watermark itself are
+    kept unless they match one ingested there, since a block's transfers
+    may be split across exports. A row still being written (no
+    trailing newline yet) is left for the next run.
+
+    Returns run statistics, including the dates whose partitions changed.
+    """
+    settings = settings or load_settings()
+    root = settings.parquet_dir
+    state = IngestState.load(root)
+    watermark = pd.Timestamp(state.watermark) if state.watermark else None
+    if raw_paths is None:
+        raw_paths = sorted(settings.raw_dir.glob(RAW_PATTERN))
+
+    work = []
+    for path in map(Path, raw_paths):
+        stat = path.stat()
+        key = str(path.resolve())
+        entry = state.files.get(key)
+        if entry is not None and (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+            continue
+        # a grown export is taken to be appended to; anything else is re-read in full
+        appended = entry is not None and stat.st_size >= entry["size"]
+        start = entry["offset"] if appended else 0
+        work.append((path, key, stat, start, _complete_end(path, stat.st_size), appended))
+
+    start_time = time.perf_counter()
+    # metrics older than the store are rebuilt from it on the next read
+    metrics = None
+    if work and SystemicMetrics.exists(settings.systemic_dir):
+        if not _newer(root, settings.systemic_dir / "hourly.parquet"):
+            metrics = SystemicMetrics.load(settings.systemic_dir)
+    if state.pending:
+        _remove_run(root, state.pending)
+        state.pending = None
+        state.save(root)
+    stats = {"rows": 0, "files": 0, "dates": [], "watermark": state.watermark}
+    if not work:
+        print(f"Nothing new to ingest; watermark {state.watermark}")
+        return stats
+
+    state.pending = uuid.uuid4().hex[:12]
+    state.save(root)
+    sanctions = get_sanctions_index()
+    registry = WalletRegistry(settings.registry_dir)
+    # edges of the new rows only; merged into the saved graph at the end
+    graph = CounterpartyGraphBuilder()
+
+    dates = set()
+    # watermark rows of this state, each consumed by at most one re-exported row
+    seen = Counter(state.watermark_rows)
+    latest = (watermark, list(state.watermark_rows))
+    for path, key, stat, start, end, appended in work:
+        print(f"Ingesting {path} from byte {start:,}" if appended else f"Ingesting {path} past {state.watermark}")
+        for chunk in _raw_chunks(path, start, end, chunksize):
+            ts = _parse_block_timestamps(chunk["block_timestamp"])
+            keys = _row_keys(chunk, ts)
+            if not appended and watermark is not None:
+                keep = (ts > watermark).to_numpy() | _unseen(keys, (ts == watermark).to_numpy(), seen)
+                chunk, keys = chunk[keep], keys[keep]
+            if chunk.empty:
+                continue
+            out = _convert_chunk(chunk, sanctions, registry, graph)
+            if out.empty:
+                continue
+            latest = _latest_rows(latest, out["timestamp"], keys[chunk.index.get_indexer(out.index)])
+            registry.flush()
+            write_parquet_dataset(out, root, overwrite=False, append=True, prefix=f"ingest-{state.pending}")
+            if metrics is not None:
+                metrics.update(out)
+            stats["rows"] += len(out)
+            dates.update(out["date"].dropna().unique())
+        state.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offset": end}
+        stats["files"] += 1
+
+    state.watermark = latest[0].isoformat() if latest[0] is not None else None
+    state.watermark_rows = latest[1]
+    state.pending = None
+    if stats["rows"]:
+        state.last_run = {
+            "at": pd.Timestamp.now(tz="UTC").isoformat(timespec="seconds"),
+            "rows": stats["rows"],
+            "dates": sorted(dates),
+        }
+    # the partitions are committed with the state; derived data follows
+    state.save(root)
+    if stats["rows"]:
+        _update_graph(settings.graph_dir, graph, len(registry))
+        if metrics is not None:
+            metrics.save(settings.systemic_dir)
+
+    elapsed = time.perf_counter() - start_time
+    stats.update(
+        dates=sorted(dates),
+        watermark=state.watermark,
+        seconds=elapsed,
+        rows_per_sec=stats["rows"] / elapsed if elapsed > 0 else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+    )
+    print(
+        f"Ingested {stats['rows']:,} rows from {stats['files']} export(s) into "
+        f"{len(dates)} date partition(s); watermark {state.watermark}"
+    )
+    return stats
+
+
+def record_full_conversion(raw_path: Path, settings: Settings = None) -> IngestState:
+    """
+    Reset the ingest state after a full conversion of ``raw_path`` into the
+    store, so the next ingest continues after it.
+    """
+    settings = settings or load_settings()
+    raw_path = Path(raw_path)
+    timestamps = read_parquet_dataset(settings.parquet_dir, columns=["timestamp"])["timestamp"]
+    watermark = timestamps.max() if timestamps.notna().any() else None
+    watermark_rows = []
+    if watermark is not None:
+        for chunk in pd.read_csv(raw_path, usecols=RAW_COLUMNS, dtype=RAW_DTYPES, chunksize=1_000_000):
+            ts = _parse_block_timestamps(chunk["block_timestamp"])
+            watermark_rows += _row_keys(chunk, ts)[(ts == watermark).to_numpy()].tolist()
+    stat = raw_path.stat()
+    state = IngestState(
+        watermark=watermark.isoformat() if watermark is not None else None,
+        files={str(raw_path.resolve()): {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offset": stat.st_size}},
+        watermark_rows=watermark_rows,
+    )
+    state.save(settings.parquet_dir)
+    return state
+
+
+def _row_keys(chunk: pd.DataFrame, ts: pd.Series) -> np.ndarray:
+    """Hash of each raw transfer (block time, token, sender, recipient, amount), for spotting re-exported rows."""
+    fields = pd.DataFrame({
+        "timestamp": ts,
+        "token_address": chunk["token_address"].str.lower(),
+        "from_address": chunk["from_address"].str.lower(),
+        "to_address": chunk["to_address"].str.lower(),
+        "token_amount": chunk["token_amount"].astype(float),
+    })
+    return pd.util.hash_pandas_object(fields, index=False).to_numpy()
+
+
+def _unseen(keys: np.ndarray, at_watermark: np.ndarray, seen: Counter) -> np.ndarray:
+    """False for the rows at the watermark that match a row ingested there, taking each match once."""
+    unseen = np.ones(len(keys), dtype=bool)
+    for i in np.flatnonzero(at_watermark):
+        key = int(keys[i])
+        if seen[key] > 0:
+            seen[key] -= 1
+            unseen[i] = False
+    return unseen
+
+
+def _latest_rows(latest: tuple, timestamps: pd.Series, keys: np.ndarray) -> tuple:
+    """(latest block time, keys of the rows at it), given the previous pair and new rows."""
+    top = timestamps.max()
+    if pd.isna(top) or (latest[0] is not None and top < latest[0]):
+        return latest
+    at_top = keys[(timestamps == top).to_numpy()].tolist()
+    if latest[0] is not None and top == latest[0]:
+        return latest[0], latest[1] + at_top
+    return top, at_top
+
+
+def _raw_chunks(path: Path, start: int, end: int, chunksize: int):
+    """Chunks of the raw export rows between byte offsets ``start`` and ``end``."""
+    names = list(pd.read_csv(path, nrows=0).columns)
+    with open(path, "rb") as f:
+        start = max(start, len(f.readline()))
+        if start >= end:
+            return
+        f.seek(start)
+        yield from pd.read_csv(
+            io.BufferedReader(_FileSlice(f, end - start)),
+            names=names,
+            header=None,
+            usecols=RAW_COLUMNS,
+            dtype=RAW_DTYPES,
+            chunksize=chunksize,
+        )
+
+
+class _FileSlice(io.RawIOBase):
+    """The next ``length`` bytes of an open file, as a stream."""
+
+    def __init__(self, f, length: int):
+        self._f = f
+        self._left = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._f.read(min(len(buffer), self._left))
+        buffer[:len(data)] = data
+        self._left -= len(data)
+        return len(data)
+
+
+def _complete_end(path: Path, size: int, block: int = 1 << 16) -> int:
+    """Offset just past the last newline in the first ``size`` bytes of ``path``."""
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            pos = start
+    return 0
+
+
+def _update_graph(path: Path, delta: CounterpartyGraphBuilder, n_nodes: int) -> None:
+    """Merge the new edges into the saved counterparty graph (or save them as the graph)."""
+    if not CounterpartyGraph.exists(path):
+        delta.build(n_nodes).save(path)
+        return
+    saved = CounterpartyGraph.load(path)
+    if saved.n_nodes == n_nodes and not len(delta.pairs()[0]):
+        return
+    saved.update(delta, n_nodes).save(path)
+
+
+def _remove_run(root: Path, run: str) -> None:
+    """Delete the partition files of an interrupted run."""
+    for path in Path(root).rglob(f"ingest-{run}-*.parquet"):
+        path.unlink()
+
+
+def _newer(path: Path, than: Path) -> bool:
+    return Path(path).exists() and Path(path).stat().st_mtime > than.stat().st_mtime
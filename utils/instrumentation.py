@@ -0,0 +1,199 @@
+"""Lightweight timings, cache counters and frame sizes of the hot paths."""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+PROMETHEUS_PREFIX = "risk_monitor"
+
+
+class Instruments:
+    """
+    Process-wide registry of what the dashboard and pipeline spend time on.
+
+    - timers: count, total, max and last duration (seconds) per stage
+    - caches: requests and misses per cache (hits are the difference)
+    - frame sizes: latest memory size (bytes) per named frame
+    - counters: plain event totals
+
+    Recording is a ``perf_counter`` call and a dict update under a lock, so
+    the wrappers stay on in production. ``to_json`` and ``to_prometheus``
+    export everything recorded since the process started (or ``reset``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timers = {}
+            self.caches = {}
+            self.frame_sizes = {}
+            self.counters = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timer = self.timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+            timer["last"] = seconds
+
+    def cache_request(self, name: str, misses: int = 0) -> None:
+        self._cache_add(name, 1, misses)
+
+    def cache_miss(self, name: str) -> None:
+        self._cache_add(name, 0, 1)
+
+    def _cache_add(self, name: str, requests: int, misses: int) -> None:
+        with self._lock:
+            cache = self.caches.setdefault(name, {"requests": 0, "misses": 0})
+            cache["requests"] += requests
+            cache["misses"] += misses
+
+    def frame_size(self, name: str, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self.frame_sizes[name] = size
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> dict:
+        """Copy of everything recorded, with means and hit rates filled in."""
+        with self._lock:
+            timers = {
+                name: {**timer, "mean": timer["total"] / timer["count"]}
+                for name, timer in self.timers.items()
+            }
+            caches = {
+                name: {
+                    **cache,
+                    "hits": cache["requests"] - cache["misses"],
+                    "hit_rate": 1 - cache["misses"] / cache["requests"] if cache["requests"] else None,
+                }
+                for name, cache in self.caches.items()
+            }
+            return {
+                "timers": timers,
+                "caches": caches,
+                "frame_sizes": dict(self.frame_sizes),
+                "counters": dict(self.counters),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """Prometheus text exposition format."""
+        data = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, label, key, value in samples:
+                lines.append(f'{prefix}_{name}{suffix}{{{label}="{_escape(key)}"}} {value!r}')
+
+        timers = sorted(data["timers"].items())
+        family(
+            "stage_seconds", "summary", "Time spent per stage.",
+            [(suffix, "stage", name, timer[field])
+             for name, timer in timers for suffix, field in (("_count", "count"), ("_sum", "total"))],
+        )
+        family(
+            "stage_seconds_max", "gauge", "Longest single run per stage.",
+            [("", "stage", name, timer["max"]) for name, timer in timers],
+        )
+        caches = sorted(data["caches"].items())
+        family(
+            "cache_requests_total", "counter", "Cache lookups.",
+            [("", "cache", name, cache["requests"]) for name, cache in caches],
+        )
+        family(
+            "cache_misses_total", "counter", "Cache lookups that computed the value.",
+            [("", "cache", name, cache["misses"]) for name, cache in caches],
+        )
+        family(
+            "frame_bytes", "gauge", "Memory size of the latest frame per name.",
+            [("", "frame", name, size) for name, size in sorted(data["frame_sizes"].items())],
+        )
+        family(
+            "events_total", "counter", "Event counts.",
+            [("", "event", name, n) for name, n in sorted(data["counters"].items())],
+        )
+        return "\n".join(lines) + "\n"
+
+
+INSTRUMENTS = Instruments()
+
+
+@contextmanager
+def timer(name: str):
+    """Time the block as stage ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        INSTRUMENTS.observe(name, time.perf_counter() - start)
+
+
+def timed(name: str = None):
+    """Decorator timing every call as stage ``name`` (default: module.function)."""
+    def decorate(func):
+        label = name or _label(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def instrument_cache(cache_decorator, name: str = None):
+    """
+    Apply a Streamlit cache decorator (``st.cache_data(...)``,
+    ``st.cache_resource(...)``) and record its requests and misses.
+
+    A miss is a call that runs the function: its run is timed as
+    ``<name>.compute``, and every call (hit or miss) as ``<name>``.
+    """
+    def decorate(func):
+        label = name or _label(func)
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            INSTRUMENTS.cache_miss(label)
+            with timer(f"{label}.compute"):
+                return func(*args, **kwargs)
+
+        cached = cache_decorator(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            INSTRUMENTS.cache_request(label)
+            with timer(label):
+                return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorate
+
+
+def _label(func) -> str:
+    return f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,32 +1,94 @@
-import pandas as pd
-from pathlib import Path
-from utils.public_scoring import compute_public_risk_scores
+"""Cached data loaders of the dashboard: a thin Streamlit layer over utils.pipeline."""
+from utils import pipeline
+from utils.cache import file_stamp
+from utils.compact_scores import HASH_FUNCS, CompactScores
+from utils.config import load_settings
+from utils.instrumentation import instrument_cache, timed
+from utils.refresh import RefreshScheduler
+from utils.scoring_weights import ScoringWeights
+from utils.systemic_metrics import SystemicMetrics
+from utils.what_if import ScoreComponents
 import streamlit as st
 
-@st.cache_data
-def load_demo_data():
-    data_path = Path(__file__).parent.parent / "data" / "sample" / "demo_scores.csv"
-    df = pd.read_csv(data_path)
-    df = compute_public_risk_scores(df)
-    return df
-
-@st.cache_data
-def load_real_data() -> pd.DataFrame:
-    """Load anonymized real-world stablecoin data."""
-    path = Path(__file__).parent.parent / "data" / "processed" / "real_scores.csv"
-    df = pd.read_csv(path)
-
-    df = compute_public_risk_scores(df)
-    return df
-
-@st.cache_data
-def load_sanctions_list() -> pd.DataFrame:
-    sanctions_path = Path(st.secrets["sanctions"]["file_path"])
-
-    if not sanctions_path.exists():
-        st.warning("Sanctions list not found.")
-        return pd.DataFrame(columns=["address"])
-
-    df = pd.read_csv(sanctions_path)
-    df["address"] = df["address"].str.lower()
-    return df
\ No newline at end of file
+# Scores are cached as resources: sessions share one (read-only) object
+# instead of unpickling a private copy, and its arrays stay memory-mapped
+# from the pipeline's disk cache, shared with the other server processes.
+
+@st.cache_resource
+def get_refresh_scheduler() -> RefreshScheduler:
+    """
+    The server's background refresher of the full datasets: pages get the
+    current snapshot, and new data is scored off the request path.
+    """
+    settings = load_settings()
+
+    def stamp(source):
+        return lambda: pipeline.dataset_stamp(source, settings=settings)
+
+    def scores_stamp(source):
+        # edited weights re-weight the served scores too, and a new graph,
+        # registry or sanctions list changes the real data's exposure
+        if source == "real":
+            return lambda: (
+                pipeline.dataset_stamp(source, settings=settings),
+                file_stamp(settings.weights_path),
+                pipeline.exposure_stamp(settings),
+            )
+        return lambda: (pipeline.dataset_stamp(source, settings=settings), file_stamp(settings.weights_path))
+
+    return RefreshScheduler(
+        {
+            "demo": (scores_stamp("demo"), lambda: pipeline.score("demo", settings=settings)),
+            "real": (scores_stamp("real"), lambda: pipeline.score("real", settings=settings)),
+            "demo_metrics": (stamp("demo"), lambda: pipeline.systemic_metrics("demo", settings)),
+            "real_metrics": (stamp("real"), lambda: pipeline.systemic_metrics("real", settings)),
+        },
+        interval=settings.refresh_interval_s,
+    )
+
+@timed()
+def load_demo_data() -> CompactScores:
+    return get_refresh_scheduler().get("demo")
+
+@timed()
+def load_real_data(tokens=None, start_date=None, end_date=None) -> CompactScores:
+    """
+    Load anonymized real-world stablecoin data.
+
+    Reads the partitioned Parquet store when it is at least as fresh as the
+    CSV export; token/date filters are then pushed down to the reader. When
+    the converter saved a counterparty graph, scores include the Exposure
+    Score component. The full dataset is the refresher's snapshot; a
+    selection is keyed on the files it reads, so an ingest only reloads the
+    selections whose partitions it changed.
+    """
+    if tokens is None and start_date is None and end_date is None:
+        return get_refresh_scheduler().get("real")
+    settings = load_settings()
+    stamp = (
+        pipeline.dataset_stamp("real", tokens, start_date, end_date, settings),
+        file_stamp(settings.weights_path),
+        pipeline.exposure_stamp(settings),
+    )
+    return _load_real_data(tokens, start_date, end_date, stamp)
+
+@instrument_cache(st.cache_resource(max_entries=8))
+def _load_real_data(tokens, start_date, end_date, stamp) -> CompactScores:
+    return pipeline.score("real", tokens, start_date, end_date)
+
+@instrument_cache(st.cache_resource(max_entries=2, hash_funcs=HASH_FUNCS))
+def get_score_components(scores: CompactScores) -> ScoreComponents:
+    """Component scores of a dataset laid out for re-weighting (one per dataset version)."""
+    return ScoreComponents(scores)
+
+@instrument_cache(
+    st.cache_resource(max_entries=4, hash_funcs={**HASH_FUNCS, ScoringWeights: lambda weights: weights.fingerprint})
+)
+def load_what_if_scores(scores: CompactScores, weights: ScoringWeights) -> CompactScores:
+    """``scores`` re-weighted with what-if ``weights``, from the cached components."""
+    return get_score_components(scores).rescore(weights)
+
+@timed()
+def load_systemic_metrics(demo: bool = False) -> SystemicMetrics:
+    """Precomputed systemic metrics of the demo or real dataset (shared, read-only)."""
+    return get_refresh_scheduler().get("demo_metrics" if demo else "real_metrics")
@@ -0,0 +1,225 @@
+"""Two-pass, out-of-core variant of the public risk scorer over date partitions."""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.columnar_store import iter_parquet_dates
+from utils.public_scoring import (
+    _concentration_score,
+    _ensure_sanctions_flag,
+    _exposure_score,
+    _gather_wallet_values,
+    _log_volume,
+    _risk_score,
+    _sanctions_score,
+    _scale_active_hours,
+    _scale_to_max,
+    _token_profile_score,
+    _velocity_score,
+)
+from utils.rollups import build_rollups, merge_rollups
+from utils.scoring_weights import DEFAULT_WEIGHTS, ScoringWeights
+from utils.wallet_stats import WalletAccumulator
+
+WALLET_SCORES = {
+    "concentration_score": "Concentration Score",
+    "velocity_score": "Velocity Score",
+    "sanctions_score": "Sanctions Score",
+    "burst_score": "Burst Score",
+    "time_score": "Time Score",
+    "exposure_score": "Exposure Score",
+}
+
+
+class OutOfCoreScorer:
+    """
+    Scores a dataset one partition at a time, keeping per-wallet state only.
+
+    Pass 1 (``aggregate``) folds every partition into running wallet
+    aggregates: total volume, tx count, sanctioned volume, rolling-hour
+    burst and active hours/days, plus the largest log volume. ``finalize``
+    turns them into wallet scores against the global maxima, and pass 2
+    (``score``) streams the partitions again to score their rows. Memory
+    grows with the number of wallets, never with the number of rows.
+
+    Partitions must come in time order and cover disjoint time ranges, as
+    date partitions do (the converter derives the date from the block time);
+    see WalletAccumulator, which keeps the pass 1 state. The scores equal
+    the in-memory scorer's (float volume sums may differ in the last ulp
+    because they are accumulated per partition).
+    """
+
+    def __init__(self, exposure: pd.Series = None, weights: ScoringWeights = DEFAULT_WEIGHTS):
+        self.exposure = exposure
+        self.weights = weights
+        self._wallets = WalletAccumulator()
+        self._label_array = None
+
+        self.wallet_scores = None
+        self._risk_sum = None
+        self._risk_max = None
+        self._flagged = None
+        self._rollups = []
+
+    @property
+    def n_wallets(self) -> int:
+        return self._wallets.n_wallets
+
+    def aggregate(self, partition: pd.DataFrame) -> None:
+        """Pass 1: fold a partition into the wallet aggregates."""
+        self._wallets.add(partition)
+
+    def finalize(self) -> pd.DataFrame:
+        """Wallet aggregates and scores against the global maxima (after pass 1)."""
+        wallet_agg = self._wallets.statistics()
+        wallet_agg["concentration_score"] = _concentration_score(wallet_agg)
+        wallet_agg["velocity_score"] = _velocity_score(wallet_agg)
+        wallet_agg["sanctions_score"] = _sanctions_score(wallet_agg)
+        wallet_agg["burst_score"] = _scale_to_max(wallet_agg["wallet_burst"], wallet_agg["wallet_burst"].max())
+        wallet_agg["time_score"] = _scale_active_hours(wallet_agg["active_hours"], wallet_agg["active_days"])
+        if self.exposure is not None:
+            wallet_agg["exposure_score"] = _exposure_score(wallet_agg, self.exposure)
+
+        self.wallet_scores = wallet_agg
+        self._label_array = np.asarray(self._wallets.labels, dtype=object)
+        self._risk_sum = np.zeros(self.n_wallets)
+        self._risk_max = np.zeros(self.n_wallets)
+        self._flagged = np.zeros(self.n_wallets, dtype=bool)
+        self._rollups = []
+        return wallet_agg
+
+    def score(self, partition: pd.DataFrame) -> pd.DataFrame:
+        """Pass 2: the partition's rows in the compact layout, with their Risk Score."""
+        if self.wallet_scores is None:
+            raise RuntimeError("finalize() must run between the two passes")
+        partition = _ensure_sanctions_flag(partition.reset_index(drop=True))
+        codes = self._wallets.codes(partition["wallet_id"])
+
+        parts = pd.DataFrame({
+            "volume_score": _scale_to_max(_log_volume(partition), self._wallets.max_log).to_numpy(),
+            "token_profile_score": _token_profile_score(partition, self.weights).to_numpy(),
+            "sanctions_flag": partition["sanctions_flag"].to_numpy(),
+            "tx_volume_usd": partition["tx_volume_usd"].to_numpy(),
+        })
+        for col in ["concentration_score", "velocity_score", "burst_score", "time_score", "exposure_score"]:
+            if col in self.wallet_scores.columns:
+                parts[col] = _gather_wallet_values(self.wallet_scores[col].to_numpy(), codes)
+        risk = _risk_score(parts, self.weights).to_numpy()
+
+        # rows without a wallet (code -1) keep NaN scores and join no wallet
+        known = codes >= 0
+        self._risk_sum += np.bincount(codes[known], weights=risk[known], minlength=self.n_wallets)
+        np.maximum.at(self._risk_max, codes[known], risk[known])
+        sanctioned = partition["sanctions_flag"].to_numpy() == 1
+        self._flagged[codes[sanctioned & known]] = True
+
+        local, inverse = np.unique(codes[known], return_inverse=True)
+        local_codes = np.full(len(codes), -1, dtype=np.int64)
+        local_codes[known] = inverse
+        transactions = pd.DataFrame({
+            "Date": partition["date"].astype(str).astype("category"),
+            "Hour": partition["hour"],
+            "Token": partition["token"].astype(str).astype("category"),
+            "Wallet": pd.Categorical.from_codes(
+                local_codes, categories=pd.Index(self._label_array[local]).astype(str)
+            ),
+            "Volume": partition["tx_volume_usd"],
+            "Sanctioned": partition["sanctions_flag"].astype(np.int8),
+            "Risk Score": risk.astype(np.float32),
+        })
+        self._rollups.append(build_rollups(transactions))
+        return transactions
+
+    def wallets(self) -> pd.DataFrame:
+        """The wallet table of a CompactScores (after pass 2), sorted by wallet."""
+        agg = self.wallet_scores
+        state = self._wallets
+        n_tx = np.maximum(state.n_tx, 1)
+        wallets = pd.DataFrame({"Wallet": pd.Index(state.labels, dtype=object).astype(str)})
+        for col, name in WALLET_SCORES.items():
+            if col in agg.columns:
+                wallets[name] = agg[col].to_numpy(dtype=np.float32)
+        wallets["Total Volume"] = state.total_volume
+        wallets["Transactions"] = state.n_tx
+        wallets["Sanctioned Volume"] = state.sanctions_volume
+        wallets["Average Risk"] = (self._risk_sum / n_tx).astype(np.float32)
+        wallets["Max Risk"] = self._risk_max.astype(np.float32)
+        return wallets.sort_values("Wallet", ignore_index=True)
+
+    def rollups(self):
+        """Dashboard rollups of every row scored in pass 2."""
+        return merge_rollups(
+            self._rollups,
+            unique_wallets=int(np.count_nonzero(self._wallets.n_tx)),
+            flagged_wallets=int(self._flagged.sum()),
+        )
+
+
+def score_parquet_dataset(
+    root: Path,
+    out_dir: Path,
+    tokens=None,
+    start_date: str = None,
+    end_date: str = None,
+    exposure: pd.Series = None,
+    weights: ScoringWeights = DEFAULT_WEIGHTS,
+) -> dict:
+    """
+    Score a partitioned Parquet dataset (see utils.columnar_store) out of core.
+
+    Reads one date partition at a time, twice, and writes:
+
+        out_dir/transactions/date=YYYY-MM-DD/part-0.parquet   scored rows
+        out_dir/wallets.parquet                              wallet table
+        out_dir/volume.parquet, tokens.parquet,
+        out_dir/risk_histogram.parquet, kpis.json            rollups
+
+    The scored rows are written to a temporary directory and swapped in at
+    the end, so no partition of an earlier run survives. Returns the KPIs.
+    """
+    out_dir = Path(out_dir)
+
+    def partitions():
+        return iter_parquet_dates(root, tokens=tokens, start_date=start_date, end_date=end_date)
+
+    scorer = OutOfCoreScorer(exposure, weights)
+    for _, partition in partitions():
+        scorer.aggregate(partition)
+    scorer.finalize()
+
+    transactions_dir = out_dir / "transactions"
+    tmp_dir = out_dir / f".transactions.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for date, partition in partitions():
+        if partition.empty:
+            continue
+        scored = scorer.score(partition).drop(columns="Date")
+        path = tmp_dir / f"date={date}"
+        path.mkdir()
+        pq.write_table(pa.Table.from_pandas(scored, preserve_index=False), path / "part-0.parquet")
+
+    # swap in the new partitions, dropping those of an earlier run
+    old_dir = out_dir / f".transactions.{os.getpid()}.old"
+    if transactions_dir.exists():
+        os.rename(transactions_dir, old_dir)
+    os.rename(tmp_dir, transactions_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    scorer.wallets().to_parquet(out_dir / "wallets.parquet", index=False)
+    if scorer.n_wallets == 0:
+        return {}
+    rollups = scorer.rollups()
+    rollups.volume.to_parquet(out_dir / "volume.parquet", index=False)
+    rollups.tokens.to_parquet(out_dir / "tokens.parquet", index=False)
+    rollups.risk_histogram.to_frame().to_parquet(out_dir / "risk_histogram.parquet", index=False)
+    with open(out_dir / "kpis.json", "w") as f:
+        json.dump(rollups.kpis, f, indent=2, default=lambda value: value.item())
+    return rollups.kpis
+
@@ -0,0 +1,169 @@
+"""Wallet-sharded, multi-process variant of the public risk scorer."""
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.public_scoring import (
+    _burst_score,
+    _compute_risk_scores_internal,
+    _concentration_score,
+    _ensure_sanctions_flag,
+    _exposure_score,
+    _gather_wallet_values,
+    _log_volume,
+    _risk_score,
+    _sanctions_score,
+    _time_activity_score,
+    _token_profile_score,
+    _tx_per_active_day,
+    _velocity_score,
+    _volume_score,
+    _wallet_aggregates,
+    _wide_layout,
+)
+from utils.scoring_weights import DEFAULT_WEIGHTS, ScoringWeights
+from utils.wallet_stats import WalletGrouper
+
+# Input columns the workers read; only these are sent to them.
+SHARD_COLUMNS = ["wallet_id", "date", "hour", "timestamp", "token", "tx_volume_usd", "sanctions_flag"]
+
+# Per-row scores the workers send back, in the serial scorer's column order.
+ROW_SCORES = ["volume_score", "token_profile_score"]
+WALLET_SCORES = ["concentration_score", "velocity_score", "sanctions_score", "burst_score", "time_score"]
+
+
+def compute_risk_scores_parallel(
+    df: pd.DataFrame,
+    n_jobs: int = None,
+    n_shards: int = None,
+    exposure: pd.Series = None,
+    weights: ScoringWeights = DEFAULT_WEIGHTS,
+) -> pd.DataFrame:
+    """
+    Score transactions across worker processes; same frame as the serial scorer.
+
+    Rows are sharded by a hash of ``wallet_id``, so every wallet lives in
+    exactly one shard, and each worker process owns ``n_shards / n_jobs``
+    shards. A worker receives the columns it reads once and keeps them for
+    both rounds: it aggregates its wallets and reports its local maxima,
+    the parent reduces them to the global maxima the normalized scores
+    need, and the worker then scores its wallets and finishes its own rows,
+    returning only their score columns. The parent puts those back by
+    original position next to the input columns. Wallet sums see the same
+    rows in the same order as in the serial path, so the result is
+    identical to ``_compute_risk_scores_internal`` (row order and index
+    included); ``exposure`` and ``weights`` are as there.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs <= 1 or len(df) == 0:
+        return _compute_risk_scores_internal(df, exposure, weights)
+    n_shards = max(n_shards or n_jobs, n_jobs)
+
+    worker = shard_by_wallet(df["wallet_id"], n_shards) % n_jobs
+    order = np.argsort(worker, kind="stable")
+    bounds = np.searchsorted(worker[order], np.arange(n_jobs + 1))
+    positions = [order[lo:hi] for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+    narrow = df[[column for column in SHARD_COLUMNS if column in df.columns]]
+
+    context = multiprocessing.get_context()
+    pipes, processes = [], []
+    try:
+        for pos in positions:
+            parent_end, child_end = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(child_end,), daemon=True)
+            process.start()
+            child_end.close()
+            parent_end.send((narrow.iloc[pos], exposure, weights))
+            pipes.append(parent_end)
+            processes.append(process)
+
+        maxima = _reduce_maxima([_receive(pipe) for pipe in pipes])
+        for pipe in pipes:
+            pipe.send(maxima)
+        scored = [_receive(pipe) for pipe in pipes]
+    finally:
+        for pipe in pipes:
+            pipe.close()
+        for process in processes:
+            process.join()
+
+    out = df.copy().reset_index(drop=True)
+    columns = ROW_SCORES + WALLET_SCORES + (["exposure_score"] if exposure is not None else [])
+    for name in columns + ["risk_score_public"]:
+        values = np.empty(len(out))
+        for pos, part in zip(positions, scored):
+            values[pos] = part[name]
+        out[name] = values
+        if name == ROW_SCORES[-1]:
+            # where the serial scorer adds a missing flag column
+            out = _ensure_sanctions_flag(out)
+    return _wide_layout(out)
+
+
+def shard_by_wallet(wallets: pd.Series, n_shards: int) -> np.ndarray:
+    """Shard number of each row, from a stable hash of its wallet label."""
+    codes, labels = pd.factorize(wallets)
+    wallet_shard = pd.util.hash_array(np.asarray(labels, dtype=object)) % np.uint64(n_shards)
+    return np.where(codes >= 0, wallet_shard.astype(np.int64)[codes], 0)
+
+
+def _shard_worker(conn) -> None:
+    """One worker: aggregate, report local maxima, then score its rows against the global ones."""
+    try:
+        shard, exposure, weights = conn.recv()
+        df = _ensure_sanctions_flag(shard.reset_index(drop=True))
+        grouper = WalletGrouper.from_frame(df)
+        wallet_agg = _wallet_aggregates(df, grouper)
+        conn.send(_local_maxima(df, wallet_agg))
+        conn.send(_score_shard(df, grouper, wallet_agg, conn.recv(), exposure, weights))
+    except Exception as e:
+        conn.send(e)
+    finally:
+        conn.close()
+
+
+def _receive(conn):
+    reply = conn.recv()
+    if isinstance(reply, Exception):
+        raise reply
+    return reply
+
+
+def _local_maxima(df: pd.DataFrame, wallet_agg: pd.DataFrame) -> dict:
+    return {
+        "log": _log_volume(df).max(),
+        "volume": wallet_agg["wallet_total_volume"].max(),
+        "rate": _tx_per_active_day(wallet_agg["wallet_n_tx"], wallet_agg["active_days"]).max(),
+        "sanctions": wallet_agg["wallet_sanctions_volume"].max(),
+        "burst": wallet_agg["wallet_burst"].max(),
+    }
+
+
+def _reduce_maxima(local: list) -> dict:
+    return {name: max(m[name] for m in local) for name in local[0]}
+
+
+def _score_shard(df, grouper, wallet_agg, maxima, exposure, weights) -> dict:
+    """Score columns of one shard's rows (in shard order) against the global maxima."""
+    wallet_agg["concentration_score"] = _concentration_score(wallet_agg, maxima["volume"])
+    wallet_agg["velocity_score"] = _velocity_score(wallet_agg, maxima["rate"])
+    wallet_agg["sanctions_score"] = _sanctions_score(wallet_agg, maxima["sanctions"])
+    wallet_agg["burst_score"] = _burst_score(df, wallet_agg, maxima["burst"])
+    wallet_agg["time_score"] = _time_activity_score(df, wallet_agg)
+    columns = list(WALLET_SCORES)
+    if exposure is not None:
+        wallet_agg["exposure_score"] = _exposure_score(wallet_agg, exposure)
+        columns.append("exposure_score")
+
+    parts = pd.DataFrame({
+        "volume_score": _volume_score(df, maxima["log"]).to_numpy(dtype=float),
+        "token_profile_score": _token_profile_score(df, weights).to_numpy(dtype=float),
+        "sanctions_flag": df["sanctions_flag"].to_numpy(),
+        "tx_volume_usd": df["tx_volume_usd"].to_numpy(),
+    })
+    for col in columns:
+        parts[col] = _gather_wallet_values(wallet_agg[col].to_numpy(dtype=float), grouper.codes)
+    parts["risk_score_public"] = _risk_score(parts, weights).to_numpy()
+    return {col: parts[col].to_numpy() for col in ROW_SCORES + columns + ["risk_score_public"]}
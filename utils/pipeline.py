@@ -0,0 +1,308 @@
+"""
+Headless scoring pipeline: the library behind the CLI and the dashboard.
+
+Nothing here imports Streamlit, so batch jobs and workers can load, score
+and aggregate datasets without the web runtime. Results are cached by the
+backend configured in utils.config; with the (default) disk backend,
+scored datasets persist across restarts and are shared, memory-mapped, by
+every dashboard process and CLI run on the same cache directory.
+"""
+import pandas as pd
+
+from utils.cache import NullCache, cache_key, file_stamp, make_cache
+from utils.columnar_store import parquet_dataset_exists, partition_stamp, read_parquet_dataset
+from utils.compact_scores import CompactScores
+from utils.config import Settings, load_settings
+from utils.convert_real_data import convert_raw_to_real_scores, convert_raw_to_real_scores_streaming
+from utils.counterparty_graph import CounterpartyGraph, wallet_exposure
+from utils.ingest import IngestState, ingest_raw_exports, record_full_conversion
+from utils.instrumentation import INSTRUMENTS, timer
+from utils.out_of_core import score_parquet_dataset
+from utils.public_scoring import compute_public_risk_scores
+from utils.rollups import RISK_BINS
+from utils.sanctions_index import get_sanctions_index, sanctions_list_path
+from utils.scoring_weights import DEFAULT_WEIGHTS, ScoringWeights, load_weights
+from utils.systemic_metrics import SystemicMetrics
+from utils.wallet_registry import WalletRegistry
+from utils.what_if import rescore, with_exposure
+
+SOURCES = ("demo", "real")
+
+# Bump when scoring output changes, so cached scores are not reused.
+CACHE_VERSION = 5
+
+WALLET_TABLE_COLUMNS = [
+    "Wallet",
+    "Total Volume",
+    "Transactions",
+    "Average Risk",
+    "Max Risk",
+    "Sanctioned Volume",
+]
+
+_caches = {}
+
+
+def score(
+    source: str = "demo",
+    tokens=None,
+    start_date=None,
+    end_date=None,
+    settings: Settings = None,
+    cache: NullCache = None,
+    weights: ScoringWeights = None,
+) -> CompactScores:
+    """
+    Score the demo or real dataset (optionally filtered by token and date).
+
+    Real data is scored with counterparty exposure when a graph exists. The
+    row scores are cached on the dataset's files and the filters, so an
+    unchanged dataset is never scored twice. From the Parquet store only the
+    partitions the filters select count, so an ingest leaves the scores of
+    date ranges it did not touch cached.
+
+    Exposure propagates over the whole graph, which every ingest updates, so
+    it is a separately refreshed input: it is cached on the graph, registry
+    and sanctions list (see ``exposure_stamp``) and added to the cached row
+    scores by re-weighting their components (see utils.what_if), never by
+    re-scoring the rows.
+
+    ``weights`` default to the configured ones (``settings.weights_path``).
+    The component scores are cached apart from the weights, so editing the
+    weights only re-weights the cached components (see utils.what_if).
+    """
+    settings = settings or load_settings()
+    cache = get_cache(settings) if cache is None else cache
+    weights = weights or scoring_weights(settings)
+    tokens = tuple(sorted(tokens)) if tokens is not None else None
+
+    stamp = dataset_stamp(source, tokens, start_date, end_date, settings)
+    key = cache_key("score", _scoring_version(), source, tokens, start_date, end_date, stamp)
+
+    def compute():
+        df = read_dataset(source, tokens, start_date, end_date, settings)
+        scores = compute_public_risk_scores(df, compact=True, weights=DEFAULT_WEIGHTS)
+        # deep sizes walk every string, so they are taken on a miss only
+        INSTRUMENTS.frame_size(f"scores.{source}.transactions", scores.transactions)
+        INSTRUMENTS.frame_size(f"scores.{source}.wallets", scores.wallets)
+        return scores
+
+    with timer(f"pipeline.score.{source}"):
+        scores = cache.get_or_compute(key, compute)
+        if source == "real" and CounterpartyGraph.exists(settings.graph_dir):
+            key = cache_key("exposure", key, *exposure_stamp(settings))
+            scores = cache.get_or_compute(key, lambda: with_exposure(scores, load_wallet_exposure(settings)))
+        if weights != scores.weights:
+            scores = cache.get_or_compute(
+                cache_key("rescore", key, weights.fingerprint), lambda: rescore(scores, weights)
+            )
+    return scores
+
+
+def score_out_of_core(out_dir, tokens=None, start_date=None, end_date=None, settings: Settings = None) -> dict:
+    """
+    Score the real Parquet store one date partition at a time and write the
+    scored rows, wallet table and rollups under ``out_dir`` (see
+    utils.out_of_core); for stores larger than memory. Returns the KPIs.
+    """
+    settings = settings or load_settings()
+    if not real_data_is_parquet(settings):
+        raise FileNotFoundError(f"No up-to-date Parquet store at {settings.parquet_dir}; run convert first")
+    return score_parquet_dataset(
+        settings.parquet_dir,
+        out_dir,
+        tokens=tokens,
+        start_date=start_date,
+        end_date=end_date,
+        exposure=load_wallet_exposure(settings),
+        weights=scoring_weights(settings),
+    )
+
+
+def read_dataset(
+    source: str = "demo",
+    tokens=None,
+    start_date=None,
+    end_date=None,
+    settings: Settings = None,
+) -> pd.DataFrame:
+    """
+    Raw rows of the demo or real dataset.
+
+    Real data comes from the partitioned Parquet store when it is at least as
+    fresh as the CSV export; token/date filters are then pushed down to the
+    reader.
+    """
+    settings = settings or load_settings()
+    _check_source(source)
+    if source == "real" and real_data_is_parquet(settings):
+        return read_parquet_dataset(
+            settings.parquet_dir, tokens=tokens, start_date=start_date, end_date=end_date
+        )
+
+    df = pd.read_csv(dataset_path(source, settings))
+    if tokens is not None:
+        df = df[df["token"].isin(tokens)]
+    if start_date is not None:
+        df = df[df["date"] >= str(start_date)]
+    if end_date is not None:
+        df = df[df["date"] <= str(end_date)]
+    return df.reset_index(drop=True)
+
+
+def dataset_path(source: str, settings: Settings):
+    """File (or Parquet directory) the source is read from."""
+    _check_source(source)
+    if source == "demo":
+        return settings.demo_path
+    return settings.parquet_dir if real_data_is_parquet(settings) else settings.real_csv_path
+
+
+def dataset_stamp(source: str = "demo", tokens=None, start_date=None, end_date=None, settings: Settings = None):
+    """Stamp of the files a read of the dataset with these filters depends on."""
+    settings = settings or load_settings()
+    path = dataset_path(source, settings)
+    if source == "real" and path == settings.parquet_dir:
+        return partition_stamp(path, tokens, start_date, end_date)
+    return file_stamp(path)
+
+
+def real_data_is_parquet(settings: Settings) -> bool:
+    """Whether the Parquet store is the freshest copy of the real dataset."""
+    csv = settings.real_csv_path
+    return parquet_dataset_exists(settings.parquet_dir) and (
+        not csv.exists() or settings.parquet_dir.stat().st_mtime >= csv.stat().st_mtime
+    )
+
+
+def exposure_stamp(settings: Settings = None) -> tuple:
+    """Stamps of the inputs of ``load_wallet_exposure``: graph, registry and sanctions list."""
+    settings = settings or load_settings()
+    return file_stamp(settings.graph_dir), file_stamp(settings.registry_dir), _sanctions_stamp()
+
+
+def load_wallet_exposure(settings: Settings = None):
+    """Counterparty sanctions exposure by wallet, or None without a graph."""
+    settings = settings or load_settings()
+    if not CounterpartyGraph.exists(settings.graph_dir):
+        return None
+    try:
+        sanctioned = get_sanctions_index().keys
+    except KeyError:
+        return None
+    return wallet_exposure(
+        CounterpartyGraph.load(settings.graph_dir), WalletRegistry(settings.registry_dir), sanctioned
+    )
+
+
+def systemic_metrics(source: str = "demo", settings: Settings = None) -> SystemicMetrics:
+    """
+    Precomputed systemic metrics of the demo or real dataset.
+
+    The converter updates the real store batch by batch. A store that is
+    missing or older than its dataset (e.g. a newly generated demo file) is
+    rebuilt from the dataset once and saved.
+    """
+    settings = settings or load_settings()
+    store = settings.demo_systemic_dir if source == "demo" else settings.systemic_dir
+    dataset = dataset_path(source, settings)
+
+    if not dataset.exists():
+        return SystemicMetrics.load(store) if SystemicMetrics.exists(store) else SystemicMetrics()
+    stale = not SystemicMetrics.exists(store) or (
+        (store / "hourly.parquet").stat().st_mtime < dataset.stat().st_mtime
+    )
+    if not stale:
+        return SystemicMetrics.load(store)
+
+    if dataset.is_dir():
+        metrics = SystemicMetrics.from_frame(read_parquet_dataset(dataset))
+    else:
+        metrics = SystemicMetrics()
+        for chunk in pd.read_csv(dataset, chunksize=1_000_000):
+            metrics.update(chunk)
+    metrics.save(store)
+    return metrics
+
+
+def wallet_table(scores: CompactScores) -> pd.DataFrame:
+    """Wallet-level table, read from the statistics computed at scoring time."""
+    wallet_agg = scores.wallets[WALLET_TABLE_COLUMNS]
+    return wallet_agg.sort_values(["Average Risk"], ascending=[False])
+
+
+def aggregate(scores: CompactScores) -> dict:
+    """The dashboard's aggregates of a scored dataset: KPIs and summary tables."""
+    rollups = scores.rollups
+    return {
+        "kpis": rollups.kpis,
+        "volume": rollups.volume,
+        "tokens": rollups.tokens,
+        "risk_histogram": rollups.risk_histogram.to_frame(),
+        "wallets": wallet_table(scores),
+    }
+
+
+def convert(
+    stream: bool = True,
+    output_format: str = "parquet",
+    chunksize: int = 1_000_000,
+    raw_path=None,
+    settings: Settings = None,
+):
+    """Convert the raw export (see utils.convert_real_data); returns stats when streaming."""
+    settings = settings or load_settings()
+    if raw_path is not None:
+        settings = Settings(**{**vars(settings), "raw_path": raw_path})
+    if stream:
+        stats = convert_raw_to_real_scores_streaming(
+            output_format=output_format, chunksize=chunksize, settings=settings
+        )
+    else:
+        stats = convert_raw_to_real_scores(output_format=output_format, settings=settings)
+    if output_format == "parquet":
+        # the rebuilt store holds the whole export; ingest continues after it
+        record_full_conversion(settings.raw_path, settings)
+    return stats
+
+
+def scoring_weights(settings: Settings = None) -> ScoringWeights:
+    """Scoring weights configured at ``settings.weights_path`` (the defaults without a file)."""
+    settings = settings or load_settings()
+    return load_weights(settings.weights_path)
+
+
+def ingest(raw_paths=None, chunksize: int = 1_000_000, settings: Settings = None) -> dict:
+    """Append what is new in the raw exports to the Parquet store (see utils.ingest); returns run stats."""
+    return ingest_raw_exports(raw_paths, chunksize=chunksize, settings=settings or load_settings())
+
+
+def ingest_state(settings: Settings = None) -> IngestState:
+    """Watermark and last run of the incremental ingest."""
+    settings = settings or load_settings()
+    return IngestState.load(settings.parquet_dir)
+
+
+def get_cache(settings: Settings) -> NullCache:
+    """Process-wide cache for the configured backend."""
+    key = (settings.cache_backend, str(settings.cache_dir))
+    if key not in _caches:
+        _caches[key] = make_cache(settings)
+    return _caches[key]
+
+
+def _scoring_version():
+    """Parameters the scores depend on besides the inputs."""
+    return (CACHE_VERSION, DEFAULT_WEIGHTS.fingerprint, RISK_BINS)
+
+
+def _sanctions_stamp():
+    try:
+        return file_stamp(sanctions_list_path())
+    except KeyError:
+        return None
+
+
+def _check_source(source: str) -> None:
+    if source not in SOURCES:
+        raise ValueError(f"source must be one of {SOURCES}, got {source!r}")
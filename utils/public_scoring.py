@@ -1,13 +1,35 @@
 import pandas as pd
 import numpy as np
-import streamlit as st
-
-@st.cache_data
-def compute_public_risk_scores(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute risk scores with caching to improve performance."""
-    return _compute_risk_scores_internal(df)
+from utils.compact_scores import CompactScores
+from utils.instrumentation import timed
+from utils.rollups import build_rollups
+from utils.scoring_weights import DEFAULT_WEIGHTS, ScoringWeights, component_columns
+from utils.wallet_stats import WalletGrouper, wallet_statistics
+
+
+@timed()
+def compute_public_risk_scores(
+    df: pd.DataFrame,
+    compact: bool = False,
+    exposure: pd.Series = None,
+    weights: ScoringWeights = None,
+):
+    """
+    Compute risk scores (callers cache the result: see utils.pipeline).
 
-def _compute_risk_scores_internal(df: pd.DataFrame) -> pd.DataFrame:
+    With ``compact=True`` returns a CompactScores instead of the wide frame.
+    ``exposure`` (counterparty sanctions exposure, 0–1, indexed by wallet id)
+    adds the Exposure Score component. ``weights`` (default: the built-in
+    ones) sets the component weights, token baselines and sanctions multiplier.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    if compact:
+        return _compute_compact_scores_internal(df, exposure, weights)
+    return _compute_risk_scores_internal(df, exposure, weights)
+
+def _compute_risk_scores_internal(
+    df: pd.DataFrame, exposure: pd.Series = None, weights: ScoringWeights = DEFAULT_WEIGHTS
+) -> pd.DataFrame:
     """Internal scoring function called by cached wrapper."""
     df = df.copy()
 
@@ -15,7 +37,7 @@ def _compute_risk_scores_internal(df: pd.DataFrame) -> pd.DataFrame:
     df["volume_score"] = _volume_score(df)
 
     # token profile score
-    df["token_profile_score"] = _token_profile_score(df)
+    df["token_profile_score"] = _token_profile_score(df, weights)
 
     # sanctions flag normalization
     df = _ensure_sanctions_flag(df)
@@ -29,43 +51,135 @@ def _compute_risk_scores_internal(df: pd.DataFrame) -> pd.DataFrame:
     wallet_agg["sanctions_score"] = _sanctions_score(wallet_agg)
     wallet_agg["burst_score"] = _burst_score(df, wallet_agg)
     wallet_agg["time_score"] = _time_activity_score(df, wallet_agg)
+    if exposure is not None:
+        wallet_agg["exposure_score"] = _exposure_score(wallet_agg, exposure)
 
-    # merge back to each transaction
-    df = df.merge(
-        wallet_agg[
-            [
-                "wallet_id",
-                "concentration_score",
-                "velocity_score",
-                "sanctions_score",
-                "burst_score",
-                "time_score",
-            ]
-        ],
-        on="wallet_id",
-        how="left",
-    )
+    return _finalize_scores(df, wallet_agg, weights)
 
-    base_score = (
-        0.25 * df["volume_score"]
-        + 0.20 * df["token_profile_score"]
-        + 0.20 * df["concentration_score"]
-        + 0.20 * df["velocity_score"]
-        + 0.10 * df["burst_score"]
-        + 0.05 * df["time_score"]
-)
 
-    df["risk_score_public"] = base_score
+def _compute_compact_scores_internal(
+    df: pd.DataFrame, exposure: pd.Series = None, weights: ScoringWeights = DEFAULT_WEIGHTS
+) -> CompactScores:
+    """
+    Same scores as _compute_risk_scores_internal in the compact layout.
 
-    sanctions_multiplier = np.where(
-        df["sanctions_flag"] == 1,
-        1 + np.log10(df["tx_volume_usd"].clip(lower=1)) / 2,
-        1.0
+    Works on a narrow view of the input instead of a full copy, and never
+    merges wallet-level scores onto the rows.
+    """
+    work = pd.DataFrame({
+        "date": df["date"],
+        "hour": df["hour"],
+        "token": df["token"],
+        "wallet_id": df["wallet_id"],
+        "tx_volume_usd": df["tx_volume_usd"],
+    })
+    if "timestamp" in df.columns:
+        work["timestamp"] = df["timestamp"]
+    if "sanctions_flag" in df.columns:
+        work["sanctions_flag"] = df["sanctions_flag"]
+    work = _ensure_sanctions_flag(work)
+
+    log_vol = _log_volume(work)
+    max_log = log_vol.max()
+
+    grouper = WalletGrouper.from_frame(work)
+    wallet_agg = _wallet_aggregates(work, grouper)
+    wallet_agg["concentration_score"] = _concentration_score(wallet_agg)
+    wallet_agg["velocity_score"] = _velocity_score(wallet_agg)
+    wallet_agg["sanctions_score"] = _sanctions_score(wallet_agg)
+    wallet_agg["burst_score"] = _burst_score(work, wallet_agg)
+    wallet_agg["time_score"] = _time_activity_score(work, wallet_agg)
+    if exposure is not None:
+        wallet_agg["exposure_score"] = _exposure_score(wallet_agg, exposure)
+
+    wallet_labels = grouper.wallets
+    codes = grouper.codes
+
+    # composite from gathered wallet scores, without a per-row merge
+    parts = pd.DataFrame({
+        "volume_score": _scale_to_max(log_vol, max_log).to_numpy(),
+        "token_profile_score": _token_profile_score(work, weights).to_numpy(),
+        "sanctions_flag": work["sanctions_flag"].to_numpy(),
+        "tx_volume_usd": work["tx_volume_usd"].to_numpy(),
+    })
+    for col in ["concentration_score", "velocity_score", "burst_score", "time_score", "exposure_score"]:
+        if col in wallet_agg.columns:
+            parts[col] = _gather_wallet_values(wallet_agg[col].to_numpy(), codes)
+    risk = _risk_score(parts, weights).to_numpy()
+    del parts
+
+    transactions = pd.DataFrame({
+        "Date": df["date"].astype("category"),
+        "Hour": _compact_int(df["hour"]),
+        "Token": df["token"].astype("category"),
+        "Wallet": pd.Categorical.from_codes(codes, categories=wallet_labels),
+        "Volume": work["tx_volume_usd"],
+        "Sanctioned": work["sanctions_flag"].astype(np.int8),
+        "Risk Score": risk.astype(np.float32),
+    }).reset_index(drop=True)
+
+    wallets = pd.DataFrame({
+        "Wallet": wallet_labels,
+        "Concentration Score": wallet_agg["concentration_score"].to_numpy(dtype=np.float32),
+        "Velocity Score": wallet_agg["velocity_score"].to_numpy(dtype=np.float32),
+        "Sanctions Score": wallet_agg["sanctions_score"].to_numpy(dtype=np.float32),
+        "Burst Score": wallet_agg["burst_score"].to_numpy(dtype=np.float32),
+        "Time Score": wallet_agg["time_score"].to_numpy(dtype=np.float32),
+        # dashboard statistics, reusing the same wallet grouping
+        "Total Volume": wallet_agg["wallet_total_volume"].to_numpy(),
+        "Transactions": wallet_agg["wallet_n_tx"].to_numpy(),
+        "Sanctioned Volume": wallet_agg["wallet_sanctions_volume"].to_numpy(),
+        "Average Risk": grouper.mean(risk).astype(np.float32),
+        "Max Risk": grouper.max(risk).astype(np.float32),
+    })
+    if exposure is not None:
+        wallets.insert(
+            6, "Exposure Score", wallet_agg["exposure_score"].to_numpy(dtype=np.float32)
+        )
+
+    return CompactScores(
+        transactions, wallets, float(max_log), weights, rollups=build_rollups(transactions)
     )
-    
-    df["risk_score_public"] = df["risk_score_public"] * sanctions_multiplier
-    df["risk_score_public"] = df["risk_score_public"].clip(0, 100)
 
+
+def _gather_wallet_values(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Per-row values of each row's wallet; rows without a wallet (code -1) get NaN."""
+    out = np.full(len(codes), np.nan)
+    known = codes >= 0
+    out[known] = values[codes[known]]
+    return out
+
+
+def _compact_int(values: pd.Series) -> pd.Series:
+    """Smallest integer dtype for the values (float32 if any are missing)."""
+    if values.isna().any():
+        return values.astype(np.float32)
+    return pd.to_numeric(values, downcast="integer")
+
+
+def _finalize_scores(
+    df: pd.DataFrame, wallet_agg: pd.DataFrame, weights: ScoringWeights = DEFAULT_WEIGHTS
+) -> pd.DataFrame:
+    """Merge wallet-level scores onto transactions and build the composite."""
+    # merge back to each transaction
+    score_columns = [
+        "wallet_id",
+        "concentration_score",
+        "velocity_score",
+        "sanctions_score",
+        "burst_score",
+        "time_score",
+    ]
+    if "exposure_score" in wallet_agg.columns:
+        score_columns.append("exposure_score")
+    df = df.merge(wallet_agg[score_columns], on="wallet_id", how="left")
+
+    df["risk_score_public"] = _risk_score(df, weights)
+    return _wide_layout(df)
+
+
+def _wide_layout(df: pd.DataFrame) -> pd.DataFrame:
+    """Scored rows with the wide frame's column names."""
     # cleanup
     df = df.drop(columns=["sanctioned_volume"], errors="ignore")
 
@@ -85,6 +199,7 @@ def _compute_risk_scores_internal(df: pd.DataFrame) -> pd.DataFrame:
     "sanctions_score": "Sanctions Score",
     "burst_score": "Burst Score",
     "time_score": "Time Score",
+    "exposure_score": "Exposure Score",
 
     "risk_score_public": "Risk Score",
 }
@@ -93,23 +208,48 @@ def _compute_risk_scores_internal(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def _volume_score(df: pd.DataFrame) -> pd.Series:
+@timed()
+def _risk_score(df: pd.DataFrame, weights: ScoringWeights = DEFAULT_WEIGHTS) -> pd.Series:
+    """Weighted composite of the component scores, with sanctions multiplier."""
+    base_score = sum(
+        weight * df[column] for column, weight in zip(component_columns(), weights.coefficients())
+    )
+    if "exposure_score" in df.columns:
+        exposure_weight = weights.exposure_weight
+        base_score = (1 - exposure_weight) * base_score + exposure_weight * df["exposure_score"]
+
+    sanctions_multiplier = np.where(
+        df["sanctions_flag"] == 1,
+        1 + np.log10(df["tx_volume_usd"].clip(lower=1)) * weights.sanctions_log_factor,
+        1.0
+    )
+
+    return (base_score * sanctions_multiplier).clip(0, 100)
+
+
+@timed()
+def _volume_score(df: pd.DataFrame, max_log=None) -> pd.Series:
+    log_vol = _log_volume(df)
+    if max_log is None:
+        max_log = log_vol.max()
+    return _scale_to_max(log_vol, max_log)
+
+
+def _log_volume(df: pd.DataFrame) -> pd.Series:
     vol = df["tx_volume_usd"].clip(lower=1)
-    log_vol = np.log10(vol)
-    max_log = log_vol.max()
-    if max_log <= 0:
-        return pd.Series([0.0] * len(df))
-    return (log_vol / max_log * 100).clip(0, 100)
+    return np.log10(vol)
 
 
-def _token_profile_score(df: pd.DataFrame) -> pd.Series:
-    token_baseline = {
-        "USDT": 70.0,
-        "USDC": 50.0,
-        "DAI": 55.0,
-        "USDe": 60.0,
-    }
-    return df["token"].map(token_baseline).fillna(50.0)
+def _scale_to_max(values: pd.Series, max_value) -> pd.Series:
+    """Scale values to 0–100 relative to a (global) maximum."""
+    if max_value <= 0:
+        return pd.Series([0.0] * len(values))
+    return (values / max_value * 100).clip(0, 100)
+
+
+@timed()
+def _token_profile_score(df: pd.DataFrame, weights: ScoringWeights = DEFAULT_WEIGHTS) -> pd.Series:
+    return df["token"].map(weights.token_baseline).astype(float).fillna(weights.default_token_score)
 
 
 def _ensure_sanctions_flag(df: pd.DataFrame) -> pd.DataFrame:
@@ -119,84 +259,92 @@ def _ensure_sanctions_flag(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _wallet_aggregates(df: pd.DataFrame) -> pd.DataFrame:
-    df["sanctioned_volume"] = df["tx_volume_usd"] * df["sanctions_flag"]
+@timed()
+def _wallet_aggregates(df: pd.DataFrame, grouper: WalletGrouper = None) -> pd.DataFrame:
+    """Totals, counts, sanctioned volume, burst and active hours per wallet."""
+    return wallet_statistics(df, grouper)
 
-    return (
-        df.groupby("wallet_id", as_index=False)
-        .agg(
-            wallet_total_volume=("tx_volume_usd", "sum"),
-            wallet_n_tx=("tx_volume_usd", "count"),
-            wallet_sanctions_volume=("sanctioned_volume", "sum"),
-        )
-    )
+
+@timed()
+def _concentration_score(wallet_agg: pd.DataFrame, max_vol=None) -> pd.Series:
+    if max_vol is None:
+        max_vol = wallet_agg["wallet_total_volume"].max()
+    return _scale_to_max(wallet_agg["wallet_total_volume"], max_vol)
+
+
+@timed()
+def _velocity_score(wallet_agg: pd.DataFrame, max_rate=None) -> pd.Series:
+    """Transactions per active day, so long histories do not inflate it."""
+    rate = _tx_per_active_day(wallet_agg["wallet_n_tx"], wallet_agg["active_days"])
+    if max_rate is None:
+        max_rate = rate.max()
+    return _scale_to_max(rate, max_rate)
 
 
-def _concentration_score(wallet_agg: pd.DataFrame) -> pd.Series:
-    max_vol = wallet_agg["wallet_total_volume"].max()
-    if max_vol <= 0:
-        return pd.Series([0.0] * len(wallet_agg))
-    return (wallet_agg["wallet_total_volume"] / max_vol * 100).clip(0, 100)
+def _tx_per_active_day(n_tx, active_days):
+    return n_tx / np.maximum(active_days, 1)
 
 
-def _velocity_score(wallet_agg: pd.DataFrame) -> pd.Series:
-    max_tx = wallet_agg["wallet_n_tx"].max()
-    if max_tx <= 0:
-        return pd.Series([0.0] * len(wallet_agg))
-    return (wallet_agg["wallet_n_tx"] / max_tx * 100).clip(0, 100)
+@timed()
+def _sanctions_score(wallet_agg: pd.DataFrame, max_sanctions_vol=None) -> pd.Series:
+    if max_sanctions_vol is None:
+        max_sanctions_vol = wallet_agg["wallet_sanctions_volume"].max()
+    return _scale_sanctions_volume(wallet_agg["wallet_sanctions_volume"], max_sanctions_vol)
 
 
-def _sanctions_score(wallet_agg: pd.DataFrame) -> pd.Series:
-    max_sanctions_vol = wallet_agg["wallet_sanctions_volume"].max()
+def _scale_sanctions_volume(sanctions_volume: pd.Series, max_sanctions_vol) -> pd.Series:
     if max_sanctions_vol <= 0:
         # binary: any sanctions = 100
-        return (wallet_agg["wallet_sanctions_volume"] > 0).astype(int) * 100.0
-    return (
-        wallet_agg["wallet_sanctions_volume"] / max_sanctions_vol * 100
-    ).clip(0, 100)
+        return (sanctions_volume > 0).astype(int) * 100.0
+    return (sanctions_volume / max_sanctions_vol * 100).clip(0, 100)
 
-def _burst_score(df: pd.DataFrame, wallet_agg: pd.DataFrame) -> pd.Series:
+@timed()
+def _burst_score(df: pd.DataFrame, wallet_agg: pd.DataFrame, max_burst=None) -> pd.Series:
     """
-    Measures how many transactions each wallet performs in its busiest hour.
+    Measures how many transactions each wallet performs in its busiest
+    rolling hour (any 60-minute window, across all days).
     High = bursty behavior (common in mixers, layering, consolidation bots).
     """
-    hourly = (
-        df.groupby(["wallet_id", "hour"])
-        .size()
-        .reset_index(name="tx_count")
-    )
-
-    burst = (
-        hourly.groupby("wallet_id")["tx_count"]
-        .max()
-        .reset_index(name="wallet_burst")
-    )
-
-    merged = wallet_agg[["wallet_id"]].merge(burst, on="wallet_id", how="left")
-    merged["wallet_burst"] = merged["wallet_burst"].fillna(0)
-
-    max_burst = merged["wallet_burst"].max()
-    if max_burst <= 0:
-        return pd.Series([0.0] * len(wallet_agg))
-
-    return (merged["wallet_burst"] / max_burst * 100).clip(0, 100)
+    wallet_agg = _with_hourly_statistics(df, wallet_agg)
+    if max_burst is None:
+        max_burst = wallet_agg["wallet_burst"].max()
+    return _scale_to_max(wallet_agg["wallet_burst"], max_burst)
 
 
+@timed()
 def _time_activity_score(df: pd.DataFrame, wallet_agg: pd.DataFrame) -> pd.Series:
     """
-    Measures how many distinct hours a wallet is active in.
+    Measures the share of hours a wallet is active in on the days it is
+    active: distinct (date, hour) buckets / (24 × active days).
     High = bot-like or systematic behavior.
     Low = predictable human trading clusters.
     """
-    hours_active = (
-        df.groupby("wallet_id")["hour"]
-        .nunique()
-        .reset_index(name="active_hours")
-    )
+    wallet_agg = _with_hourly_statistics(df, wallet_agg)
+    return _scale_active_hours(wallet_agg["active_hours"], wallet_agg["active_days"])
+
+
+@timed()
+def _exposure_score(wallet_agg: pd.DataFrame, exposure: pd.Series) -> pd.Series:
+    """
+    Volume-weighted sanctions exposure through the counterparty graph
+    (see utils.counterparty_graph), scaled to 0–100. Wallets missing from
+    ``exposure`` have none.
+    """
+    values = wallet_agg["wallet_id"].map(exposure).astype(float).fillna(0.0)
+    return (values * 100).clip(0, 100)
+
+
+def _with_hourly_statistics(df: pd.DataFrame, wallet_agg: pd.DataFrame) -> pd.DataFrame:
+    """Attach burst/activity stats unless the fused aggregation already did."""
+    columns = ["wallet_burst", "active_hours", "active_days"]
+    if set(columns).issubset(wallet_agg.columns):
+        return wallet_agg
+    hourly = wallet_statistics(df)[["wallet_id", *columns]]
+    merged = wallet_agg[["wallet_id"]].merge(hourly, on="wallet_id", how="left")
+    return merged.fillna({column: 0 for column in columns})
 
-    merged = wallet_agg[["wallet_id"]].merge(hours_active, on="wallet_id", how="left")
-    merged["active_hours"] = merged["active_hours"].fillna(0)
 
-    return (merged["active_hours"] / 24 * 100).clip(0, 100)
+def _scale_active_hours(active_hours: pd.Series, active_days: pd.Series) -> pd.Series:
+    return (active_hours / (24 * np.maximum(active_days, 1)) * 100).clip(0, 100)
 
 
@@ -0,0 +1,133 @@
+"""Background refresh of loaded datasets, off the request path."""
+import queue
+import threading
+import time
+
+from utils.instrumentation import INSTRUMENTS
+
+
+class Snapshot:
+    """A loaded dataset and the stamp of the inputs it was loaded from."""
+
+    def __init__(self, value, stamp, loaded_at: float, seconds: float):
+        self.value = value
+        self.stamp = stamp
+        self.loaded_at = loaded_at
+        self.seconds = seconds
+
+
+class RefreshScheduler:
+    """
+    Serves the latest snapshot of named datasets and reloads them on a
+    background thread when their inputs change.
+
+    ``loaders`` maps a name to ``(stamp, load)``: ``stamp()`` cheaply
+    fingerprints the inputs (e.g. file sizes and mtimes) and ``load()``
+    builds the dataset. Every ``interval`` seconds the worker compares the
+    stamps of the datasets served so far and reloads the changed ones; the
+    new snapshot replaces the old one in a single assignment, so readers
+    keep getting the previous version until the new one is complete, and
+    a failed reload leaves it in place.
+
+    Only the first request for a name waits for a load, and loads of
+    different names never wait for each other. Slow jobs (e.g.
+    regenerating the demo data) are ``submit``-ted and run on the worker,
+    which refreshes right after them.
+    """
+
+    def __init__(self, loaders: dict, interval: float = 60.0):
+        self.loaders = loaders
+        self.interval = interval
+        self._snapshots = {}
+        self._errors = {}
+        self._jobs = queue.Queue()
+        self._running = None
+        # one lock per name: a long reload of one dataset blocks no other
+        self._load_locks = {}
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def get(self, name: str):
+        """The current snapshot of ``name``, loading it on first use."""
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            with self._lock(name):
+                snapshot = self._snapshots.get(name) or self._load(name)
+        self.start()
+        return snapshot.value
+
+    def submit(self, name: str, job) -> None:
+        """Run ``job()``, which updates the inputs of ``name``, on the worker; then refresh."""
+        self._jobs.put((name, job))
+        self.start()
+
+    def refresh(self) -> None:
+        """Check every served dataset now instead of at the next interval."""
+        self.submit(None, None)
+
+    def status(self) -> dict:
+        """Running job (name, start time), and per dataset its snapshot and last error."""
+        return {
+            "running": self._running,
+            "pending": self._jobs.qsize(),
+            "snapshots": dict(self._snapshots),
+            "errors": dict(self._errors),
+        }
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                name, job = self._jobs.get(timeout=self.interval)
+            except queue.Empty:
+                name, job = None, None
+            if job is not None:
+                self._running = (name, time.time())
+                try:
+                    job()
+                    self._errors.pop(name, None)
+                except Exception as e:
+                    self._errors[name] = repr(e)
+                    INSTRUMENTS.count("refresh.job_errors")
+                    print(f"[WARN] Background job {name} failed: {e!r}")
+            self._refresh_stale()
+
+    def _refresh_stale(self) -> None:
+        for name, snapshot in list(self._snapshots.items()):
+            stamp, _ = self.loaders[name]
+            try:
+                if stamp() == snapshot.stamp:
+                    continue
+                self._running = (name, time.time())
+                with self._lock(name):
+                    self._load(name)
+                self._errors.pop(name, None)
+            except Exception as e:
+                # keep serving the previous snapshot
+                self._errors[name] = repr(e)
+                INSTRUMENTS.count("refresh.errors")
+                print(f"[WARN] Refreshing {name} failed: {e!r}")
+        self._running = None
+
+    def _lock(self, name: str) -> threading.Lock:
+        # setdefault is atomic, so racing callers get the same lock
+        return self._load_locks.setdefault(name, threading.Lock())
+
+    def _load(self, name: str) -> Snapshot:
+        stamp, load = self.loaders[name]
+        # stamped first: inputs changing mid-load trigger another refresh
+        current = stamp()
+        start = time.perf_counter()
+        value = load()
+        seconds = time.perf_counter() - start
+        INSTRUMENTS.observe(f"refresh.{name}", seconds)
+        snapshot = Snapshot(value, current, time.time(), seconds)
+        self._snapshots[name] = snapshot
+        return snapshot
@@ -0,0 +1,126 @@
+"""Pre-aggregated rollups behind the dashboard charts and KPIs."""
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from utils.histograms import TokenHistogram
+from utils.instrumentation import timed
+
+# Fixed risk-score bin edges, so histograms of different datasets line up.
+RISK_BINS = 30
+RISK_BIN_EDGES = np.linspace(0, 100, RISK_BINS + 1)
+
+
+class Rollups:
+    """
+    Aggregates of a scored dataset, materialized once when it is scored.
+
+    ``volume`` holds volume, sanctioned volume and tx count per
+    (Date, Hour, Token); ``tokens`` the same totals per token; and
+    ``risk_histogram`` the risk-score counts per token on ``RISK_BIN_EDGES``
+    (a TokenHistogram).
+    ``kpis`` holds the headline numbers of the front page. The tables are
+    sized by dates × hours × tokens, so rendering from them does not depend
+    on the transaction count.
+    """
+
+    def __init__(self, volume: pd.DataFrame, tokens: pd.DataFrame, risk_histogram: TokenHistogram, kpis: dict):
+        self.volume = volume
+        self.tokens = tokens
+        self.risk_histogram = risk_histogram
+        self.kpis = kpis
+
+
+@timed()
+def build_rollups(transactions: pd.DataFrame) -> Rollups:
+    """Aggregate the compact ``transactions`` frame of a CompactScores."""
+    volume = transactions["Volume"]
+    sanctioned = transactions["Sanctioned"].to_numpy() == 1
+    risk = transactions["Risk Score"].to_numpy(dtype=float)
+
+    parts = pd.DataFrame({
+        "Date": transactions["Date"],
+        "Hour": transactions["Hour"],
+        "Token": transactions["Token"],
+        "Volume": volume,
+        "Sanctioned Volume": volume.where(sanctioned, 0),
+        "Transactions": 1,
+        "Risk Sum": risk,
+    })
+    cube = parts.groupby(["Date", "Hour", "Token"], as_index=False, observed=True).sum()
+    token_totals = (
+        cube.groupby("Token", as_index=False, observed=True)[
+            ["Volume", "Sanctioned Volume", "Transactions", "Risk Sum"]
+        ].sum()
+    )
+
+    total_volume = volume.sum()
+    sanctioned_volume = volume[sanctioned].sum()
+    wallet_codes = transactions["Wallet"].cat.codes.to_numpy()
+    # rows without a wallet (code -1) do not count as one
+    sanctioned_codes = wallet_codes[sanctioned & (wallet_codes >= 0)]
+    wallet_codes = wallet_codes[wallet_codes >= 0]
+    scored = int((~np.isnan(risk)).sum())
+    kpis = {
+        "total_volume": total_volume,
+        "sanctioned_volume": sanctioned_volume,
+        "sanctioned_share": (sanctioned_volume / total_volume * 100) if total_volume > 0 else 0,
+        "transactions": len(transactions),
+        "sanctioned_transactions": int(sanctioned.sum()),
+        "unique_wallets": int(len(np.unique(wallet_codes))),
+        "flagged_wallets": int(len(np.unique(sanctioned_codes))),
+        # rows without a risk score (no wallet) are left out of the mean
+        "scored_transactions": scored,
+        "mean_risk": float(np.nanmean(risk)) if scored else float("nan"),
+    }
+
+    return Rollups(
+        volume=cube.drop(columns="Risk Sum"),
+        tokens=token_totals,
+        risk_histogram=TokenHistogram.from_values(transactions["Token"], risk, RISK_BIN_EDGES),
+        kpis=kpis,
+    )
+
+
+def merge_rollups(parts: list, unique_wallets: int, flagged_wallets: int) -> Rollups:
+    """
+    Combine the rollups of disjoint parts of one dataset (e.g. date
+    partitions). Distinct wallet counts do not add up across parts, so the
+    caller passes the dataset-wide ones.
+    """
+    volume = (
+        pd.concat([part.volume for part in parts], ignore_index=True)
+        .astype({"Date": str, "Token": str})
+        .groupby(["Date", "Hour", "Token"], as_index=False)
+        .sum()
+    )
+    token_totals = (
+        pd.concat([part.tokens for part in parts], ignore_index=True)
+        .astype({"Token": str})
+        .groupby("Token", as_index=False)
+        .sum()
+    )
+
+    total_volume = sum(part.kpis["total_volume"] for part in parts)
+    sanctioned_volume = sum(part.kpis["sanctioned_volume"] for part in parts)
+    transactions = sum(part.kpis["transactions"] for part in parts)
+    scored = sum(part.kpis["scored_transactions"] for part in parts)
+    kpis = {
+        "total_volume": total_volume,
+        "sanctioned_volume": sanctioned_volume,
+        "sanctioned_share": (sanctioned_volume / total_volume * 100) if total_volume > 0 else 0,
+        "transactions": transactions,
+        "sanctioned_transactions": sum(part.kpis["sanctioned_transactions"] for part in parts),
+        "unique_wallets": unique_wallets,
+        "flagged_wallets": flagged_wallets,
+        "scored_transactions": scored,
+        "mean_risk": float(token_totals["Risk Sum"].sum() / scored) if scored else float("nan"),
+    }
+
+    return Rollups(
+        volume=volume,
+        tokens=token_totals,
+        risk_histogram=reduce(TokenHistogram.merge, [part.risk_histogram for part in parts]),
+        kpis=kpis,
+    )
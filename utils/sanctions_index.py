@@ -0,0 +1,158 @@
+"""Standalone sanctions screening index over binary address keys."""
+import os
+import tomllib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.addresses import KEY_DTYPE, address_prefixes, decode_addresses, key_prefix
+
+# Where Streamlit looks for secrets, highest priority first: the project
+# file (relative to the working directory) and the user-level one.
+SECRETS_PATHS = (Path(".streamlit") / "secrets.toml", Path.home() / ".streamlit" / "secrets.toml")
+
+# Overrides the path configured in .streamlit/secrets.toml ([sanctions] file_path).
+SANCTIONS_ENV_VAR = "SANCTIONS_FILE"
+
+# Leading hex digits of the bucket bitmap used to pre-screen queries (2**20 buckets).
+BUCKET_DIGITS = 5
+
+
+def sanctions_list_path() -> Path:
+    """
+    Location of the sanctions list CSV, without needing a Streamlit runtime.
+
+    ``$SANCTIONS_FILE`` wins; otherwise ``[sanctions] file_path`` from the
+    first of SECRETS_PATHS that sets it, as ``st.secrets`` would. Relative
+    paths resolve against the working directory, as they did when read
+    through ``st.secrets``.
+    """
+    configured = os.environ.get(SANCTIONS_ENV_VAR)
+    for secrets_path in SECRETS_PATHS:
+        if configured:
+            break
+        if secrets_path.exists():
+            with open(secrets_path, "rb") as f:
+                configured = tomllib.load(f).get("sanctions", {}).get("file_path")
+    if not configured:
+        raise KeyError(
+            f"No sanctions list configured: set ${SANCTIONS_ENV_VAR} or "
+            f"[sanctions] file_path in {' or '.join(map(str, SECRETS_PATHS))}"
+        )
+    return Path(configured)
+
+
+class SanctionsIndex:
+    """
+    Sorted 20-byte keys of sanctioned addresses with vectorized membership.
+
+    Built once from the list CSV (an ``address`` column). Queries are first
+    screened against a bitmap of the list's leading hex digits, which rejects
+    almost every clean address after decoding five characters; the few
+    candidates are decoded in full and matched by binary search over the
+    sorted keys. Screening millions of addresses thus costs a few NumPy
+    passes instead of per-row string handling. Values that are not valid
+    addresses never match.
+
+    ``reload_if_changed`` re-reads the list when its modification time or
+    size changes, so long-running processes can pick up list updates.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path is not None else None
+        self._stamp = None
+        self._loaded = False
+        self._set_keys(np.zeros(0, dtype=KEY_DTYPE))
+        if self.path is not None:
+            self.reload_if_changed()
+
+    @classmethod
+    def from_addresses(cls, addresses) -> "SanctionsIndex":
+        index = cls()
+        keys, valid = decode_addresses(addresses)
+        index._set_keys(keys[valid])
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def keys(self) -> np.ndarray:
+        """Sorted, distinct 20-byte keys of the listed addresses."""
+        return self._keys
+
+    def contains(self, addresses) -> np.ndarray:
+        """Boolean mask: which of the (hex string) addresses are sanctioned."""
+        if not isinstance(addresses, pd.Series):
+            addresses = pd.Series(np.asarray(addresses, dtype=object))
+        hit = np.zeros(len(addresses), dtype=bool)
+        if len(addresses) == 0 or len(self._keys) == 0:
+            return hit
+
+        # screen on the leading digits, fully decode only the candidates
+        candidates = np.flatnonzero(self._buckets[address_prefixes(addresses, BUCKET_DIGITS)])
+        keys, valid = decode_addresses(addresses.iloc[candidates])
+        hit[candidates] = self.contains_keys(keys) & valid
+        return hit
+
+    def contains_keys(self, keys: np.ndarray) -> np.ndarray:
+        """Boolean mask: which of the binary keys are sanctioned."""
+        keys = np.asarray(keys, dtype=KEY_DTYPE)
+        hit = np.zeros(len(keys), dtype=bool)
+        if len(keys) == 0 or len(self._keys) == 0:
+            return hit
+
+        candidates = np.flatnonzero(self._buckets[_key_bucket(keys)])
+        pos = np.minimum(np.searchsorted(self._keys, keys[candidates]), len(self._keys) - 1)
+        hit[candidates] = self._keys[pos] == keys[candidates]
+        return hit
+
+    def reload_if_changed(self) -> bool:
+        """Re-read the list if the file changed since the last load."""
+        if self.path is None:
+            return False
+        try:
+            stat = self.path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if self._loaded and stamp == self._stamp:
+            return False
+
+        if stamp is None:
+            print(f"[WARN] Sanctions list not found: {self.path}")
+            keys = np.zeros(0, dtype=KEY_DTYPE)
+        else:
+            addresses = pd.read_csv(self.path, usecols=["address"], dtype={"address": str})["address"]
+            keys, valid = decode_addresses(addresses)
+            if not valid.all():
+                print(f"[WARN] Skipped {int((~valid).sum()):,} invalid address(es) in {self.path}")
+            keys = keys[valid]
+        self._set_keys(keys)
+        self._stamp = stamp
+        self._loaded = True
+        return True
+
+    def _set_keys(self, keys: np.ndarray) -> None:
+        self._keys = np.unique(np.asarray(keys, dtype=KEY_DTYPE))
+        self._buckets = np.zeros(1 << (4 * BUCKET_DIGITS), dtype=bool)
+        self._buckets[_key_bucket(self._keys)] = True
+
+
+def _key_bucket(keys: np.ndarray) -> np.ndarray:
+    return key_prefix(keys) >> np.uint64(64 - 4 * BUCKET_DIGITS)
+
+
+_shared_index = None
+
+
+def get_sanctions_index() -> SanctionsIndex:
+    """Process-wide index for the configured list, reloaded when it changes."""
+    global _shared_index
+    path = sanctions_list_path()
+    if _shared_index is None or _shared_index.path != path:
+        _shared_index = SanctionsIndex(path)
+    else:
+        _shared_index.reload_if_changed()
+    return _shared_index
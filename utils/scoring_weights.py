@@ -0,0 +1,163 @@
+"""Versioned weights and baselines of the composite risk score."""
+import hashlib
+import tomllib
+from pathlib import Path
+
+import numpy as np
+
+WEIGHTS_PATH = Path(__file__).parent.parent / "scoring_weights.toml"
+
+# Additive components of the composite (config key -> score column), in
+# the order they are summed.
+COMPONENTS = {
+    "volume": "volume_score",
+    "token_profile": "token_profile_score",
+    "concentration": "concentration_score",
+    "velocity": "velocity_score",
+    "burst": "burst_score",
+    "time": "time_score",
+}
+EXPOSURE_COMPONENT = "exposure_score"
+
+
+class ScoringWeights:
+    """
+    Parameters of the composite risk score.
+
+    Loaded from a versioned TOML config (see ``load_weights``):
+
+        version = "2025-01"
+
+        [weights]
+        volume = 0.25
+        token_profile = 0.20
+        concentration = 0.20
+        velocity = 0.20
+        burst = 0.10
+        time = 0.05
+        exposure = 0.10      # share taken by counterparty exposure, when scored
+
+        [token_baseline]
+        USDT = 70.0
+        default = 50.0       # tokens not listed
+
+        [sanctions]
+        log_factor = 0.5     # sanctioned transfers: x (1 + log10(volume) * log_factor)
+
+    Omitted keys keep their defaults. ``fingerprint`` covers every value,
+    not just the version label, so cached scores never outlive an edit.
+    """
+
+    def __init__(
+        self,
+        version: str = "default",
+        weights: dict = None,
+        exposure_weight: float = 0.10,
+        token_baseline: dict = None,
+        default_token_score: float = 50.0,
+        sanctions_log_factor: float = 0.5,
+    ):
+        self.version = version
+        self.weights = {
+            "volume": 0.25,
+            "token_profile": 0.20,
+            "concentration": 0.20,
+            "velocity": 0.20,
+            "burst": 0.10,
+            "time": 0.05,
+            **(weights or {}),
+        }
+        unknown = set(self.weights) - set(COMPONENTS)
+        if unknown:
+            raise KeyError(f"Unknown score components: {sorted(unknown)}")
+        self.exposure_weight = exposure_weight
+        self.token_baseline = {
+            "USDT": 70.0,
+            "USDC": 50.0,
+            "DAI": 55.0,
+            "USDe": 60.0,
+            **(token_baseline or {}),
+        }
+        self.default_token_score = default_token_score
+        self.sanctions_log_factor = sanctions_log_factor
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "ScoringWeights":
+        weights = dict(config.get("weights", {}))
+        baseline = dict(config.get("token_baseline", {}))
+        overrides = {}
+        if "exposure" in weights:
+            overrides["exposure_weight"] = weights.pop("exposure")
+        if "default" in baseline:
+            overrides["default_token_score"] = baseline.pop("default")
+        if "log_factor" in config.get("sanctions", {}):
+            overrides["sanctions_log_factor"] = config["sanctions"]["log_factor"]
+        return cls(
+            version=str(config.get("version", "default")),
+            weights=weights,
+            token_baseline=baseline,
+            **overrides,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "weights": {**self.weights, "exposure": self.exposure_weight},
+            "token_baseline": {**self.token_baseline, "default": self.default_token_score},
+            "sanctions": {"log_factor": self.sanctions_log_factor},
+        }
+
+    @property
+    def fingerprint(self) -> str:
+        values = self.to_dict()
+        values.pop("version")
+        return hashlib.blake2b(repr(sorted(_flatten(values))).encode(), digest_size=8).hexdigest()
+
+    def coefficients(self, exposure: bool = False) -> np.ndarray:
+        """
+        Effective weight of each column of ``component_columns(exposure)``:
+        with exposure, the other components scale down to make room for it.
+        """
+        weights = np.array([self.weights[key] for key in COMPONENTS])
+        if exposure:
+            weights = np.append((1 - self.exposure_weight) * weights, self.exposure_weight)
+        return weights
+
+    def token_scores(self, tokens) -> np.ndarray:
+        """Token profile score of each token."""
+        return np.array([self.token_baseline.get(token, self.default_token_score) for token in tokens], dtype=float)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ScoringWeights) and self.fingerprint == other.fingerprint
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint)
+
+    def __repr__(self) -> str:
+        return f"ScoringWeights(version={self.version!r}, fingerprint={self.fingerprint!r})"
+
+
+DEFAULT_WEIGHTS = ScoringWeights()
+
+
+def component_columns(exposure: bool = False) -> list:
+    """Score columns the composite sums, in order."""
+    columns = list(COMPONENTS.values())
+    return [*columns, EXPOSURE_COMPONENT] if exposure else columns
+
+
+def load_weights(path: Path = WEIGHTS_PATH) -> ScoringWeights:
+    """Weights from the TOML config at ``path``; the defaults when there is none."""
+    path = Path(path)
+    if not path.exists():
+        return DEFAULT_WEIGHTS
+    with open(path, "rb") as f:
+        return ScoringWeights.from_dict(tomllib.load(f))
+
+
+def _flatten(values: dict, prefix: str = ""):
+    for key, value in values.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", float(value)
@@ -1,7 +1,9 @@
+import time
+from datetime import datetime
 import streamlit as st
 from utils.generate_demo_data import generate_demo_data
-from utils.convert_real_data import convert_raw_to_real_scores
-from utils.load_data import load_demo_data, load_real_data
+from utils import pipeline
+from utils.load_data import get_refresh_scheduler
 
 def sidebar():
     ss = st.session_state
@@ -36,15 +38,34 @@ def sidebar():
         )
 
         if st.button("Generate Demo Dataset"):
-            generate_demo_data(seed=seed)
-            load_demo_data.clear()
+            # generated and scored in the background; pages keep the current data until then
+            get_refresh_scheduler().submit("demo", lambda: generate_demo_data(seed=seed))
             ss["data_source"] = "Demo Data"
-            st.success("Demo dataset has been generated.")
+            st.success("Demo dataset generation started.")
 
-        if st.button("Convert Real Data"):
-            convert_raw_to_real_scores()
-            load_real_data.clear()
-            ss["data_source"] = "Real Data"
-            st.success("Real dataset has been converted and loaded.")
+        # real data is ingested offline (python -m utils.cli ingest)
+        state = pipeline.ingest_state()
+        if state.watermark:
+            last_run = state.last_run["at"] if state.last_run else "n/a"
+            st.caption(f"Real data through {state.watermark} (last ingest: {last_run})")
 
-    return ss["data_source"]
\ No newline at end of file
+    _refresh_status("demo" if ss["data_source"].startswith("Demo") else "real")
+
+    return ss["data_source"]
+
+
+def _refresh_status(name):
+    """Background refresh state of the dataset on screen."""
+    status = get_refresh_scheduler().status()
+    if status["running"] is not None:
+        job, started = status["running"]
+        st.sidebar.caption(f"Refreshing {job.replace('_', ' ')} data… ({time.time() - started:.0f}s)")
+    elif status["pending"]:
+        st.sidebar.caption("Refresh queued…")
+    snapshot = status["snapshots"].get(name)
+    if snapshot is not None:
+        loaded = datetime.fromtimestamp(snapshot.loaded_at).strftime("%Y-%m-%d %H:%M:%S")
+        st.sidebar.caption(f"Data loaded {loaded} ({snapshot.seconds:.1f}s)")
+    for job, error in status["errors"].items():
+        if job.startswith(name):
+            st.sidebar.warning(f"Last refresh of {job.replace('_', ' ')} data failed: {error}")
\ No newline at end of file
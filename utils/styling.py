@@ -3,7 +3,7 @@ import streamlit as st
 
 
 def inject_icon_styles():
-    """Inject Material Icons and Font Awesome CSS for better tab icons."""
+    """Inject Material Icons and Font Awesome CSS for better tab icons, and hide internal pages from the navigation."""
     st.markdown("""
     <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
     <style>
@@ -13,5 +13,9 @@ def inject_icon_styles():
         .stTabs [data-baseweb="tab-list"] button i {
             margin-right: 8px;
         }
+        /* the diagnostics page is reachable by URL only */
+        [data-testid="stSidebarNav"] li:has(a[href$="/Diagnostics"]) {
+            display: none;
+        }
     </style>
     """, unsafe_allow_html=True)
@@ -0,0 +1,249 @@
+"""Incrementally maintained market-wide (systemic) risk metrics."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent.parent
+SYSTEMIC_DIR = ROOT / "data" / "processed" / "systemic"
+DEMO_SYSTEMIC_DIR = ROOT / "data" / "sample" / "systemic"
+
+# Hourly volume buckets in each rolling cross-token correlation.
+CORRELATION_WINDOW_HOURS = 24
+
+# Days (back from the latest one) whose wallet volumes are kept so that late
+# rows still update their concentration; older days are final.
+OPEN_DAYS = 7
+
+_TABLES = ("hourly", "concentration", "correlations", "wallet_volume")
+
+_EMPTY = {
+    "hourly": {"Date": str, "Hour": np.int64, "Token": str, "Volume": float,
+               "Sanctioned Volume": float, "Transactions": np.int64},
+    "concentration": {"Date": str, "Token": str, "Wallets": np.int64, "Volume": float,
+                      "HHI": float, "Gini": float},
+    "correlations": {"Time": "datetime64[ns]", "Token A": str, "Token B": str,
+                     "Correlation": float},
+    "wallet_volume": {"Date": str, "Token": str, "Wallet": str, "Volume": float},
+}
+
+
+class SystemicMetrics:
+    """
+    Market concentration, cross-token correlation and sanctioned-exposure
+    time series, updated one ingest batch at a time.
+
+    Tables (all small, sized by dates × hours × tokens):
+
+    - ``hourly``: Volume, Sanctioned Volume and Transactions per
+      (Date, Hour, Token); the heatmaps aggregate it over a date range.
+    - ``concentration``: HHI (0–10,000) and Gini of wallet volume per
+      (Date, Token).
+    - ``correlations``: Pearson correlation of hourly token volumes over the
+      trailing ``CORRELATION_WINDOW_HOURS``, per window end and token pair.
+
+    ``update`` only recomputes the (date, token) groups and correlation
+    windows its batch touches. Wallet volumes are kept for the last
+    ``OPEN_DAYS`` days only; rows arriving for an older day still count in
+    ``hourly`` but no longer change its concentration.
+    """
+
+    def __init__(self, tables: dict = None):
+        tables = tables or {}
+        for name in _TABLES:
+            setattr(self, name, tables.get(name, _empty(name)))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SystemicMetrics":
+        return cls().update(df)
+
+    @property
+    def empty(self) -> bool:
+        return self.hourly.empty
+
+    @property
+    def tokens(self) -> list:
+        return sorted(self.hourly["Token"].unique())
+
+    def update(self, batch: pd.DataFrame) -> "SystemicMetrics":
+        """Fold in a batch of transfers (date, hour, token, wallet_id, tx_volume_usd, sanctions_flag)."""
+        rows = _normalize(batch)
+        if rows.empty:
+            return self
+
+        # additive hourly totals
+        rows["Sanctioned Volume"] = rows["Volume"].where(rows["Sanctioned"] == 1, 0.0)
+        rows["Transactions"] = 1
+        hourly = rows.groupby(["Date", "Hour", "Token"], as_index=False)[
+            ["Volume", "Sanctioned Volume", "Transactions"]
+        ].sum()
+        self.hourly = _merge_sums(self.hourly, hourly, ["Date", "Hour", "Token"])
+
+        self._update_concentration(rows)
+        self._update_correlations(_bucket_times(hourly).min())
+        return self
+
+    def heatmap(self, value: str = "Sanctioned Share", start_date=None, end_date=None) -> pd.DataFrame:
+        """Hour × token matrix of a ``hourly`` column (or the sanctioned share, %)."""
+        hourly = self.hourly
+        if start_date is not None:
+            hourly = hourly[hourly["Date"] >= str(start_date)]
+        if end_date is not None:
+            hourly = hourly[hourly["Date"] <= str(end_date)]
+        totals = hourly.groupby(["Hour", "Token"])[["Volume", "Sanctioned Volume", "Transactions"]].sum()
+        if value == "Sanctioned Share":
+            values = totals["Sanctioned Volume"] / totals["Volume"].where(totals["Volume"] > 0) * 100
+        else:
+            values = totals[value]
+        return values.unstack("Token").reindex(range(1, 25)).fillna(0.0)
+
+    def correlation_matrix(self, at=None) -> pd.DataFrame:
+        """Token × token correlation over the window ending at ``at`` (default: latest)."""
+        corr = self.correlations
+        if corr.empty:
+            return pd.DataFrame()
+        at = corr["Time"].max() if at is None else pd.Timestamp(at)
+        window = corr[corr["Time"] == at]
+        matrix = window.pivot(index="Token A", columns="Token B", values="Correlation")
+        tokens = sorted(set(matrix.index) | set(matrix.columns))
+        matrix = matrix.reindex(index=tokens, columns=tokens)
+        # stored once per unordered pair: mirror it and fill the diagonal
+        values = matrix.combine_first(matrix.T).to_numpy(copy=True)
+        np.fill_diagonal(values, 1.0)
+        return pd.DataFrame(values, index=tokens, columns=tokens)
+
+    def save(self, path: Path = SYSTEMIC_DIR) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _TABLES:
+            tmp = path / f"{name}.parquet.tmp"
+            getattr(self, name).to_parquet(tmp, index=False)
+            tmp.replace(path / f"{name}.parquet")
+
+    @classmethod
+    def load(cls, path: Path = SYSTEMIC_DIR) -> "SystemicMetrics":
+        path = Path(path)
+        tables = {}
+        for name in _TABLES:
+            table = pd.read_parquet(path / f"{name}.parquet")
+            tables[name] = table.astype({k: v for k, v in _EMPTY[name].items() if v is str})
+        return cls(tables)
+
+    @staticmethod
+    def exists(path: Path = SYSTEMIC_DIR) -> bool:
+        return all((Path(path) / f"{name}.parquet").exists() for name in _TABLES)
+
+    def _update_concentration(self, rows: pd.DataFrame) -> None:
+        known = set(self.concentration["Date"].unique())
+        open_dates = set(self.wallet_volume["Date"].unique())
+        closed = rows["Date"].isin(known - open_dates)
+        if closed.any():
+            print(f"[WARN] {int(closed.sum()):,} late row(s) for closed days left out of concentration")
+            rows = rows[~closed]
+
+        wallet_volume = rows.groupby(["Date", "Token", "Wallet"], as_index=False)["Volume"].sum()
+        dates = wallet_volume["Date"].unique()
+
+        # only the days in the batch need re-grouping and re-scoring
+        state = self.wallet_volume
+        in_batch = state["Date"].isin(dates).to_numpy()
+        merged = _merge_sums(state[in_batch], wallet_volume, ["Date", "Token", "Wallet"])
+        self.wallet_volume = pd.concat([state[~in_batch], merged], ignore_index=True)
+
+        old = self.concentration
+        self.concentration = pd.concat(
+            [old[~old["Date"].isin(dates).to_numpy()], _concentration(merged)], ignore_index=True
+        ).sort_values(["Date", "Token"], ignore_index=True)
+
+        # close days that fell out of the open window
+        dates = self.wallet_volume["Date"]
+        if len(dates):
+            cutoff = (pd.Timestamp(dates.max()) - pd.Timedelta(days=OPEN_DAYS - 1)).strftime("%Y-%m-%d")
+            self.wallet_volume = self.wallet_volume[dates >= cutoff].reset_index(drop=True)
+
+    def _update_correlations(self, since: pd.Timestamp) -> None:
+        """Recompute every correlation window that ends at or after ``since``."""
+        volume = self.hourly.assign(Time=_bucket_times(self.hourly)).pivot_table(
+            index="Time", columns="Token", values="Volume", aggfunc="sum"
+        )
+        if volume.shape[1] < 2:
+            return
+        # hours without transfers have zero volume, not missing volume
+        volume = volume.reindex(pd.date_range(volume.index.min(), volume.index.max(), freq="h")).fillna(0.0)
+
+        start = since - pd.Timedelta(hours=CORRELATION_WINDOW_HOURS - 1)
+        tail = volume[volume.index >= start]
+        rolling = tail.rolling(CORRELATION_WINDOW_HOURS).corr().dropna(how="all")
+        rolling = rolling[rolling.index.get_level_values(0) >= since]
+        rolling.index.names = ["Time", "Token A"]
+        rolling.columns.name = "Token B"
+
+        pairs = rolling.stack().rename("Correlation").reset_index()
+        pairs = pairs[(pairs["Token A"] < pairs["Token B"]) & pairs["Correlation"].notna()]
+        old = self.correlations
+        self.correlations = pd.concat(
+            [old[old["Time"] < since], pairs], ignore_index=True
+        ).sort_values(["Time", "Token A", "Token B"], ignore_index=True)
+
+
+def _normalize(batch: pd.DataFrame) -> pd.DataFrame:
+    if "sanctions_flag" in batch.columns:
+        sanctioned = batch["sanctions_flag"].fillna(0).astype(int).to_numpy()
+    else:
+        sanctioned = np.zeros(len(batch), dtype=int)
+    rows = pd.DataFrame({
+        "Date": batch["date"].astype(str).to_numpy(),
+        "Hour": batch["hour"].to_numpy(),
+        "Token": batch["token"].astype(str).to_numpy(),
+        "Wallet": batch["wallet_id"].astype(str).to_numpy(),
+        "Volume": batch["tx_volume_usd"].to_numpy(dtype=float),
+        "Sanctioned": sanctioned,
+    })
+    rows = rows[batch["date"].notna().to_numpy() & batch["hour"].notna().to_numpy()]
+    return rows.astype({"Hour": np.int64}).reset_index(drop=True)
+
+
+def _merge_sums(table: pd.DataFrame, update: pd.DataFrame, keys: list) -> pd.DataFrame:
+    if table.empty:
+        return update.sort_values(keys, ignore_index=True)
+    return (
+        pd.concat([table, update], ignore_index=True)
+        .groupby(keys, as_index=False)
+        .sum()
+    )
+
+
+def _concentration(wallet_volume: pd.DataFrame) -> pd.DataFrame:
+    """HHI and Gini of wallet volume per (Date, Token), in one sorted pass."""
+    group = wallet_volume.groupby(["Date", "Token"], sort=True).ngroup().to_numpy()
+    volume = wallet_volume["Volume"].to_numpy(dtype=float)
+    order = np.lexsort((volume, group))
+    group, volume = group[order], volume[order]
+
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    n = np.diff(np.r_[starts, len(group)])
+    total = np.add.reduceat(volume, starts)
+    safe_total = np.where(total > 0, total, np.nan)
+    share = volume / np.repeat(safe_total, n)
+    # Gini from ascending-sorted values: sum((2i - n - 1) x_i) / (n sum x), i = 1..n
+    rank = np.arange(len(group)) - np.repeat(starts, n) + 1
+    weighted = (2 * rank - np.repeat(n, n) - 1) * volume
+
+    first = wallet_volume.iloc[order[starts]]
+    return pd.DataFrame({
+        "Date": first["Date"].to_numpy(),
+        "Token": first["Token"].to_numpy(),
+        "Wallets": n,
+        "Volume": total,
+        "HHI": np.add.reduceat(share ** 2, starts) * 10_000,
+        "Gini": np.add.reduceat(weighted, starts) / (n * safe_total),
+    })
+
+
+def _bucket_times(hourly: pd.DataFrame) -> pd.Series:
+    """Start of each (Date, Hour) bucket; hours run 1–24."""
+    return pd.to_datetime(hourly["Date"], format="%Y-%m-%d") + pd.to_timedelta(hourly["Hour"] - 1, unit="h")
+
+
+def _empty(name: str) -> pd.DataFrame:
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in _EMPTY[name].items()})
@@ -0,0 +1,84 @@
+"""Paged top-K rankings of the wallet table."""
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import timed
+
+RANKING_KEYS = ("Average Risk", "Total Volume", "Sanctioned Volume")
+
+
+class WalletRanking:
+    """
+    Wallets ranked (descending) by a column of the wallet table, a page at a time.
+
+    Each key keeps the order of its top rows only, found by partial selection
+    (``np.argpartition``) instead of sorting every wallet. When a page reaches
+    past the ranked prefix, the prefix is rebuilt at least twice as deep, so
+    paging costs O(wallets) a logarithmic number of times and a slice
+    otherwise. Ties rank by wallet code and missing values rank last, as a
+    stable descending sort would.
+
+    ``positive=True`` ranks only the wallets whose value is above zero (e.g.
+    the sanctions-exposed wallets by Sanctioned Volume).
+    """
+
+    MIN_DEPTH = 100
+
+    def __init__(self, wallets: pd.DataFrame):
+        self.wallets = wallets
+        self._orders = {}
+        self._counts = {}
+
+    def count(self, key: str, positive: bool = False) -> int:
+        """Number of wallets ranked under ``key``."""
+        if (key, positive) not in self._counts:
+            values = self._values(key)
+            self._counts[key, positive] = int(np.count_nonzero(values > 0)) if positive else len(values)
+        return self._counts[key, positive]
+
+    def pages(self, key: str, page_size: int, positive: bool = False) -> int:
+        return max(1, math.ceil(self.count(key, positive) / page_size))
+
+    def top(self, key: str, n: int, offset: int = 0, positive: bool = False) -> pd.DataFrame:
+        """Rows ``offset`` to ``offset + n`` of the ranking."""
+        order = self._order(key, offset + n, positive)
+        return self.wallets.iloc[order[offset:offset + n]]
+
+    def page(self, key: str, page: int, page_size: int, positive: bool = False) -> pd.DataFrame:
+        """The 1-based ``page`` of ``page_size`` wallets."""
+        return self.top(key, page_size, (page - 1) * page_size, positive)
+
+    def _order(self, key: str, depth: int, positive: bool) -> np.ndarray:
+        order = self._orders.get((key, positive))
+        count = self.count(key, positive)
+        if order is None or (len(order) < depth and len(order) < count):
+            depth = max(depth, self.MIN_DEPTH, 2 * len(order) if order is not None else 0)
+            order = _top_order(self._values(key), depth, positive)
+            self._orders[key, positive] = order
+        return order
+
+    def _values(self, key: str) -> np.ndarray:
+        if key not in RANKING_KEYS:
+            raise KeyError(f"Unknown ranking key: {key}")
+        return self.wallets[key].to_numpy(dtype=float)
+
+
+@timed()
+def _top_order(values: np.ndarray, depth: int, positive: bool) -> np.ndarray:
+    """Positions of the ``depth`` largest values, in stable descending order."""
+    if positive:
+        candidates = np.flatnonzero(values > 0)
+    else:
+        candidates = np.arange(len(values))
+    keys = -values[candidates]
+    keys[np.isnan(keys)] = np.inf
+
+    if depth < len(candidates):
+        kth = keys[np.argpartition(keys, depth - 1)[depth - 1]]
+        # everything before the cut plus all ties at it, so ties keep code order
+        within = keys <= kth
+        candidates, keys = candidates[within], keys[within]
+    order = candidates[np.lexsort((candidates, keys))]
+    return order[:depth]
@@ -0,0 +1,165 @@
+"""Persistent, append-only registry of wallet address -> integer id."""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.addresses import ADDRESS_BYTES, KEY_DTYPE, address_keys, key_prefix, keys_to_addresses
+
+REGISTRY_DIR = Path(__file__).parent.parent / "data" / "real" / "registry"
+
+_ADDRESSES_FILE = "addresses.bin"     # 20-byte keys in id order, append-only
+_SORTED_KEYS_FILE = "sorted_keys.bin"  # the same keys, sorted
+_SORTED_IDS_FILE = "sorted_ids.bin"    # int32 id of each sorted key
+
+
+class WalletRegistry:
+    """
+    Maps lowercase wallet addresses to compact, stable int32 ids.
+
+    Ids are assigned in first-seen order and never change, so "Wallet 17"
+    refers to the same address across exports and runs. Addresses are stored
+    as 20-byte binary keys in an append-only file; a sorted copy of the keys
+    (memory-mapped on open) backs vectorized lookups. Lookups sort the query
+    by a 64-bit key prefix and binary-search the index, which keeps millions
+    of lookups per second on a single core.
+
+    The registry assumes a single writer; call ``flush`` to persist ids
+    handed out by ``get_or_create``.
+    """
+
+    def __init__(self, path: Path = REGISTRY_DIR):
+        self.path = Path(path)
+        self._n_flushed = 0
+        self._pending = np.zeros(0, dtype=KEY_DTYPE)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids)
+
+    def lookup(self, addresses) -> np.ndarray:
+        """Return the id of each address, or -1 when it is not registered."""
+        return self.lookup_keys(address_keys(addresses))
+
+    def get_or_create(self, addresses) -> np.ndarray:
+        """Return the id of each address, registering unseen ones."""
+        return self.get_or_create_keys(address_keys(addresses))
+
+    def lookup_keys(self, keys: np.ndarray) -> np.ndarray:
+        ids = np.full(len(keys), -1, dtype=np.int32)
+        if len(keys) == 0 or len(self._sorted_keys) == 0:
+            return ids
+
+        prefix = key_prefix(keys)
+        order = np.argsort(prefix, kind="stable")
+        # sorted queries keep the binary search cache-friendly
+        pos = np.searchsorted(self._sorted_prefix, prefix[order])
+        pos = np.minimum(pos, len(self._sorted_keys) - 1)
+        hit = self._sorted_keys[pos] == keys[order]
+
+        # distinct keys sharing a 64-bit prefix fall back to a full-key search
+        clash = ~hit & (self._sorted_prefix[pos] == prefix[order])
+        if clash.any():
+            full_pos = np.searchsorted(self._sorted_keys, keys[order][clash])
+            full_pos = np.minimum(full_pos, len(self._sorted_keys) - 1)
+            pos[clash] = full_pos
+            hit[clash] = self._sorted_keys[full_pos] == keys[order][clash]
+
+        ids[order[hit]] = self._sorted_ids[pos[hit]]
+        return ids
+
+    def get_or_create_keys(self, keys: np.ndarray) -> np.ndarray:
+        ids = self.lookup_keys(keys)
+        missing = ids < 0
+        if not missing.any():
+            return ids
+
+        unique, first = np.unique(keys[missing], return_index=True)
+        new_keys = unique[np.argsort(first)]  # first-appearance order
+        new_ids = np.arange(len(self), len(self) + len(new_keys), dtype=np.int32)
+
+        # merge the new keys into the sorted index
+        key_order = np.argsort(new_keys)
+        pos = np.searchsorted(self._sorted_keys, new_keys[key_order])
+        self._sorted_keys = np.insert(self._sorted_keys, pos, new_keys[key_order])
+        self._sorted_ids = np.insert(self._sorted_ids, pos, new_ids[key_order])
+        self._sorted_prefix = key_prefix(self._sorted_keys)
+        self._pending = np.concatenate([self._pending, new_keys])
+
+        ids[missing] = self.lookup_keys(keys[missing])
+        return ids
+
+    def addresses(self, ids) -> np.ndarray:
+        """Reverse lookup: lowercase hex address for each id."""
+        ids = np.asarray(ids, dtype=np.int64)
+        stored = self._stored_keys()
+        keys = np.concatenate([stored, self._pending]) if len(self._pending) else stored
+        return keys_to_addresses(keys[ids])
+
+    def flush(self) -> None:
+        """Append pending addresses to disk and rewrite the sorted index."""
+        if len(self._pending) == 0:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        with open(self.path / _ADDRESSES_FILE, "ab") as f:
+            f.write(self._pending.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._n_flushed += len(self._pending)
+        self._pending = np.zeros(0, dtype=KEY_DTYPE)
+
+        # the index is derived data: write it aside and swap it in
+        _atomic_write(self.path / _SORTED_KEYS_FILE, self._sorted_keys.tobytes())
+        _atomic_write(self.path / _SORTED_IDS_FILE, self._sorted_ids.tobytes())
+
+    def _stored_keys(self) -> np.ndarray:
+        path = self.path / _ADDRESSES_FILE
+        if self._n_flushed == 0 or not path.exists():
+            return np.zeros(0, dtype=KEY_DTYPE)
+        return np.memmap(path, dtype=KEY_DTYPE, mode="r", shape=(self._n_flushed,))
+
+    def _load(self) -> None:
+        addresses = self.path / _ADDRESSES_FILE
+        n = addresses.stat().st_size // ADDRESS_BYTES if addresses.exists() else 0
+        self._n_flushed = n
+
+        sorted_keys = self.path / _SORTED_KEYS_FILE
+        sorted_ids = self.path / _SORTED_IDS_FILE
+        index_ok = (
+            sorted_keys.exists()
+            and sorted_ids.exists()
+            and sorted_keys.stat().st_size == n * ADDRESS_BYTES
+            and sorted_ids.stat().st_size == n * 4
+        )
+        if n == 0:
+            self._sorted_keys = np.zeros(0, dtype=KEY_DTYPE)
+            self._sorted_ids = np.zeros(0, dtype=np.int32)
+        elif index_ok:
+            self._sorted_keys = np.memmap(sorted_keys, dtype=KEY_DTYPE, mode="r", shape=(n,))
+            self._sorted_ids = np.memmap(sorted_ids, dtype=np.int32, mode="r", shape=(n,))
+        else:
+            # index missing or stale (e.g. interrupted flush): rebuild it
+            keys = np.array(self._stored_keys())
+            order = np.argsort(keys, kind="stable").astype(np.int32)
+            self._sorted_keys = keys[order]
+            self._sorted_ids = order
+            _atomic_write(sorted_keys, self._sorted_keys.tobytes())
+            _atomic_write(sorted_ids, self._sorted_ids.tobytes())
+        self._sorted_prefix = key_prefix(self._sorted_keys)
+
+
+def wallet_labels(ids) -> pd.Series:
+    """Anonymized dataset labels ("Wallet 1", ...) of registry ids."""
+    ids = pd.Series(ids)
+    return "Wallet " + (ids + 1).astype(str)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
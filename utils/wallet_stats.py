@@ -0,0 +1,283 @@
+"""Fused, sort-based wallet aggregation shared by scoring and the dashboard."""
+import numpy as np
+import pandas as pd
+
+from utils.windowed_activity import (
+    BURST_WINDOW_SECONDS,
+    DAY_SECONDS,
+    HOUR_SECONDS,
+    MISSING_TIME,
+    TIME_SPAN,
+    distinct_buckets,
+    event_keys,
+    event_times,
+    key_times,
+    key_wallets,
+    mean_interarrival,
+    segment_starts,
+    window_maxima,
+)
+
+
+class WalletGrouper:
+    """
+    Groups transactions by wallet, in time order, with a single stable sort.
+
+    Every reduction reuses the same order and segment boundaries, so totals,
+    counts, sanctioned volume, sliding-window burst, active hours/days and
+    risk statistics cost one ``argsort`` plus a ``reduceat`` each. Results
+    are arrays indexed by wallet code (length ``n_wallets``; wallets without
+    rows get 0). ``times`` are epoch seconds as returned by ``event_times``.
+    Rows without a wallet (code -1) are left out of every reduction.
+    """
+
+    def __init__(self, codes: np.ndarray, n_wallets: int, times=None, wallets: pd.Index = None):
+        codes = np.asarray(codes, dtype=np.int64)
+        self.codes = codes
+        self.n_wallets = n_wallets
+        self.wallets = wallets
+
+        if times is None:
+            times = np.full(len(codes), -1, dtype=np.int64)
+        key = event_keys(codes, times)
+
+        # code -1 keys are negative and sort first: drop them
+        self._order = np.argsort(key, kind="stable")[np.count_nonzero(codes < 0):]
+        self._sorted_key = key[self._order]
+        self._starts = segment_starts(key_wallets(self._sorted_key))
+        self._present = key_wallets(self._sorted_key[self._starts])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, wallet_column: str = "wallet_id"):
+        """Group a frame by wallet; codes follow the sorted wallet labels."""
+        codes, wallets = pd.factorize(df[wallet_column], sort=True)
+        return cls(codes, len(wallets), event_times(df), wallets=pd.Index(wallets))
+
+    def _scatter(self, reduced: np.ndarray, dtype=None) -> np.ndarray:
+        out = np.zeros(self.n_wallets, dtype=dtype or reduced.dtype)
+        out[self._present] = reduced
+        return out
+
+    def count(self) -> np.ndarray:
+        return self._scatter(np.diff(np.r_[self._starts, len(self._order)]))
+
+    def sum(self, values) -> np.ndarray:
+        values = np.asarray(values)[self._order]
+        if len(values) == 0:
+            return np.zeros(self.n_wallets, dtype=values.dtype)
+        return self._scatter(np.add.reduceat(values, self._starts))
+
+    def max(self, values) -> np.ndarray:
+        values = np.asarray(values)[self._order]
+        if len(values) == 0:
+            return np.zeros(self.n_wallets, dtype=values.dtype)
+        return self._scatter(np.maximum.reduceat(values, self._starts))
+
+    def mean(self, values) -> np.ndarray:
+        counts = self.count()
+        return self.sum(np.asarray(values, dtype=float)) / np.maximum(counts, 1)
+
+    def burst(self, window_seconds: int = BURST_WINDOW_SECONDS) -> np.ndarray:
+        """Most transactions in any rolling window of each wallet."""
+        return window_maxima(self._sorted_key, self.n_wallets, window_seconds)
+
+    def window_volume(self, values, window_seconds: int = BURST_WINDOW_SECONDS) -> np.ndarray:
+        """Largest volume moved in any rolling window of each wallet."""
+        values = np.asarray(values, dtype=float)[self._order]
+        return window_maxima(self._sorted_key, self.n_wallets, window_seconds, values)
+
+    def active_hours(self) -> np.ndarray:
+        """Number of distinct (date, hour) buckets each wallet is active in."""
+        return distinct_buckets(self._sorted_key, self.n_wallets, HOUR_SECONDS)
+
+    def active_days(self) -> np.ndarray:
+        """Number of distinct UTC days each wallet is active on."""
+        return distinct_buckets(self._sorted_key, self.n_wallets, DAY_SECONDS)
+
+    def mean_interarrival(self) -> np.ndarray:
+        """Mean seconds between consecutive transfers (NaN below two)."""
+        return mean_interarrival(self._sorted_key, self.n_wallets)
+
+
+def wallet_statistics(df: pd.DataFrame, grouper: WalletGrouper = None) -> pd.DataFrame:
+    """
+    All wallet-level statistics of a raw transfer frame in one pass.
+
+    Expects ``wallet_id``, ``date``, ``hour`` (or ``timestamp``),
+    ``tx_volume_usd`` and ``sanctions_flag``. Returns one row per wallet
+    (sorted like a groupby on ``wallet_id``) with total volume, tx count,
+    sanctioned volume, the tx count and volume of the busiest rolling hour,
+    active hours and days, and the mean inter-arrival time. Pass ``grouper``
+    to reuse an existing grouping.
+    """
+    if grouper is None:
+        grouper = WalletGrouper.from_frame(df)
+
+    volume = df["tx_volume_usd"].to_numpy()
+    sanctioned = volume * df["sanctions_flag"].to_numpy()
+
+    return pd.DataFrame({
+        "wallet_id": grouper.wallets,
+        "wallet_total_volume": grouper.sum(volume),
+        "wallet_n_tx": grouper.count(),
+        "wallet_sanctions_volume": grouper.sum(sanctioned),
+        "wallet_burst": grouper.burst(),
+        "wallet_window_volume": grouper.window_volume(volume),
+        "active_hours": grouper.active_hours(),
+        "active_days": grouper.active_days(),
+        "wallet_mean_interarrival": grouper.mean_interarrival(),
+    })
+
+
+class WalletAccumulator:
+    """
+    Running wallet statistics over time-ordered batches of transfers.
+
+    Folds each batch into per-wallet total volume, tx count, sanctioned
+    volume, rolling-hour burst and active hours/days, plus the largest log
+    volume, and keeps nothing of the batch itself: memory grows with the
+    number of wallets, never with the number of rows.
+
+    Batches must come in time order (none starting before the latest event
+    already folded in), as date partitions and watermark ingests do. Burst
+    windows and distinct hours/days then only straddle a batch boundary:
+    the events of the last window are carried into the next batch, and a
+    wallet's last active hour and day are remembered. Wallet codes follow
+    first appearance; rows without a wallet get code -1 and count toward
+    the log volume only.
+    """
+
+    def __init__(self):
+        self.labels = []
+        self._lookup = {}
+        self.total_volume = np.zeros(0)
+        self.n_tx = np.zeros(0, dtype=np.int64)
+        self.sanctions_volume = np.zeros(0)
+        self.burst = np.zeros(0, dtype=np.int64)
+        self.active_hours = np.zeros(0, dtype=np.int64)
+        self.active_days = np.zeros(0, dtype=np.int64)
+        self.max_log = -np.inf
+        self.n_rows = 0
+        self._last_hour = np.zeros(0, dtype=np.int64)
+        self._last_day = np.zeros(0, dtype=np.int64)
+        self._latest = MISSING_TIME
+
+        # timed event keys of the previous batch's last burst window
+        self._carry = np.zeros(0, dtype=np.int64)
+
+    @property
+    def n_wallets(self) -> int:
+        return len(self.labels)
+
+    def add(self, batch: pd.DataFrame) -> np.ndarray:
+        """Fold a batch of raw transfers in; returns the wallet code of each row."""
+        if batch.empty:
+            return np.zeros(0, dtype=np.int64)
+        times = event_times(batch)
+        timed = times != MISSING_TIME
+        if timed.any() and times[timed].min() < self._latest:
+            raise ValueError("Batch starts before the latest event already folded in; batches must come in time order")
+
+        codes = self.register(batch["wallet_id"])
+        n_wallets = self.n_wallets
+        known = codes >= 0
+        volume = batch["tx_volume_usd"].to_numpy(dtype=float)
+        if "sanctions_flag" in batch.columns:
+            flags = batch["sanctions_flag"].astype(int).to_numpy()
+        else:
+            flags = np.zeros(len(batch), dtype=int)
+
+        wallets = codes[known]
+        self.total_volume += np.bincount(wallets, weights=volume[known], minlength=n_wallets)
+        self.n_tx += np.bincount(wallets, minlength=n_wallets)
+        self.sanctions_volume += np.bincount(wallets, weights=(volume * flags)[known], minlength=n_wallets)
+        self.max_log = max(self.max_log, float(np.log10(batch["tx_volume_usd"].clip(lower=1)).max()))
+
+        keys = np.sort(event_keys(wallets, times[known]))
+        self.active_hours += _new_buckets(keys, n_wallets, HOUR_SECONDS, self._last_hour)
+        self.active_days += _new_buckets(keys, n_wallets, DAY_SECONDS, self._last_day)
+
+        # windows starting in the carried events may reach into this batch
+        windowed = np.sort(np.concatenate([self._carry, keys[keys % TIME_SPAN != 0]]))
+        self.burst = np.maximum(self.burst, window_maxima(windowed, n_wallets, BURST_WINDOW_SECONDS))
+        if len(windowed):
+            last = key_times(windowed).max()
+            self._carry = windowed[key_times(windowed) > last - BURST_WINDOW_SECONDS]
+        if timed.any():
+            self._latest = max(self._latest, int(times[timed].max()))
+        self.n_rows += len(batch)
+        return codes
+
+    def register(self, wallets: pd.Series) -> np.ndarray:
+        """Wallet codes of the rows, adding unseen wallets (a dict lookup per distinct wallet)."""
+        local, labels = pd.factorize(wallets)
+        lookup = self._lookup
+        n_known = len(lookup)
+        # setdefault gives unseen labels the next free code
+        codes = np.fromiter(
+            (lookup.setdefault(label, len(lookup)) for label in labels.astype(object)),
+            dtype=np.int64,
+            count=len(labels),
+        )
+        grow = len(lookup) - n_known
+        if grow:
+            self.labels.extend(list(lookup)[n_known:])
+            for name in ("total_volume", "sanctions_volume"):
+                setattr(self, name, np.concatenate([getattr(self, name), np.zeros(grow)]))
+            for name in ("n_tx", "burst", "active_hours", "active_days"):
+                setattr(self, name, np.concatenate([getattr(self, name), np.zeros(grow, dtype=np.int64)]))
+            for name in ("_last_hour", "_last_day"):
+                setattr(self, name, np.concatenate([getattr(self, name), np.full(grow, -1, dtype=np.int64)]))
+        return _gather_codes(codes, local)
+
+    def codes(self, wallets: pd.Series) -> np.ndarray:
+        """Wallet codes of the rows (-1 without a wallet); every wallet must have been added."""
+        local, labels = pd.factorize(wallets)
+        codes = np.array([self._lookup.get(label, -1) for label in labels.astype(object)], dtype=np.int64)
+        if (codes < 0).any():
+            raise KeyError("Rows have wallets that were never added")
+        return _gather_codes(codes, local)
+
+    def statistics(self, codes=None) -> pd.DataFrame:
+        """The running statistics of the wallets with ``codes`` (default: all), as ``wallet_id`` rows."""
+        if codes is None:
+            codes = np.arange(self.n_wallets)
+        return pd.DataFrame({
+            "wallet_id": pd.Index(self.labels, dtype=object)[codes],
+            "wallet_total_volume": self.total_volume[codes],
+            "wallet_n_tx": self.n_tx[codes],
+            "wallet_sanctions_volume": self.sanctions_volume[codes],
+            "wallet_burst": self.burst[codes],
+            "active_hours": self.active_hours[codes],
+            "active_days": self.active_days[codes],
+        })
+
+
+def _gather_codes(codes: np.ndarray, local: np.ndarray) -> np.ndarray:
+    """Per-row codes from factorized ``local`` codes (-1 stays -1)."""
+    out = np.full(len(local), -1, dtype=np.int64)
+    present = local >= 0
+    out[present] = codes[local[present]]
+    return out
+
+
+def _new_buckets(keys: np.ndarray, n_wallets: int, bucket_seconds: int, last: np.ndarray) -> np.ndarray:
+    """
+    Distinct time buckets per wallet in sorted ``keys`` that are not its
+    ``last`` bucket from earlier batches; updates ``last`` in place.
+    """
+    keys = keys[keys % TIME_SPAN != 0]
+    counts = np.zeros(n_wallets, dtype=np.int64)
+    if len(keys) == 0:
+        return counts
+    wallets = key_wallets(keys)
+    buckets = key_times(keys) // bucket_seconds
+    first = np.r_[True, (wallets[1:] != wallets[:-1]) | (buckets[1:] != buckets[:-1])]
+    counts += np.bincount(wallets[first], minlength=n_wallets)
+
+    starts = segment_starts(wallets)
+    ends = np.r_[starts[1:], len(wallets)] - 1
+    present = wallets[starts]
+    counts[present] -= buckets[starts] == last[present]
+    last[present] = buckets[ends]
+    return counts
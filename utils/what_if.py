@@ -0,0 +1,154 @@
+"""What-if re-weighting of scored datasets from their cached component scores."""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.compact_scores import EXPOSURE_SCORE_COLUMN, CompactScores
+from utils.histograms import TokenHistogram
+from utils.instrumentation import timed
+from utils.public_scoring import _exposure_score
+from utils.rollups import RISK_BIN_EDGES, Rollups
+from utils.scoring_weights import ScoringWeights
+
+# Wallet table column of each wallet-level component, in composite order.
+_WALLET_COLUMNS = {
+    "concentration_score": "Concentration Score",
+    "velocity_score": "Velocity Score",
+    "burst_score": "Burst Score",
+    "time_score": "Time Score",
+}
+
+
+class ScoreComponents:
+    """
+    The component scores of a CompactScores, laid out for re-weighting.
+
+    The composite is linear in the components up to the sanctions
+    multiplier, and all but two components are per wallet. So the wallet
+    components form a (wallets × components) matrix, and new weights cost
+    one matrix-vector product over wallets plus, per row, a gather of the
+    wallet's base score, the volume score times its weight and the token
+    baseline. The arrays are built once per dataset (a few bytes per row),
+    after which ``rescore`` takes well under a second on millions of rows.
+    """
+
+    def __init__(self, scores: CompactScores):
+        tx = scores.transactions
+        self.scores = scores
+        self.exposure = EXPOSURE_SCORE_COLUMN in scores.wallets.columns
+        columns = list(_WALLET_COLUMNS.values()) + ([EXPOSURE_SCORE_COLUMN] if self.exposure else [])
+        self.wallet_matrix = scores.wallets[columns].to_numpy(dtype=float)
+        self.wallet_codes = scores.wallet_codes
+        # rows without a wallet (code -1) have no wallet components: NaN risk
+        self.known = np.flatnonzero(self.wallet_codes >= 0)
+        self.n_tx = np.maximum(np.bincount(self.wallet_codes[self.known], minlength=len(scores.wallets)), 1)
+        self.token_codes = tx["Token"].cat.codes.to_numpy()
+        self.tokens = list(tx["Token"].cat.categories)
+        self.volume_score = scores.column("Volume Score").to_numpy(dtype=np.float32)
+        sanctioned = tx["Sanctioned"].to_numpy() == 1
+        self.sanctioned = np.flatnonzero(sanctioned)
+        self.sanctioned_log_volume = np.log10(tx["Volume"].to_numpy(dtype=float)[sanctioned].clip(min=1))
+
+    def __len__(self) -> int:
+        return len(self.wallet_codes)
+
+    @timed()
+    def risk(self, weights: ScoringWeights) -> np.ndarray:
+        """Risk Score of every row under ``weights`` (float32)."""
+        coefficients = weights.coefficients(self.exposure)
+        volume_weight, token_weight = coefficients[:2]
+        wallet_base = self.wallet_matrix @ coefficients[2:]
+
+        # token code -1 (missing token) picks the default appended last
+        token_base = token_weight * np.append(weights.token_scores(self.tokens), weights.default_token_score)
+        wallet_base = wallet_base.astype(np.float32)
+        if len(self.known) == len(self):
+            risk = wallet_base[self.wallet_codes]
+        else:
+            risk = np.full(len(self), np.nan, dtype=np.float32)
+            risk[self.known] = wallet_base[self.wallet_codes[self.known]]
+        risk += np.float32(volume_weight) * self.volume_score
+        risk += token_base.astype(np.float32)[self.token_codes]
+        risk[self.sanctioned] *= (1 + self.sanctioned_log_volume * weights.sanctions_log_factor).astype(np.float32)
+        return np.clip(risk, 0, 100, out=risk)
+
+    @timed()
+    def rescore(self, weights: ScoringWeights) -> CompactScores:
+        """
+        The dataset scored with ``weights``: Risk Score, the wallets' average
+        and max risk and the risk rollups are recomputed; the components and
+        everything else are shared with the original.
+        """
+        scores = self.scores
+        risk = self.risk(weights)
+        transactions = scores.transactions.assign(**{"Risk Score": risk})
+
+        wallets = scores.wallets.copy()
+        codes = self.wallet_codes[self.known]
+        risk_sum = np.bincount(codes, weights=risk[self.known], minlength=len(wallets))
+        risk_max = np.zeros(len(wallets), dtype=np.float32)
+        np.maximum.at(risk_max, codes, risk[self.known])
+        wallets["Average Risk"] = (risk_sum / self.n_tx).astype(np.float32)
+        wallets["Max Risk"] = risk_max
+
+        return CompactScores(
+            transactions,
+            wallets,
+            scores.max_log_volume,
+            weights,
+            rollups=self._rollups(risk),
+            version=f"{scores.version}:{weights.fingerprint}",
+        )
+
+    def _rollups(self, risk: np.ndarray) -> Rollups:
+        """The original rollups with the risk aggregates replaced."""
+        rollups = self.scores.rollups
+        valid = (self.token_codes >= 0) & ~np.isnan(risk)
+        risk_sums = pd.Series(
+            np.bincount(self.token_codes[valid], weights=risk[valid], minlength=len(self.tokens)),
+            index=self.tokens,
+        )
+        tokens = rollups.tokens.assign(**{"Risk Sum": rollups.tokens["Token"].map(risk_sums).to_numpy()})
+        risk_histogram = TokenHistogram.from_values(
+            self.scores.transactions["Token"], risk, RISK_BIN_EDGES
+        )
+        scored = risk[~np.isnan(risk)]
+        kpis = {
+            **rollups.kpis,
+            "scored_transactions": len(scored),
+            "mean_risk": float(scored.mean(dtype=float)) if len(scored) else float("nan"),
+        }
+        return Rollups(rollups.volume, tokens, risk_histogram, kpis)
+
+
+def rescore(scores: CompactScores, weights: ScoringWeights) -> CompactScores:
+    """``scores`` re-weighted with ``weights`` (see ScoreComponents)."""
+    if weights == scores.weights:
+        return scores
+    return ScoreComponents(scores).rescore(weights)
+
+
+def with_exposure(scores: CompactScores, exposure: pd.Series) -> CompactScores:
+    """
+    ``scores`` with the Exposure Score component taken from ``exposure``
+    (0–1 by wallet label) and the risk recomputed from the components, so
+    a new counterparty graph does not re-score the rows. Returns ``scores``
+    unchanged without ``exposure``.
+    """
+    if exposure is None:
+        return scores
+    wallets = scores.wallets.drop(columns=EXPOSURE_SCORE_COLUMN, errors="ignore")
+    values = _exposure_score(pd.DataFrame({"wallet_id": wallets["Wallet"]}), exposure).to_numpy(dtype=np.float32)
+    # same place as when scored with exposure
+    wallets.insert(wallets.columns.get_loc("Time Score") + 1, EXPOSURE_SCORE_COLUMN, values)
+    digest = hashlib.blake2b(values.tobytes(), digest_size=8).hexdigest()
+    with_component = CompactScores(
+        scores.transactions,
+        wallets,
+        scores.max_log_volume,
+        scores.weights,
+        rollups=scores.rollups,
+        version=f"{scores.version}:exposure-{digest}",
+    )
+    return ScoreComponents(with_component).rescore(scores.weights)
@@ -0,0 +1,149 @@
+"""
+Timestamp-aware activity statistics over per-wallet event streams.
+
+Events are keyed by ``wallet_code * TIME_SPAN + (epoch_seconds + 1)``, with
+a time part of 0 for events without a known time. Sorting these keys puts
+each wallet's events in time order, so every statistic below is a handful of
+vectorized passes over one sorted int64 array: sliding windows are a
+``searchsorted`` of ``key + window`` into the keys themselves, and distinct
+hours/days are boundary counts. Nothing loops over wallets or events in
+Python, which keeps tens of millions of events tractable. Keys are only
+built for rows with a wallet (code >= 0); callers drop the rest first.
+"""
+import numpy as np
+import pandas as pd
+
+# Seconds per wallet block in the event key (~544 years from 1970).
+TIME_SPAN = 1 << 34
+
+MISSING_TIME = -1
+
+# Window of the burst statistic.
+BURST_WINDOW_SECONDS = 3600
+
+HOUR_SECONDS = 3600
+DAY_SECONDS = 86400
+
+
+def event_times(df: pd.DataFrame) -> np.ndarray:
+    """
+    Epoch seconds (UTC) of each transfer, or MISSING_TIME when unknown.
+
+    Uses the ``timestamp`` column where it is present and valid, and the
+    start of the ``date``/``hour`` bucket (hours run 1–24) otherwise.
+    """
+    times = np.full(len(df), MISSING_TIME, dtype=np.int64)
+
+    if "timestamp" in df.columns:
+        stamp = df["timestamp"]
+        if not isinstance(stamp.dtype, pd.DatetimeTZDtype) and not pd.api.types.is_datetime64_dtype(stamp):
+            stamp = pd.to_datetime(stamp.astype(str), format="ISO8601", errors="coerce", utc=True)
+        times = _epoch_seconds(stamp)
+
+    missing = times == MISSING_TIME
+    if missing.any() and "date" in df.columns and "hour" in df.columns:
+        # parse each distinct date once
+        day_codes, days = pd.factorize(df["date"])
+        day_seconds = _epoch_seconds(
+            pd.to_datetime(pd.Index(days).astype(str), format="%Y-%m-%d", errors="coerce")
+        )
+        hour = df["hour"].to_numpy(dtype=float)
+        fill = missing & (day_codes >= 0) & ~np.isnan(hour)
+        fill[fill] &= day_seconds[day_codes[fill]] != MISSING_TIME
+        times[fill] = (
+            day_seconds[day_codes[fill]] + (hour[fill].astype(np.int64) - 1) * HOUR_SECONDS
+        )
+
+    return times
+
+
+def event_keys(codes: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Sortable (wallet, time) keys; unknown times sort first in their wallet."""
+    codes = np.asarray(codes, dtype=np.int64)
+    times = np.asarray(times, dtype=np.int64)
+    return codes * TIME_SPAN + np.where(times >= 0, times + 1, 0)
+
+
+def key_wallets(keys: np.ndarray) -> np.ndarray:
+    return keys // TIME_SPAN
+
+
+def key_times(keys: np.ndarray) -> np.ndarray:
+    """Epoch seconds of sorted keys (MISSING_TIME where unknown)."""
+    return keys % TIME_SPAN - 1
+
+
+def segment_starts(wallets: np.ndarray) -> np.ndarray:
+    """Start offsets of the runs of equal wallet codes in a sorted array."""
+    if len(wallets) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, wallets[1:] != wallets[:-1]])
+
+
+def window_totals(keys: np.ndarray, window_seconds: int, values=None) -> np.ndarray:
+    """
+    For each event of sorted ``keys``, the number of events of the same wallet
+    in ``[t, t + window)`` (or the sum of ``values`` over them, in key order).
+    Events without a known time get 0 and are never counted.
+    """
+    n = len(keys)
+    end = np.searchsorted(keys, keys + window_seconds, side="left")
+    if values is None:
+        totals = end - np.arange(n)
+    else:
+        cumulative = np.concatenate([[0.0], np.cumsum(np.asarray(values, dtype=float))])
+        totals = cumulative[end] - cumulative[:n]
+    return np.where(keys % TIME_SPAN != 0, totals, 0)
+
+
+def window_maxima(keys: np.ndarray, n_wallets: int, window_seconds: int, values=None) -> np.ndarray:
+    """Per wallet, the busiest window: max event count (or value sum) in any window."""
+    totals = window_totals(keys, window_seconds, values)
+    return _segment_reduce(np.maximum, keys, totals, n_wallets)
+
+
+def distinct_buckets(keys: np.ndarray, n_wallets: int, bucket_seconds: int) -> np.ndarray:
+    """Per wallet, the number of distinct UTC hour/day/... buckets with activity."""
+    valid = keys % TIME_SPAN != 0
+    wallets = key_wallets(keys[valid])
+    buckets = key_times(keys[valid]) // bucket_seconds
+    if len(wallets) == 0:
+        return np.zeros(n_wallets, dtype=np.int64)
+    first = np.r_[True, (wallets[1:] != wallets[:-1]) | (buckets[1:] != buckets[:-1])]
+    return np.bincount(wallets[first], minlength=n_wallets)
+
+
+def mean_interarrival(keys: np.ndarray, n_wallets: int) -> np.ndarray:
+    """Per wallet, mean seconds between consecutive timed events (NaN below two)."""
+    valid = keys % TIME_SPAN != 0
+    wallets = key_wallets(keys[valid])
+    times = key_times(keys[valid])
+    counts = np.bincount(wallets, minlength=n_wallets)
+    out = np.full(n_wallets, np.nan)
+    if len(wallets) == 0:
+        return out
+    starts = segment_starts(wallets)
+    span = np.zeros(n_wallets, dtype=np.int64)
+    span[wallets[starts]] = np.maximum.reduceat(times, starts) - np.minimum.reduceat(times, starts)
+    several = counts > 1
+    out[several] = span[several] / (counts[several] - 1)
+    return out
+
+
+def _segment_reduce(ufunc, keys: np.ndarray, values: np.ndarray, n_wallets: int) -> np.ndarray:
+    out = np.zeros(n_wallets, dtype=values.dtype)
+    if len(keys) == 0:
+        return out
+    wallets = key_wallets(keys)
+    starts = segment_starts(wallets)
+    out[wallets[starts]] = ufunc.reduceat(values, starts)
+    return out
+
+
+def _epoch_seconds(values) -> np.ndarray:
+    """Datetimes (naive = UTC) as int64 epoch seconds, MISSING_TIME for NaT."""
+    values = pd.DatetimeIndex(values)
+    if values.tz is not None:
+        values = values.tz_convert("UTC").tz_localize(None)
+    seconds = values.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    return np.where(values.isna(), MISSING_TIME, seconds)